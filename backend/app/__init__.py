@@ -9,6 +9,8 @@ from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 
 from config import get_config
+from app.database import configure_engines, install_sqlite_pragmas
+from app.json_provider import init_json_provider
 from app.extensions import db, ma
 
 
@@ -24,6 +26,9 @@ def create_app(config_name=None):
     """
     app = Flask(__name__)
 
+    # JSON serialization (orjson when installed)
+    init_json_provider(app)
+
     # Load configuration
     if config_name:
         from config import config as config_dict
@@ -40,9 +45,13 @@ def create_app(config_name=None):
     # Register error handlers
     register_error_handlers(app)
 
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Register CLI commands
+    register_commands(app)
+
+    # Create database tables (development/testing; otherwise run Alembic before startup)
+    if app.config["DATABASE_AUTO_CREATE"]:
+        with app.app_context():
+            db.create_all()
 
     return app
 
@@ -51,7 +60,10 @@ def init_extensions(app):
     """Initialize Flask extensions"""
 
     # Database
+    configure_engines(app)
     db.init_app(app)
+    with app.app_context():
+        install_sqlite_pragmas(app, db.engines)
     ma.init_app(app)
 
     # CORS
@@ -66,17 +78,54 @@ def init_extensions(app):
         }
     })
 
-    # Session
-    Session(app)
+    # Session (server-side store; other SESSION_TYPE values use Flask-Session)
+    from app.services.session_store import init_session_store
+    if init_session_store(app) is None:
+        Session(app)
 
-    # Rate Limiting
+    # Background AI analysis
+    from app.services.ai_worker import ai_analysis_worker
+    ai_analysis_worker.init_app(app)
+
+    # Per-request SQL profiling
+    from app.services.sql_profiler import sql_profiler
+    sql_profiler.init_app(app)
+
+    # Expired session cleanup
+    from app.services.session_reaper import session_reaper
+    session_reaper.init_app(app)
+
+    # Calculation result memoization
+    from app.services.calculator import configure_result_cache
+    configure_result_cache(
+        max_entries=app.config["CALCULATION_CACHE_MAX_ENTRIES"],
+        max_bytes=app.config["CALCULATION_CACHE_MAX_BYTES"],
+    )
+    from app.services.payload_cache import configure_payload_cache
+    configure_payload_cache(
+        max_entries=app.config["CALCULATION_PAYLOAD_CACHE_MAX_ENTRIES"],
+        max_bytes=app.config["CALCULATION_PAYLOAD_CACHE_MAX_BYTES"],
+        ttl=app.config["CALCULATION_PAYLOAD_CACHE_TTL"],
+    )
+
+    # Rate Limiting ("local+" storage URLs register LocalSharedStorage on import)
+    from app.services.rate_limit_storage import rate_limit_storage_options
     Limiter(
         app=app,
         key_func=get_remote_address,
         default_limits=[app.config["RATELIMIT_DEFAULT"]],
-        storage_uri=app.config["RATELIMIT_STORAGE_URL"]
+        storage_uri=app.config["RATELIMIT_STORAGE_URL"],
+        storage_options=rate_limit_storage_options(app.config)
     )
 
+    # Response compression
+    from app.compression import response_compressor
+    response_compressor.init_app(app)
+
+    # Worker preloading / warm-up (called from gunicorn.conf.py)
+    from app.preload import worker_preloader
+    worker_preloader.init_app(app)
+
     # Security headers (disabled in development for easier testing)
     if not app.config["DEBUG"]:
         csp = {
@@ -114,6 +163,16 @@ def register_blueprints(app):
     app.register_blueprint(ai_bp, url_prefix="/api/v1")
 
 
+def register_commands(app):
+    """Register CLI commands"""
+
+    @app.cli.command("create-db")
+    def create_db_command():
+        """テーブルを作成（Alembic を使わない開発環境用。作成済みのテーブルはそのまま）"""
+        db.create_all()
+        print("Database tables created")
+
+
 def register_error_handlers(app):
     """Register error handlers"""
 
@@ -0,0 +1,170 @@
+"""
+Response Compression
+
+Accept-Encoding に応じて API レスポンスを gzip / brotli で圧縮する。
+
+- brotli は brotli パッケージがインストールされている場合のみ（なければ gzip のみ）
+- COMPRESSION_MIN_SIZE バイト未満のレスポンス、ストリーミング（NDJSON）、
+  JSON 以外は圧縮しない
+- 圧縮したレスポンスの強い ETag は弱い ETag（W/"..."）にする
+  （表現が変わるため。If-None-Match は弱い比較なのでそのまま一致する）
+- 保存済み計算結果は precompress() で圧縮済みの表現を作ってキャッシュし、
+  send_precompressed() で選ぶだけにする（リクエストごとの圧縮処理なし）
+"""
+import gzip
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+# サーバー側の優先順（同じ q 値なら先のものを使う）
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_MIMETYPES = {"application/json"}
+
+# 圧縮済みの表現を作るときのレベル（1回だけなので最大）
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 11
+
+
+def negotiate_encoding() -> Optional[str]:
+    """Accept-Encoding から使う圧縮形式を選ぶ（圧縮しない場合は None）"""
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    """
+    Args:
+        encoding: "gzip" / "br"
+        level: gzip の圧縮レベル（1-9） / brotli の quality（0-11）
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def precompress(data: bytes) -> Dict[str, bytes]:
+    """
+    保存済みレスポンス用に、対応しているすべての圧縮形式の表現を作成
+
+    Returns:
+        {"identity": data, "gzip": ..., "br": ...}
+        （圧縮が無効、または COMPRESSION_MIN_SIZE 未満なら identity のみ）
+    """
+    config = current_app.config
+    variants = {"identity": data}
+    if config["COMPRESSION_ENABLED"] and len(data) >= config["COMPRESSION_MIN_SIZE"]:
+        for encoding in ENCODINGS:
+            level = PRECOMPRESS_BROTLI_QUALITY if encoding == "br" else PRECOMPRESS_GZIP_LEVEL
+            variants[encoding] = compress(data, encoding, level)
+    return variants
+
+
+def send_precompressed(variants: Dict[str, bytes], mimetype: str = "application/json") -> Response:
+    """圧縮済みの表現から Accept-Encoding に合うものを選んでレスポンスを作成"""
+    encoding = negotiate_encoding() if len(variants) > 1 else None
+    if encoding not in variants:
+        encoding = None
+
+    response = current_app.response_class(
+        variants[encoding or "identity"], mimetype=mimetype
+    )
+    if len(variants) > 1:
+        response.vary.add("Accept-Encoding")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+        response_compressor.record(
+            len(variants["identity"]), len(variants[encoding]), 0.0, precompressed=True
+        )
+    return response
+
+
+def weaken_etag(response: Response) -> None:
+    """強い ETag を弱い ETag にする（圧縮した表現用）"""
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag, weak=True)
+
+
+class ResponseCompressor:
+    """after_request でレスポンスを圧縮"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.precompressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["response_compressor"] = self
+        if app.config.get("COMPRESSION_ENABLED", True):
+            app.after_request(self._compress)
+
+    def record(self, bytes_in: int, bytes_out: int, cpu_seconds: float, precompressed: bool = False) -> None:
+        with self._lock:
+            self.responses += 1
+            self.precompressed += precompressed
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_seconds += cpu_seconds
+
+    def stats(self) -> Dict:
+        """圧縮したレスポンス数（うち圧縮済みの表現を返した数）・圧縮前後のバイト数・圧縮のCPU時間"""
+        with self._lock:
+            return {
+                "encodings": list(ENCODINGS),
+                "responses": self.responses,
+                "precompressed": self.precompressed,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+                "cpu_ms": round(self.cpu_seconds * 1000, 3),
+                "avg_cpu_ms": (
+                    round(self.cpu_seconds * 1000 / self.responses, 4) if self.responses else None
+                ),
+            }
+
+    def _compress(self, response: Response) -> Response:
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        config = current_app.config
+        data = response.get_data()
+        if len(data) < config["COMPRESSION_MIN_SIZE"]:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+
+        level = config["COMPRESSION_BROTLI_QUALITY"] if encoding == "br" else config["COMPRESSION_GZIP_LEVEL"]
+        started = time.thread_time()
+        compressed = compress(data, encoding, level)
+        self.record(len(data), len(compressed), time.thread_time() - started)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        weaken_etag(response)
+        return response
+
+
+# Singleton instance (initialized in create_app)
+response_compressor = ResponseCompressor()
@@ -0,0 +1,147 @@
+"""
+Database Engine Layer
+
+- 接続プールの設定（PostgreSQL: pool_size / max_overflow / pre-ping など）
+- SQLite の PRAGMA（WAL モードで読み取りが書き込みをブロックしないようにする）
+- 読み取り専用エンドポイントのリードレプリカへの振り分け
+  （@read_replica を付けたビューの読み取りクエリだけを "replica" バインドに送る。
+  フラッシュ（書き込み）は常にプライマリ）
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional, TypeVar
+
+from flask import Flask
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+REPLICA_BIND = "replica"
+
+_use_replica: ContextVar[bool] = ContextVar("use_replica", default=False)
+
+T = TypeVar("T")
+
+
+class RoutingSession(FlaskSQLAlchemySession):
+    """読み取りをリードレプリカに振り分けるセッション"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing:
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(view: Callable) -> Callable:
+    """ビューの読み取りクエリをリードレプリカに送るデコレータ（レプリカ未設定なら何もしない）"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+@contextmanager
+def use_primary():
+    """このブロック内のクエリはプライマリに送る"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def first_with_primary_fallback(load: Callable[[], Optional[T]]) -> Optional[T]:
+    """
+    レプリカで見つからなければプライマリで読み直す（作成直後のレプリケーション遅延対策）
+
+    Args:
+        load: 1件を読み込む関数（見つからない場合は None を返す）
+    """
+    found = load()
+    if found is None and _use_replica.get():
+        with use_primary():
+            found = load()
+    return found
+
+
+def engine_options(url: str, config: Dict) -> Dict:
+    """
+    データベースURLに応じたエンジンオプション
+
+    Args:
+        url: データベースURL
+        config: アプリケーション設定
+    """
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        # ロック待ちは busy_timeout（PRAGMA）で行う
+        return {}
+
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def configure_engines(app: Flask) -> None:
+    """
+    db.init_app の前に、エンジンオプションとレプリカのバインドを設定
+
+    SQLALCHEMY_ENGINE_OPTIONS / SQLALCHEMY_BINDS が明示的に設定されている場合はそれを優先する。
+    """
+    config = app.config
+    if not config.get("SQLALCHEMY_ENGINE_OPTIONS"):
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(
+            config["SQLALCHEMY_DATABASE_URI"], config
+        )
+
+    replica_url = config.get("DATABASE_REPLICA_URL")
+    if replica_url:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds.setdefault(REPLICA_BIND, {
+            "url": replica_url,
+            **engine_options(replica_url, config),
+        })
+        config["SQLALCHEMY_BINDS"] = binds
+
+
+def install_sqlite_pragmas(app: Flask, engines: Dict[Optional[str], Engine]) -> None:
+    """
+    SQLite のエンジンに接続時の PRAGMA を設定
+
+    - journal_mode=WAL: 読み取りと書き込みを並行できる（ファイルDBのみ）
+    - synchronous=NORMAL: WAL では安全で、コミットごとの fsync を減らせる
+    - busy_timeout: ロック中はエラーにせず待つ
+    - temp_store=MEMORY: ソートなどの一時データをメモリに置く
+    - foreign_keys=ON: 外部キー制約と ON DELETE CASCADE / SET NULL を有効にする
+      （SQLite は接続ごとに既定で無効）
+    """
+    busy_timeout = app.config["SQLITE_BUSY_TIMEOUT"]
+    wal = app.config["SQLITE_WAL"]
+
+    for engine in engines.values():
+        if engine.dialect.name != "sqlite":
+            continue
+        in_memory = engine.url.database in (None, "", ":memory:")
+
+        def set_pragmas(dbapi_connection, connection_record, in_memory=in_memory):
+            cursor = dbapi_connection.cursor()
+            if wal and not in_memory:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+        event.listen(engine, "connect", set_pragmas)
@@ -6,8 +6,10 @@ Initialize extensions separately to avoid circular imports
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 
-# SQLAlchemy instance
-db = SQLAlchemy()
+from app.database import RoutingSession
+
+# SQLAlchemy instance (reads in @read_replica views go to the "replica" bind)
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 # Marshmallow instance
 ma = Marshmallow()
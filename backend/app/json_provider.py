@@ -0,0 +1,79 @@
+"""
+JSON Provider
+
+orjson がインストールされていれば orjson でシリアライズする JSONProvider。
+未インストールの場合や orjson で扱えない値・引数の場合は標準の json（DefaultJSONProvider）を使う。
+
+- 出力は DefaultJSONProvider と同じ値の JSON（キーのソート、日時は HTTP 日付形式）。
+  違いは非ASCII文字を \\uXXXX にエスケープせず UTF-8 のまま出力する点と、
+  dumps() が常にコンパクト形式（区切りの空白なし）になる点
+- デバッグモードでは DefaultJSONProvider と同様にインデント付きで出力する
+"""
+from typing import Any, Optional
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# orjson で処理できる dumps の引数（これ以外が指定されたら標準の json を使う）
+_ORJSON_DUMPS_KWARGS = {"default", "sort_keys", "indent", "separators"}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson を使う JSONProvider（標準の json へのフォールバック付き）"""
+
+    ensure_ascii = False
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        body = self._orjson_dumps(obj, kwargs)
+        if body is None:
+            return super().dumps(obj, **kwargs)
+        return body.decode("utf-8")
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # NaN などの標準の json だけが受け付ける入力、およびエラーメッセージは標準に合わせる
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._orjson_dumps(obj, {"indent": 2} if pretty else {})
+        if body is None:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+    def _orjson_dumps(self, obj: Any, kwargs: dict) -> Optional[bytes]:
+        """orjson でシリアライズ（扱えない場合は None）"""
+        if orjson is None or not _ORJSON_DUMPS_KWARGS.issuperset(kwargs):
+            return None
+
+        # orjson はコンパクト形式とインデント2のみ
+        indent = kwargs.get("indent")
+        if indent not in (None, 2) or kwargs.get("separators") not in (None, (",", ":")):
+            return None
+
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+
+        try:
+            return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option)
+        except (orjson.JSONEncodeError, TypeError):
+            # 64bitを超える整数・dict の文字列以外のキーなど
+            return None
+
+
+def init_json_provider(app: Flask) -> None:
+    """アプリの JSON プロバイダを FastJSONProvider にする"""
+    app.json = FastJSONProvider(app)
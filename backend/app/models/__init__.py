@@ -4,10 +4,14 @@ Database Models
 from app.models.session import Session
 from app.models.calculation import Calculation, CalculationYearlyData
 from app.models.goal import Goal
+from app.models.ai_advice import AIAdvice
+from app.models.server_session import ServerSession
 
 __all__ = [
     "Session",
     "Calculation",
     "CalculationYearlyData",
-    "Goal"
+    "Goal",
+    "AIAdvice",
+    "ServerSession"
 ]
@@ -0,0 +1,71 @@
+"""
+AI Advice Model
+"""
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import String, DateTime, Integer, Text, ForeignKey
+
+from app.extensions import db
+
+
+class AIAdvice(db.Model):
+    """
+    Advice generated by POST /ai/advice for a stored calculation
+
+    Kept apart from Calculation.ai_analysis so that stored calculations
+    never change after their analysis is complete (their responses are
+    cached by ETag, in-process and in shared HTTP caches).
+    """
+
+    __tablename__ = "ai_advice"
+
+    id = db.Column(Integer, primary_key=True)
+    advice_id = db.Column(
+        String(50),
+        unique=True,
+        nullable=False
+    )
+    calculation_id = db.Column(
+        String(50),
+        ForeignKey("calculations.calculation_id", ondelete="CASCADE"),
+        nullable=False
+    )
+    question = db.Column(Text, nullable=True)
+    analysis = db.Column(
+        db.JSON,
+        nullable=False
+    )
+    model_version = db.Column(String(50), nullable=False)
+    created_at = db.Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow
+    )
+
+    # Relationships
+    calculation = db.relationship(
+        "Calculation",
+        back_populates="advice"
+    )
+
+    # Indexes (advice_id is covered by its unique constraint)
+    __table_args__ = (
+        db.Index("idx_ai_advice_calculation_created", "calculation_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<AIAdvice {self.advice_id}>"
+
+    def to_dict(self) -> Dict:
+        """Convert advice to dictionary (same fields as Calculation.ai_analysis)"""
+        return {
+            "advice_id": self.advice_id,
+            "calculation_id": self.calculation_id,
+            "question": self.question,
+            "risk_factors": self.analysis.get("risk_factors", []),
+            "suggestions": self.analysis.get("suggestions", []),
+            "advice_message": self.analysis.get("advice_message", ""),
+            "generated_at": self.created_at.isoformat() + "Z" if self.created_at else None,
+            "model_version": self.model_version,
+        }
@@ -1,11 +1,80 @@
 """
 Calculation Models
 """
+import zlib
 from datetime import datetime
-from sqlalchemy import String, DateTime, Integer, BigInteger, ForeignKey
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import String, DateTime, Integer, BigInteger, LargeBinary, ForeignKey
 
 from app.extensions import db
 
+# Field order of the packed yearly series
+YEARLY_FIELDS = (
+    "year",
+    "age",
+    "balance",
+    "annual_income",
+    "annual_expenses",
+    "net_change",
+)
+
+# Format marker (first byte of Calculation.yearly_series)
+_SERIES_COLUMNS = b"c"
+
+# Column kinds in the _SERIES_COLUMNS header (one byte per field)
+_COLUMN_INT64_DELTA = ord("i")
+_COLUMN_FLOAT64 = ord("f")
+
+
+def encode_yearly_series(yearly_data: List[Dict]) -> bytes:
+    """
+    Pack yearly_data into a compact columnar blob
+
+    Each field becomes one column with its own type: int64 delta-encoded
+    along the years when every value is an integer, raw float64 otherwise.
+    A non-integer amount therefore only turns its own columns into floats;
+    year and age stay integers. Years, ages and constant cash flows collapse
+    to runs of identical deltas, so a 120-year series packs into a few
+    hundred bytes after zlib compression.
+    """
+    kinds = bytearray()
+    parts = []
+    for field in YEARLY_FIELDS:
+        column = [yearly[field] for yearly in yearly_data]
+        if all(isinstance(value, int) for value in column):
+            array = np.array(column, dtype="<i8")
+            parts.append(np.diff(array, prepend=0).astype("<i8").tobytes())
+            kinds.append(_COLUMN_INT64_DELTA)
+        else:
+            parts.append(np.array(column, dtype="<f8").tobytes())
+            kinds.append(_COLUMN_FLOAT64)
+
+    return _SERIES_COLUMNS + zlib.compress(bytes(kinds) + b"".join(parts))
+
+
+def decode_yearly_series(blob: bytes) -> List[Dict]:
+    """Unpack a blob created by encode_yearly_series back into yearly_data"""
+    marker = blob[:1]
+    if marker != _SERIES_COLUMNS:
+        raise ValueError(f"Unknown yearly series format: {marker!r}")
+
+    body = zlib.decompress(blob[1:])
+    kinds, body = body[:len(YEARLY_FIELDS)], body[len(YEARLY_FIELDS):]
+    size = len(body) // len(YEARLY_FIELDS)
+    columns = []
+    for position, kind in enumerate(kinds):
+        chunk = body[position * size:(position + 1) * size]
+        if kind == _COLUMN_INT64_DELTA:
+            columns.append(np.cumsum(np.frombuffer(chunk, dtype="<i8")).tolist())
+        elif kind == _COLUMN_FLOAT64:
+            columns.append(np.frombuffer(chunk, dtype="<f8").tolist())
+        else:
+            raise ValueError(f"Unknown yearly series column type: {kind!r}")
+
+    return [dict(zip(YEARLY_FIELDS, values)) for values in zip(*columns)]
+
 
 class Calculation(db.Model):
     """Calculation model for storing life plan calculations"""
@@ -31,10 +100,18 @@ class Calculation(db.Model):
         db.JSON,
         nullable=False
     )
+    yearly_series = db.Column(
+        LargeBinary,
+        nullable=True
+    )
     ai_analysis = db.Column(
         db.JSON,
         nullable=True
     )
+    ai_status = db.Column(
+        String(20),
+        nullable=True
+    )
     created_at = db.Column(
         DateTime,
         nullable=False,
@@ -56,16 +133,63 @@ class Calculation(db.Model):
         "CalculationYearlyData",
         back_populates="calculation",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="CalculationYearlyData.year"
     )
     goals = db.relationship(
         "Goal",
-        back_populates="calculation"
+        back_populates="calculation",
+        passive_deletes=True
+    )
+    advice = db.relationship(
+        "AIAdvice",
+        back_populates="calculation",
+        passive_deletes=True,
+        order_by="AIAdvice.created_at"
+    )
+
+    # Indexes (calculation_id is covered by its unique constraint)
+    __table_args__ = (
+        db.Index("idx_calculations_session_id", "session_id"),
+        db.Index("idx_calculations_created_at", "created_at"),
     )
 
     def __repr__(self):
         return f"<Calculation {self.calculation_id}>"
 
+    def store_result(self, result: Dict) -> None:
+        """
+        Store a calculator result
+
+        yearly_data goes into the packed yearly_series column; result_data
+        keeps everything else (depletion, summary, ...).
+        """
+        self.result_data = {
+            key: value for key, value in result.items() if key != "yearly_data"
+        }
+        self.yearly_series = encode_yearly_series(result["yearly_data"])
+        self._yearly_records = result["yearly_data"]
+
+    @property
+    def yearly_records(self) -> List[Dict]:
+        """Yearly data decoded lazily from yearly_series (cached per instance)"""
+        cached: Optional[List[Dict]] = getattr(self, "_yearly_records", None)
+        if cached is None:
+            if self.yearly_series is not None:
+                cached = decode_yearly_series(self.yearly_series)
+            else:
+                # Calculations stored before yearly_series existed
+                cached = (self.result_data or {}).get("yearly_data", [])
+            self._yearly_records = cached
+        return cached
+
+    def full_result(self) -> Dict:
+        """Calculator result with yearly_data restored"""
+        return {
+            **self.result_data,
+            "yearly_data": self.yearly_records,
+        }
+
     def to_dict(self, include_yearly_data=False):
         """Convert calculation to dictionary"""
         data = {
@@ -73,12 +197,13 @@ class Calculation(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "input": self.input_data,
-            "result": self.result_data,
-            "ai_analysis": self.ai_analysis
+            "result": self.full_result(),
+            "ai_analysis": self.ai_analysis,
+            "ai_status": self.ai_status
         }
 
         if include_yearly_data:
-            data["yearly_data"] = [yd.to_dict() for yd in self.yearly_data]
+            data["yearly_data"] = self.yearly_records
 
         return data
 
@@ -125,3 +250,30 @@ class CalculationYearlyData(db.Model):
             "annual_expenses": self.annual_expenses,
             "net_change": self.net_change
         }
+
+    @staticmethod
+    def rows_from_result(calculation_id: str, result: Dict) -> List[Dict]:
+        """Build insert rows from a calculation result's yearly_data"""
+        return [
+            {
+                "calculation_id": calculation_id,
+                "year": yearly["year"],
+                "age": yearly["age"],
+                "balance": yearly["balance"],
+                "annual_income": yearly["annual_income"],
+                "annual_expenses": yearly["annual_expenses"],
+                "net_change": yearly["net_change"],
+            }
+            for yearly in result["yearly_data"]
+        ]
+
+    @classmethod
+    def bulk_insert(cls, rows: List[Dict]) -> None:
+        """
+        Insert yearly rows with a single Core executemany
+
+        Bypasses ORM object construction and the identity map. The parent
+        Calculation rows must already be flushed.
+        """
+        if rows:
+            db.session.execute(cls.__table__.insert(), rows)
@@ -2,7 +2,7 @@
 Goal Model
 """
 from datetime import datetime
-from sqlalchemy import String, DateTime, Integer, Text, CheckConstraint, ForeignKey
+from sqlalchemy import String, DateTime, Integer, Text, CheckConstraint, ForeignKey, text
 
 from app.extensions import db
 
@@ -66,13 +66,22 @@ class Goal(db.Model):
         back_populates="goals"
     )
 
-    # Constraints
+    # Constraints and indexes (goal_id is covered by its unique constraint)
     __table_args__ = (
         CheckConstraint('progress >= 0 AND progress <= 100', name='check_progress_range'),
         CheckConstraint(
             "status IN ('active', 'completed', 'archived', 'paused')",
             name='check_status_values'
         ),
+        db.Index("idx_goals_session_status", "session_id", "status"),
+        db.Index(
+            "idx_active_goals",
+            "session_id",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+        # ON DELETE SET NULL from calculations
+        db.Index("idx_goals_calculation_id", "calculation_id"),
     )
 
     def __repr__(self):
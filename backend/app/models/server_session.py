@@ -0,0 +1,24 @@
+"""
+Server Session Model
+"""
+from sqlalchemy import String, DateTime, LargeBinary
+
+from app.extensions import db
+
+
+class ServerSession(db.Model):
+    """Server-side Flask session data (SESSION_TYPE = "sql")"""
+
+    __tablename__ = "server_sessions"
+
+    session_key = db.Column(String(255), primary_key=True)
+    data = db.Column(LargeBinary, nullable=False)
+    expires_at = db.Column(DateTime, nullable=False)
+
+    # Index for expiry sweeping
+    __table_args__ = (
+        db.Index("idx_server_sessions_expires_at", "expires_at"),
+    )
+
+    def __repr__(self):
+        return f"<ServerSession {self.session_key}>"
@@ -3,7 +3,8 @@ Session Model
 """
 import uuid
 from datetime import datetime, timedelta
-from sqlalchemy import String, DateTime, Integer
+from typing import List
+from sqlalchemy import String, DateTime, Integer, exists, select
 
 from app.extensions import db
 
@@ -42,15 +43,24 @@ class Session(db.Model):
     )
 
     # Relationships
+    # Children are removed by ON DELETE CASCADE in the database;
+    # passive_deletes keeps the ORM from loading them just to delete them.
     calculations = db.relationship(
         "Calculation",
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     goals = db.relationship(
         "Goal",
         back_populates="session",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+
+    # Indexes (session_id is covered by its unique constraint)
+    __table_args__ = (
+        db.Index("idx_sessions_expires_at", "expires_at"),
     )
 
     def __repr__(self):
@@ -58,15 +68,53 @@ class Session(db.Model):
 
     def to_dict(self):
         """Convert session to dictionary"""
+        has_calculations, has_goals = self._has_children()
         return {
             "session_id": self.session_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "last_accessed": self.last_accessed.isoformat() if self.last_accessed else None,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
-            "has_calculations": len(self.calculations) > 0,
-            "has_goals": len(self.goals) > 0
+            "has_calculations": has_calculations,
+            "has_goals": has_goals
         }
 
+    def _has_children(self):
+        """
+        Whether the session has calculations / goals
+
+        Uses two EXISTS subqueries in one statement instead of loading
+        the relationships.
+        """
+        from app.models.calculation import Calculation
+        from app.models.goal import Goal
+
+        row = db.session.execute(
+            select(
+                exists().where(Calculation.session_id == self.session_id),
+                exists().where(Goal.session_id == self.session_id),
+            )
+        ).one()
+        return bool(row[0]), bool(row[1])
+
+    @classmethod
+    def delete_sessions(cls, session_ids: List[str]) -> int:
+        """
+        Delete sessions and their related data without loading them
+
+        Children are removed by ON DELETE CASCADE (on SQLite, enabled by
+        PRAGMA foreign_keys in install_sqlite_pragmas). The caller commits.
+
+        Returns:
+            Number of sessions deleted
+        """
+        if not session_ids:
+            return 0
+
+        result = db.session.execute(
+            cls.__table__.delete().where(cls.session_id.in_(session_ids))
+        )
+        return result.rowcount
+
     @property
     def is_expired(self):
         """Check if session is expired"""
@@ -0,0 +1,127 @@
+"""
+Worker Preloading
+
+gunicorn の preload_app（マスターでアプリを作成してからワーカーを fork する）用。
+設定ファイルは backend/gunicorn.conf.py。
+
+- warm_up(): マスター（preload しない場合は各ワーカー）で、最初のリクエストで
+  行われる処理（モジュールの import、計算・JSON エンコードのコードパス）を先に済ませる。
+  fork 後のワーカーはこれをコピーオンライトで共有する
+- prepare_worker(): fork 後のワーカーで、リクエストを受ける前に呼ぶ。
+  親から引き継いだDB接続を破棄し（close=False: 親の接続を閉じない）、
+  このプロセス用の接続と Gemini サービスを作成する
+
+スレッド（AI分析ワーカー・セッション削除）は fork 後の最初の利用時に起動するため、
+マスターでは起動しない。Monte Carlo のプロセスプールは fork 時に破棄される
+（app.services.monte_carlo を参照）。
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from flask import Flask
+from sqlalchemy import text
+
+from app.extensions import db
+
+
+class WorkerPreloader:
+    """アプリの事前読み込みと fork 後のワーカーの準備"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._lock = threading.Lock()
+        self.app_pid: Optional[int] = None
+        self.warm_up_ms: Optional[float] = None
+        self.warmed_up_in: Optional[int] = None
+        self.prepare_ms: Optional[float] = None
+        self.engines_disposed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        app.extensions["worker_preloader"] = self
+        self.app_pid = os.getpid()
+
+    def warm_up(self, app: Flask) -> None:
+        """
+        最初のリクエストで行われる処理を先に実行
+
+        DBには接続を確認するだけで、接続は保持しない（fork 前に呼ばれるため）。
+        WORKER_WARM_UP = false の場合は何もしない。
+        """
+        if not app.config.get("WORKER_WARM_UP", True):
+            return
+        started = time.perf_counter()
+
+        from app.services.calculator import LifePlanCalculator
+
+        with app.app_context():
+            for engine in db.engines.values():
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                engine.dispose()
+
+            result = LifePlanCalculator(
+                age=40, monthly_expenses=200000, total_assets=5000000
+            ).calculate()
+            app.json.dumps(result)
+
+        if _gemini_configured(app):
+            # SDK の import のみ（クライアントは fork 後に prepare_worker で作成する）
+            import google.generativeai  # noqa: F401
+
+        with self._lock:
+            self.warm_up_ms = round((time.perf_counter() - started) * 1000, 3)
+            self.warmed_up_in = os.getpid()
+
+    def prepare_worker(self, app: Flask) -> None:
+        """
+        fork 後のワーカーでリクエストを受ける前に呼ぶ
+
+        アプリを preload していない場合（このプロセスで作成した場合）は warm_up() も行う。
+        """
+        started = time.perf_counter()
+        if self.warmed_up_in is None:
+            self.warm_up(app)
+
+        with app.app_context():
+            disposed = 0
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+                disposed += 1
+
+            if app.config.get("WORKER_WARM_UP", True):
+                for engine in db.engines.values():
+                    with engine.connect() as connection:
+                        connection.execute(text("SELECT 1"))
+                if _gemini_configured(app):
+                    from app.services.gemini_service import get_gemini_service
+                    get_gemini_service()
+
+        with self._lock:
+            self.engines_disposed += disposed
+            self.prepare_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    def stats(self) -> Dict:
+        """preload の有無・ウォームアップと fork 後の準備にかかった時間"""
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "preloaded": self.app_pid is not None and self.app_pid != os.getpid(),
+                "warm_up_ms": self.warm_up_ms,
+                "warmed_up_in_master": (
+                    self.warmed_up_in is not None and self.warmed_up_in != os.getpid()
+                ),
+                "prepare_ms": self.prepare_ms,
+                "engines_disposed": self.engines_disposed,
+            }
+
+
+def _gemini_configured(app: Flask) -> bool:
+    api_key = app.config.get("GEMINI_API_KEY")
+    return bool(api_key) and api_key != "your_gemini_api_key_here"
+
+
+# Singleton instance (initialized in create_app)
+worker_preloader = WorkerPreloader()
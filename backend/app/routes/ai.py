@@ -1,10 +1,236 @@
 """
-AI Routes (Placeholder)
+AI Routes
 """
-from flask import Blueprint
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+
+from app.database import first_with_primary_fallback, read_replica
+from app.extensions import db
+from app.models import AIAdvice, Calculation
+from app.services import get_gemini_service
+from app.services.sql_profiler import query_budget
 
 ai_bp = Blueprint("ai", __name__)
 
-# TODO: Implement AI endpoints
-# - POST /ai/suggest-goals
-# - POST /ai/advice
+SSE_MIMETYPE = "text/event-stream"
+MAX_QUESTION_LENGTH = 500
+
+# GET /ai/advice/<calculation_id> で返す件数（新しい順）
+MAX_ADVICE_HISTORY = 20
+
+# TODO: Implement POST /ai/suggest-goals
+
+
+@ai_bp.route("/ai/advice", methods=["POST"])
+def advice():
+    """
+    保存済みの計算結果に対する AI アドバイスを Server-Sent Events でストリーミング
+
+    Request Body:
+        {
+            "calculation_id": str,
+            "question": str (optional, 500文字まで)
+        }
+
+    Events:
+        meta:   {"calculation_id": str}（すぐに送る）
+        token:  {"text": str}（アドバイス本文を生成された順に）
+        reset:  {}（送信済みの token を破棄する。生成が途中で失敗し、result が
+                ルールベースの分析になる場合に送る）
+        result: {"calculation_id", "advice_id", "ai_analysis", "saved"}（最後に1回）
+        error:  {"code", "message"}（ストリーム中のエラー。この後にイベントは送らない）
+
+    生成が終わったら ai_analysis（risk_factors / suggestions / advice_message）を
+    質問とともに ai_advice テーブルに保存する（GET /ai/advice/<calculation_id> で取得）。
+    計算結果（calculations.ai_analysis）は変更しない。保存済みの計算結果は
+    ETag・Cache-Control（ブラウザ）とワーカーごとの本文キャッシュでキャッシュされるため。
+    Gemini が使えない場合（未設定・障害・タイムアウト）はルールベースの分析を返す
+    （model_version = "fallback"）。
+
+    Returns:
+        text/event-stream（検証エラー・計算結果がない場合は JSON）
+    """
+    try:
+        data = request.get_json()
+
+        if not data or not data.get("calculation_id"):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "calculation_idが必要です"
+                }
+            }), 400
+
+        question = data.get("question")
+        if question is not None and (
+            not isinstance(question, str) or len(question) > MAX_QUESTION_LENGTH
+        ):
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"questionは{MAX_QUESTION_LENGTH}文字以内の文字列で入力してください"
+                }
+            }), 400
+
+        calculation_id = data["calculation_id"]
+        calculation = Calculation.query.filter_by(calculation_id=calculation_id).first()
+
+        if not calculation:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "CALCULATION_NOT_FOUND",
+                    "message": "計算結果が見つかりません"
+                }
+            }), 404
+
+        user_info = calculation.input_data
+        calculation_result = calculation.full_result()
+        # ストリーミング中はDB接続を保持しない
+        db.session.close()
+
+    except Exception as e:
+        print(f"AI advice error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "AIアドバイスの取得に失敗しました"
+            }
+        }), 500
+
+    question = question.strip() if question else None
+    events = _advice_events(calculation_id, user_info, calculation_result, question)
+    response = Response(stream_with_context(events), mimetype=SSE_MIMETYPE)
+    response.headers["Cache-Control"] = "no-cache"
+    # リバースプロキシ（nginx）でバッファリングしない
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+@ai_bp.route("/ai/advice/<calculation_id>", methods=["GET"])
+@query_budget(2)
+@read_replica
+def advice_history(calculation_id):
+    """
+    POST /ai/advice で保存したアドバイスを取得（新しい順に MAX_ADVICE_HISTORY 件まで）
+
+    Args:
+        calculation_id: 計算ID
+
+    Returns:
+        アドバイスのリストのJSON
+    """
+    try:
+        calculation = first_with_primary_fallback(
+            lambda: Calculation.query.filter_by(calculation_id=calculation_id).first()
+        )
+
+        if not calculation:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "CALCULATION_NOT_FOUND",
+                    "message": "計算結果が見つかりません"
+                }
+            }), 404
+
+        history = (
+            AIAdvice.query.filter_by(calculation_id=calculation_id)
+            .order_by(AIAdvice.created_at.desc(), AIAdvice.id.desc())
+            .limit(MAX_ADVICE_HISTORY)
+            .all()
+        )
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "calculation_id": calculation_id,
+                "advice": [item.to_dict() for item in history],
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"AI advice history error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "AIアドバイスの取得に失敗しました"
+            }
+        }), 500
+
+
+def _advice_events(
+    calculation_id: str,
+    user_info: Dict,
+    calculation_result: Dict,
+    question: Optional[str],
+) -> Iterator[str]:
+    """/ai/advice のイベント列"""
+    yield _sse("meta", {"calculation_id": calculation_id})
+
+    try:
+        outcome = None
+        for kind, value in get_gemini_service().stream_life_plan(
+            user_info, calculation_result, question=question
+        ):
+            if kind == "token":
+                yield _sse("token", {"text": value})
+            elif kind == "reset":
+                yield _sse("reset", {})
+            else:
+                outcome = value
+        if outcome is None:
+            raise RuntimeError("stream ended without a result")
+
+        record = AIAdvice(
+            advice_id=f"advice_{uuid.uuid4().hex[:16]}",
+            calculation_id=calculation_id,
+            question=question,
+            analysis={
+                "risk_factors": outcome["analysis"].get("risk_factors", []),
+                "suggestions": outcome["analysis"].get("suggestions", []),
+                "advice_message": outcome["analysis"].get("advice_message", ""),
+            },
+            model_version=outcome["model_version"],
+            created_at=datetime.utcnow(),
+        )
+    except Exception as e:
+        print(f"AI advice stream error: {str(e)}")
+        yield _sse("error", {"code": "AI_API_ERROR", "message": "AIアドバイスの生成に失敗しました"})
+        return
+
+    ai_analysis = record.to_dict()
+    advice_id = ai_analysis.pop("advice_id")
+    del ai_analysis["calculation_id"]
+    saved = _save_advice(record)
+
+    yield _sse("result", {
+        "calculation_id": calculation_id,
+        "advice_id": advice_id if saved else None,
+        "ai_analysis": ai_analysis,
+        "saved": saved,
+    })
+
+
+def _save_advice(advice: AIAdvice) -> bool:
+    """アドバイスを保存（保存できたら True）"""
+    try:
+        db.session.add(advice)
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"AI advice save error: {str(e)}")
+        return False
+
+
+def _sse(event: str, data: Dict) -> str:
+    """Server-Sent Events の1イベント（data は1行のJSON）"""
+    return f"event: {event}\ndata: {current_app.json.dumps(data)}\n\n"
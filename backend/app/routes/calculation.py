@@ -1,18 +1,56 @@
 """
 Calculation Routes
 """
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+import hashlib
+import secrets
+import time
 import uuid
 from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import numpy as np
+from sqlalchemy import exists, select
+from sqlalchemy.orm import load_only
+
+from app.compression import precompress, send_precompressed
+from app.database import first_with_primary_fallback, read_replica, use_primary
 from app.extensions import db
 from app.models import Calculation, CalculationYearlyData, Session
-from app.services import LifePlanCalculator, get_gemini_service
+from app.services import (
+    LifePlanCalculator,
+    ai_analysis_worker,
+    get_gemini_service,
+    run_gemini_analysis,
+)
+from app.services.ai_worker import AI_STATUS_COMPLETED, AI_STATUS_PENDING
+from app.services.calculator import SOLVE_LEVERS, SWEEP_PARAMETERS
+from app.services.monte_carlo import DEFAULT_PARAMETERS, run_monte_carlo
+from app.services.payload_cache import get_payload, invalidate_payload, store_payload
+from app.services.sql_profiler import query_budget
 
 calculation_bp = Blueprint("calculation", __name__)
 
+# バッチ計算で一度に受け付ける最大件数
+MAX_BATCH_SIZE = 500
+
+# バッチ計算でまとめて計算・保存する件数（メモリ使用量の上限になる）
+BATCH_CHUNK_SIZE = 100
+
+# 金額（total_assets / monthly_expenses / monthly_support）の上限（1兆円）
+# 計算は int64 で行うため、この上限までなら SIMULATION_MAX_YEARS の既定値（120年）分の
+# 残高の合計でも桁あふれしない
+MAX_AMOUNT = 10**12
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# GET /calculate/<id> のレスポンスの形式を変えたら上げる（ETag が変わる）
+CALCULATION_PAYLOAD_VERSION = 1
+
 
 @calculation_bp.route("/calculate", methods=["POST"])
+@query_budget(5)
 def calculate():
     """
     ライフプラン計算
@@ -28,13 +66,37 @@ def calculate():
             },
             "options": {
                 "use_ai_analysis": bool (optional),
-                "simulation_years": int (optional)
-            }
+                "async_ai_analysis": bool (optional),
+                "simulation_years": int (optional),
+                "mode": "deterministic" | "monte_carlo" (optional),
+                "monte_carlo": {
+                    "paths": int (optional),
+                    "seed": int (optional),
+                    "inflation_mean": float, "inflation_std": float,
+                    "return_mean": float, "return_std": float,
+                    "shock_probability": float, "shock_scale": float
+                } (optional)
+            },
+            "session_id": str (optional)
         }
 
+    session_id を省略した場合は新しいセッションを作成し、レスポンスの session_id で返す
+    （計算結果はセッションの有効期限切れで削除される）。
+
+    mode が "monte_carlo" の場合、通常の計算結果に加えて result.monte_carlo に
+    残高のパーセンタイル帯と年齢別の資金枯渇確率を返す。
+
+    async_ai_analysis が true の場合、ルールベースの分析を即座に返して保存し、
+    Gemini の分析はバックグラウンドで実行する（ai_status = "pending"）。
+    結果は GET /calculate/<calculation_id>/ai-analysis で取得する。
+
+    同期のAI分析は CALCULATION_SLO 秒のうち計算後に残った時間で行い、
+    間に合わない場合はルールベースの分析を返す。
+
     Returns:
         計算結果のJSON
     """
+    deadline = time.monotonic() + current_app.config["CALCULATION_SLO"]
     try:
         data = request.get_json()
 
@@ -51,52 +113,23 @@ def calculate():
         options = data.get("options", {})
 
         # 入力値の検証
-        required_fields = ["age", "monthly_expenses", "total_assets"]
-        for field in required_fields:
-            if field not in user_info:
-                return jsonify({
-                    "success": False,
-                    "error": {
-                        "code": "VALIDATION_ERROR",
-                        "message": f"{field}が必要です"
-                    }
-                }), 400
-
-        # バリデーション
-        age = user_info["age"]
-        monthly_expenses = user_info["monthly_expenses"]
-        total_assets = user_info["total_assets"]
-        monthly_support = user_info.get("monthly_support", 0)
-
-        if not (0 <= age <= 120):
-            return jsonify({
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "年齢は0から120の間で入力してください"
-                }
-            }), 400
-
-        if monthly_expenses < 0:
+        simulation_years = options.get("simulation_years", 50)
+        validation_error = _validate_user_info(user_info) or _validate_simulation_years(simulation_years)
+        if validation_error:
             return jsonify({
                 "success": False,
                 "error": {
                     "code": "VALIDATION_ERROR",
-                    "message": "生活費は0以上で入力してください"
+                    "message": validation_error
                 }
             }), 400
 
-        if total_assets < 0:
-            return jsonify({
-                "success": False,
-                "error": {
-                    "code": "VALIDATION_ERROR",
-                    "message": "資産は0以上で入力してください"
-                }
-            }), 400
+        age = user_info["age"]
+        monthly_expenses = user_info["monthly_expenses"]
+        total_assets = user_info["total_assets"]
+        monthly_support = user_info.get("monthly_support", 0)
 
         # 計算実行
-        simulation_years = options.get("simulation_years", 50)
         calculator = LifePlanCalculator(
             age=age,
             monthly_expenses=monthly_expenses,
@@ -104,77 +137,127 @@ def calculate():
             monthly_support=monthly_support,
         )
 
-        result = calculator.calculate(simulation_years=simulation_years)
+        monte_carlo_settings = None
+        if options.get("mode") == "monte_carlo":
+            monte_carlo_settings, validation_error = _monte_carlo_settings(
+                options, simulation_years
+            )
+            if validation_error:
+                return jsonify({
+                    "success": False,
+                    "error": {
+                        "code": "VALIDATION_ERROR",
+                        "message": validation_error
+                    }
+                }), 400
+
+        session_id = _session_for_calculation(data.get("session_id"))
+        if session_id is None:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "SESSION_NOT_FOUND",
+                    "message": "セッションが見つかりません"
+                }
+            }), 404
+
+        result = calculator.calculate(
+            simulation_years=simulation_years,
+            include_monthly_data=options.get("include_monthly_data", False) is True,
+        )
+        # 月次データは再計算できるため保存せず、レスポンスにだけ含める
+        monthly_data = result.pop("monthly_data", None)
+
+        # モンテカルロシミュレーション
+        if monte_carlo_settings is not None:
+            result["monte_carlo"] = run_monte_carlo(
+                age=age,
+                current_year=calculator.current_year,
+                monthly_expenses=monthly_expenses,
+                total_assets=total_assets,
+                monthly_support=monthly_support,
+                simulation_years=simulation_years,
+                processes=current_app.config["MONTE_CARLO_PROCESSES"],
+                pool_threshold=current_app.config["MONTE_CARLO_POOL_THRESHOLD"],
+                time_budget=current_app.config["MONTE_CARLO_TIME_BUDGET"],
+                **monte_carlo_settings,
+            )
 
         # AI分析（Gemini API使用）
         use_ai = options.get("use_ai_analysis", True)
+        run_in_background = (
+            use_ai
+            and options.get("async_ai_analysis", False)
+            and get_gemini_service().enabled
+        )
+        ai_status = AI_STATUS_COMPLETED
 
-        if use_ai:
-            gemini_service = get_gemini_service()
-            ai_analysis_result = gemini_service.analyze_life_plan(user_info, result)
-            ai_analysis = {
-                "risk_factors": ai_analysis_result.get("risk_factors", []),
-                "suggestions": ai_analysis_result.get("suggestions", []),
-                "advice_message": ai_analysis_result.get("advice_message", ""),
-                "generated_at": datetime.utcnow().isoformat() + "Z",
-                "model_version": "gemini" if gemini_service.enabled else "fallback",
-            }
+        if run_in_background:
+            # まずルールベースの分析を返し、Gemini分析は後から書き戻す
+            ai_analysis = _simple_analysis(calculator, result)
+            ai_status = AI_STATUS_PENDING
+        elif use_ai:
+            ai_analysis = run_gemini_analysis(user_info, result, deadline=deadline)
         else:
             # Fallback to simple analysis
-            ai_analysis = {
-                "risk_factors": calculator.get_risk_factors(result),
-                "suggestions": calculator.get_suggestions(result),
-                "advice_message": calculator.generate_advice_message(result),
-                "generated_at": datetime.utcnow().isoformat() + "Z",
-                "model_version": "simple_calculator_v1",
-            }
+            ai_analysis = _simple_analysis(calculator, result)
 
         # 計算結果をデータベースに保存
         calculation_id = f"calc_{uuid.uuid4().hex[:16]}"
 
-        # セッションIDの取得（オプション）
-        session_id = data.get("session_id")
-
         calculation = Calculation(
             calculation_id=calculation_id,
-            session_id=session_id if session_id else "anonymous",
+            session_id=session_id,
             input_data=user_info,
-            result_data=result,
             ai_analysis=ai_analysis,
+            ai_status=ai_status,
         )
+        calculation.store_result(result)
 
         db.session.add(calculation)
 
-        # 年次データを保存
-        for yearly in result["yearly_data"]:
-            yearly_record = CalculationYearlyData(
-                calculation_id=calculation_id,
-                year=yearly["year"],
-                age=yearly["age"],
-                balance=yearly["balance"],
-                annual_income=yearly["annual_income"],
-                annual_expenses=yearly["annual_expenses"],
-                net_change=yearly["net_change"],
+        # 年次データを保存（SQL集計用テーブル、一括INSERT）
+        if current_app.config["CALCULATION_YEARLY_ROWS"]:
+            db.session.flush()
+            CalculationYearlyData.bulk_insert(
+                CalculationYearlyData.rows_from_result(calculation_id, result)
             )
-            db.session.add(yearly_record)
 
         db.session.commit()
 
+        if run_in_background and not ai_analysis_worker.submit(calculation_id, user_info, result):
+            # 待ち行列が満杯: ルールベースの分析のまま確定する
+            current_app.logger.warning("AI analysis queue is full, keeping the rule-based analysis")
+            ai_status = AI_STATUS_COMPLETED
+            db.session.execute(
+                Calculation.__table__.update()
+                .where(Calculation.calculation_id == calculation_id)
+                .values(ai_status=ai_status)
+            )
+            db.session.commit()
+
         # レスポンスの作成
         response_data = {
             "calculation_id": calculation_id,
+            "session_id": session_id,
             "created_at": calculation.created_at.isoformat() + "Z",
+            "ai_status": ai_status,
             "input": user_info,
             "result": {
                 "depletion_age": result.get("depletion_age"),
                 "depletion_year": result.get("depletion_year"),
                 "years_until_depletion": result.get("years_until_depletion"),
+                "months_until_depletion": result.get("months_until_depletion"),
                 "total_years_simulated": result["total_years_simulated"],
                 "yearly_data": result["yearly_data"],
                 "summary": result["summary"],
                 "ai_analysis": ai_analysis,
             },
         }
+        if monthly_data is not None:
+            response_data["result"]["monthly_data"] = monthly_data
+        if "monte_carlo" in result:
+            response_data["result"]["monte_carlo"] = result["monte_carlo"]
 
         return jsonify({
             "success": True,
@@ -193,21 +276,382 @@ def calculate():
         }), 500
 
 
+@calculation_bp.route("/calculate/batch", methods=["POST"])
+def calculate_batch():
+    """
+    ライフプランの一括計算
+
+    支援団体のケース一覧などをまとめて計算する。全件をまとめて検証・計算し、
+    1トランザクションで保存する。AI分析はルールベース（simple_calculator_v1）のみ。
+
+    Request Body:
+        {
+            "items": [
+                {
+                    "age": int,
+                    "monthly_expenses": int,
+                    "total_assets": int,
+                    "monthly_support": int (optional),
+                    "support_type": str (optional)
+                },
+                ...
+            ],
+            "options": {
+                "simulation_years": int (optional),
+                "stream": bool (optional)
+            },
+            "session_id": str (optional)
+        }
+
+    stream が true、または Accept: application/x-ndjson の場合は NDJSON で
+    1件1行の結果 → エラー → サマリーの順にストリーミングする。
+
+    Returns:
+        件ごとの計算結果とエラーのJSON
+    """
+    try:
+        data = request.get_json()
+
+        if not data or not isinstance(data.get("items"), list) or not data["items"]:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "itemsが必要です"
+                }
+            }), 400
+
+        items = data["items"]
+        options = data.get("options", {})
+
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": f"一度に計算できるのは{MAX_BATCH_SIZE}件までです"
+                }
+            }), 400
+
+        simulation_years = options.get("simulation_years", 50)
+        validation_error = _validate_simulation_years(simulation_years)
+        if validation_error:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": validation_error
+                }
+            }), 400
+
+        # 入力値の検証（エラーの件は計算対象から外す）
+        valid_items = []
+        errors = []
+        for index, user_info in enumerate(items):
+            validation_error = _validate_user_info(user_info)
+            if validation_error:
+                errors.append({
+                    "index": index,
+                    "code": "VALIDATION_ERROR",
+                    "message": validation_error
+                })
+            else:
+                valid_items.append((index, user_info))
+
+        session_id = _session_for_calculation(data.get("session_id"))
+        if session_id is None:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "SESSION_NOT_FOUND",
+                    "message": "セッションが見つかりません"
+                }
+            }), 404
+
+        # 計算実行・保存（BATCH_CHUNK_SIZE 件ずつベクトル演算し、1トランザクションで保存）
+        calculators = [
+            LifePlanCalculator(
+                age=user_info["age"],
+                monthly_expenses=user_info["monthly_expenses"],
+                total_assets=user_info["total_assets"],
+                monthly_support=user_info.get("monthly_support", 0),
+            )
+            for _, user_info in valid_items
+        ]
+        saved_items = []
+        for start in range(0, len(valid_items), BATCH_CHUNK_SIZE):
+            chunk = slice(start, start + BATCH_CHUNK_SIZE)
+            saved_items.extend(_save_batch_chunk(
+                valid_items[chunk], calculators[chunk], simulation_years, session_id
+            ))
+        db.session.commit()
+
+        summary = {
+            "session_id": session_id,
+            "total": len(items),
+            "succeeded": len(saved_items),
+            "failed": len(errors),
+        }
+        results = _iter_batch_results(saved_items, calculators, simulation_years)
+
+        if _wants_stream(options):
+            return _ndjson_response(chain(
+                ({"type": "result", **item} for item in results),
+                ({"type": "error", **error} for error in errors),
+                [{"type": "summary", **summary}],
+            ))
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "results": list(results),
+                "errors": errors,
+                "summary": summary,
+            }
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Batch calculation error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "一括計算中にエラーが発生しました"
+            }
+        }), 500
+
+
+@calculation_bp.route("/calculate/sweep", methods=["POST"])
+@query_budget(0)
+def calculate_sweep():
+    """
+    感度分析（what-ifグリッド）
+
+    1〜2個の入力パラメータを範囲で変化させ、全グリッド点を1回のベクトル演算で計算する。
+    結果は保存しない。
+
+    Request Body:
+        {
+            "user_info": { ... /calculate と同じ ... },
+            "axes": [
+                {
+                    "parameter": "expense_reduction" | "additional_income" |
+                                 "monthly_expenses" | "monthly_support" | "total_assets",
+                    "values": [number, ...]
+                    または
+                    "start": number, "stop": number, "steps": int
+                }
+            ],
+            "options": {
+                "simulation_years": int (optional)
+            }
+        }
+
+    Returns:
+        グリッド点ごとの資金枯渇年齢の行列のJSON
+    """
+    try:
+        data = request.get_json()
+
+        if not data or "user_info" not in data:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "user_infoが必要です"
+                }
+            }), 400
+
+        user_info = data["user_info"]
+        options = data.get("options", {})
+        simulation_years = options.get("simulation_years", 50)
+
+        validation_error = _validate_user_info(user_info) or _validate_simulation_years(simulation_years)
+        if not validation_error:
+            axes, validation_error = _sweep_axes(data.get("axes"))
+        if validation_error:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": validation_error
+                }
+            }), 400
+
+        calculator = LifePlanCalculator(
+            age=user_info["age"],
+            monthly_expenses=user_info["monthly_expenses"],
+            total_assets=user_info["total_assets"],
+            monthly_support=user_info.get("monthly_support", 0),
+        )
+        sweep = calculator.sweep(axes, simulation_years=simulation_years)
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "input": user_info,
+                "sweep": sweep,
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Sweep calculation error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "感度分析中にエラーが発生しました"
+            }
+        }), 500
+
+
+@calculation_bp.route("/calculate/solve", methods=["POST"])
+@query_budget(0)
+def calculate_solve():
+    """
+    ゴールシーク（目標年齢まで資金を持たせるための最小の改善額）
+
+    月間収支が一定の場合は閉じた式で、モンテカルロモードの場合は
+    二分法（評価回数の上限付き）で、1リクエストで最小額を求める。結果は保存しない。
+
+    Request Body:
+        {
+            "user_info": { ... /calculate と同じ ... },
+            "target": {
+                "lever": "expense_reduction" | "additional_income",
+                "age": int | null (null の場合はシミュレーション期間の最後まで),
+                "max_depletion_probability": float (optional, モンテカルロモードのみ)
+            },
+            "options": {
+                "simulation_years": int (optional),
+                "mode": "monte_carlo" (optional),
+                "monte_carlo": { ... /calculate と同じ ... } (optional)
+            }
+        }
+
+    Returns:
+        必要な月額と適用後の資金枯渇年齢のJSON
+    """
+    try:
+        data = request.get_json()
+
+        if not data or "user_info" not in data:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": "user_infoが必要です"
+                }
+            }), 400
+
+        user_info = data["user_info"]
+        options = data.get("options", {})
+        simulation_years = options.get("simulation_years", 50)
+
+        validation_error = _validate_user_info(user_info)
+        if not validation_error:
+            target, validation_error = _solve_target(
+                data.get("target"), user_info["age"], simulation_years
+            )
+
+        monte_carlo_settings = None
+        if not validation_error and options.get("mode") == "monte_carlo":
+            monte_carlo_settings, validation_error = _monte_carlo_settings(
+                options, simulation_years
+            )
+            if monte_carlo_settings is not None and (
+                monte_carlo_settings["paths"]
+                * target["required_years"]
+                * current_app.config["SOLVE_MAX_ITERATIONS"]
+                > current_app.config["SOLVE_MAX_PATH_YEARS"]
+            ):
+                validation_error = "パス数と目標年齢の組み合わせが上限を超えています"
+
+        if validation_error:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "VALIDATION_ERROR",
+                    "message": validation_error
+                }
+            }), 400
+
+        calculator = LifePlanCalculator(
+            age=user_info["age"],
+            monthly_expenses=user_info["monthly_expenses"],
+            total_assets=user_info["total_assets"],
+            monthly_support=user_info.get("monthly_support", 0),
+        )
+        solution = calculator.solve(
+            lever=target["lever"],
+            target_age=target["age"],
+            simulation_years=simulation_years,
+            monte_carlo=monte_carlo_settings,
+            max_depletion_probability=target["max_depletion_probability"],
+            tolerance=current_app.config["SOLVE_TOLERANCE"],
+            max_iterations=current_app.config["SOLVE_MAX_ITERATIONS"],
+        )
+        if monte_carlo_settings is not None:
+            solution["seed"] = monte_carlo_settings["seed"]
+            solution["max_depletion_probability"] = target["max_depletion_probability"]
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "input": user_info,
+                "solution": solution,
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Solve calculation error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "必要額の計算中にエラーが発生しました"
+            }
+        }), 500
+
+
 @calculation_bp.route("/calculate/<calculation_id>", methods=["GET"])
+@query_budget(3)
+@read_replica
 def get_calculation(calculation_id):
     """
     計算結果を取得
 
+    保存済みの計算結果は ai_analysis の反映（ai_status の更新）以外では変わらないため、
+    更新日時から求めた（弱い）ETag を付け、If-None-Match が一致すれば 304 を返す。
+    （If-None-Match 付きのリクエストは、まず JSON カラムを除いた列だけを読み込む）
+    キャッシュにヒットした場合も、計算結果が削除されていないことだけは毎回確認する。
+
     Args:
         calculation_id: 計算ID
 
     Returns:
-        計算結果のJSON
+        計算結果のJSON（AI分析が完了した計算結果はシリアライズ・圧縮済みの本文をキャッシュ）
     """
     try:
-        calculation = Calculation.query.filter_by(
-            calculation_id=calculation_id
-        ).first()
+        cached = get_payload(calculation_id)
+        if cached is not None and not _calculation_exists(calculation_id):
+            # 削除済み（セッションの削除・期限切れは他のワーカーで起きることもある）
+            invalidate_payload(calculation_id)
+            cached = None
+        if cached is not None:
+            etag, variants = cached
+            if request.if_none_match.contains_weak(etag):
+                return _with_cache_headers(Response(status=304), etag, final=True)
+            return _with_cache_headers(send_precompressed(variants), etag, final=True), 200
+
+        conditional = bool(request.if_none_match)
+        query = Calculation.query.filter_by(calculation_id=calculation_id)
+        if conditional:
+            query = query.options(load_only(
+                Calculation.calculation_id, Calculation.ai_status, Calculation.updated_at
+            ))
+        calculation = first_with_primary_fallback(query.first)
 
         if not calculation:
             return jsonify({
@@ -218,20 +662,37 @@ def get_calculation(calculation_id):
                 }
             }), 404
 
+        etag = _calculation_etag(calculation)
+        final = calculation.ai_status != AI_STATUS_PENDING
+        if conditional:
+            if request.if_none_match.contains_weak(etag):
+                return _with_cache_headers(Response(status=304), etag, final)
+            # 一致しなければ全列を読み直す（レプリカの遅延を避けてプライマリから）
+            with use_primary():
+                calculation = Calculation.query.populate_existing().filter_by(
+                    calculation_id=calculation_id
+                ).first() or calculation
+
         response_data = {
             "calculation_id": calculation.calculation_id,
             "created_at": calculation.created_at.isoformat() + "Z",
+            "ai_status": calculation.ai_status,
             "input": calculation.input_data,
             "result": {
-                **calculation.result_data,
+                **calculation.full_result(),
                 "ai_analysis": calculation.ai_analysis,
             },
         }
 
-        return jsonify({
+        response = jsonify({
             "success": True,
             "data": response_data
-        }), 200
+        })
+        if final:
+            variants = precompress(response.get_data())
+            store_payload(calculation_id, etag, variants)
+            response = send_precompressed(variants)
+        return _with_cache_headers(response, etag, final), 200
 
     except Exception as e:
         print(f"Get calculation error: {str(e)}")
@@ -242,3 +703,422 @@ def get_calculation(calculation_id):
                 "message": "計算結果の取得に失敗しました"
             }
         }), 500
+
+
+@calculation_bp.route("/calculate/<calculation_id>/ai-analysis", methods=["GET"])
+def get_ai_analysis(calculation_id):
+    """
+    AI分析の状態と結果を取得（ロングポーリング対応）
+
+    Args:
+        calculation_id: 計算ID
+
+    Query Parameters:
+        wait: ai_status が pending の間、最大何秒待つか (optional, default: 0)
+
+    Returns:
+        ai_status と ai_analysis のJSON
+    """
+    try:
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            wait = 0
+        wait = max(0.0, min(wait, current_app.config["AI_ANALYSIS_MAX_WAIT"]))
+
+        calculation = Calculation.query.filter_by(
+            calculation_id=calculation_id
+        ).first()
+
+        if not calculation:
+            return jsonify({
+                "success": False,
+                "error": {
+                    "code": "CALCULATION_NOT_FOUND",
+                    "message": "計算結果が見つかりません"
+                }
+            }), 404
+
+        # pending の間は完了通知（別プロセスの場合は1秒ごとのDB確認）を待つ
+        deadline = time.monotonic() + wait
+        while calculation.ai_status == AI_STATUS_PENDING:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ai_analysis_worker.wait(calculation_id, min(remaining, 1.0))
+            db.session.refresh(calculation)
+
+        return jsonify({
+            "success": True,
+            "data": {
+                "calculation_id": calculation.calculation_id,
+                "ai_status": calculation.ai_status,
+                "ai_analysis": calculation.ai_analysis,
+            }
+        }), 200
+
+    except Exception as e:
+        print(f"Get AI analysis error: {str(e)}")
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "INTERNAL_ERROR",
+                "message": "AI分析の取得に失敗しました"
+            }
+        }), 500
+
+
+def _calculation_exists(calculation_id: str) -> bool:
+    """計算結果が存在するか（一意インデックスだけを引く）"""
+    return bool(db.session.execute(
+        select(exists().where(Calculation.calculation_id == calculation_id))
+    ).scalar())
+
+
+def _calculation_etag(calculation: Calculation) -> str:
+    """計算結果の内容のバージョン（更新日時と ai_status）から ETag を作成"""
+    version = (
+        f"{CALCULATION_PAYLOAD_VERSION}:{calculation.calculation_id}:"
+        f"{calculation.updated_at.isoformat()}:{calculation.ai_status}"
+    )
+    return hashlib.sha256(version.encode("utf-8")).hexdigest()[:32]
+
+
+def _with_cache_headers(response: Response, etag: str, final: bool) -> Response:
+    """
+    ETag と Cache-Control を設定
+
+    ETag は常に弱い ETag にする。内容のバージョンを表すため、圧縮形式の違う 200 と
+    本文のない 304 のどれでも同じ値になる（304 の本文から強弱を決めると 200 と食い違う）。
+
+    Args:
+        final: ai_status が確定済み（以後変わらない）か。
+            pending の間は毎回 If-None-Match で再検証させる
+    """
+    response.set_etag(etag, weak=True)
+    config = current_app.config
+    if final and config["CALCULATION_HTTP_MAX_AGE"]:
+        # 利用者ごとの家計のデータで、セッション削除時に CDN から消す手段もないため共有キャッシュには置かせない
+        response.headers["Cache-Control"] = f"private, max-age={config['CALCULATION_HTTP_MAX_AGE']}"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _session_for_calculation(session_id: Optional[str]) -> Optional[str]:
+    """
+    計算結果を保存するセッションのID（コミットは呼び出し側）
+
+    calculations.session_id は sessions への外部キーのため、省略時は新しいセッションを作成する。
+
+    Returns:
+        セッションID。指定されたセッションが存在しない場合は None
+    """
+    if not session_id:
+        session = Session(session_id=str(uuid.uuid4()))
+        db.session.add(session)
+        return session.session_id
+
+    found = db.session.execute(
+        select(exists().where(Session.session_id == session_id))
+    ).scalar()
+    return session_id if found else None
+
+
+def _save_batch_chunk(
+    items: List[Tuple[int, Dict]],
+    calculators: List[LifePlanCalculator],
+    simulation_years: int,
+    session_id: str,
+) -> List[Dict]:
+    """
+    バッチの1チャンクを計算してセッションに追加（コミットは呼び出し側）
+
+    Returns:
+        レスポンス用の軽量な情報（計算結果そのものは保持しない）
+    """
+    results = LifePlanCalculator.calculate_many(
+        calculators, simulation_years=simulation_years
+    )
+
+    saved = []
+    yearly_rows = []
+    for (index, user_info), calculator, result in zip(items, calculators, results):
+        calculation_id = f"calc_{uuid.uuid4().hex[:16]}"
+        ai_analysis = _simple_analysis(calculator, result)
+
+        calculation = Calculation(
+            calculation_id=calculation_id,
+            session_id=session_id,
+            input_data=user_info,
+            ai_analysis=ai_analysis,
+            ai_status=AI_STATUS_COMPLETED,
+            created_at=datetime.utcnow(),
+        )
+        calculation.store_result(result)
+        db.session.add(calculation)
+        if current_app.config["CALCULATION_YEARLY_ROWS"]:
+            yearly_rows.extend(
+                CalculationYearlyData.rows_from_result(calculation_id, result)
+            )
+
+        saved.append({
+            "index": index,
+            "calculation_id": calculation_id,
+            "created_at": calculation.created_at.isoformat() + "Z",
+            "input": user_info,
+            "ai_analysis": ai_analysis,
+        })
+
+    # チャンクごとにフラッシュし、年次データを一括INSERT（SQL集計用テーブル）
+    db.session.flush()
+    CalculationYearlyData.bulk_insert(yearly_rows)
+    return saved
+
+
+def _iter_batch_results(
+    saved_items: List[Dict],
+    calculators: List[LifePlanCalculator],
+    simulation_years: int,
+) -> Iterator[Dict]:
+    """保存済みのバッチ結果をチャンクごとに組み立てて返す（計算結果はキャッシュから取得）"""
+    for start in range(0, len(saved_items), BATCH_CHUNK_SIZE):
+        chunk = slice(start, start + BATCH_CHUNK_SIZE)
+        results = LifePlanCalculator.calculate_many(
+            calculators[chunk], simulation_years=simulation_years
+        )
+        for item, result in zip(saved_items[chunk], results):
+            yield {
+                "index": item["index"],
+                "calculation_id": item["calculation_id"],
+                "created_at": item["created_at"],
+                "input": item["input"],
+                "result": {
+                    **result,
+                    "ai_analysis": item["ai_analysis"],
+                },
+            }
+
+
+def _wants_stream(options: Dict) -> bool:
+    """NDJSONでのストリーミングが要求されているか"""
+    if options.get("stream") is True:
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def _ndjson_response(records: Iterable[Dict]) -> Response:
+    """レコードを1行ずつJSONにしてストリーミングするレスポンス"""
+
+    def generate():
+        for record in records:
+            yield current_app.json.dumps(record) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+
+def _validate_user_info(user_info) -> Optional[str]:
+    """
+    user_infoの入力値を検証
+
+    Returns:
+        エラーメッセージ（問題がなければNone）
+    """
+    if not isinstance(user_info, dict):
+        return "user_infoが不正です"
+
+    required_fields = ["age", "monthly_expenses", "total_assets"]
+    for field in required_fields:
+        if field not in user_info:
+            return f"{field}が必要です"
+
+    for field in required_fields + ["monthly_support"]:
+        value = user_info.get(field, 0)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return f"{field}は数値で入力してください"
+
+    if not (0 <= user_info["age"] <= 120):
+        return "年齢は0から120の間で入力してください"
+
+    if user_info["monthly_expenses"] < 0:
+        return "生活費は0以上で入力してください"
+
+    if user_info["total_assets"] < 0:
+        return "資産は0以上で入力してください"
+
+    for field in ("monthly_expenses", "total_assets", "monthly_support"):
+        if abs(user_info.get(field, 0)) > MAX_AMOUNT:
+            return f"{field}は{MAX_AMOUNT:,}以下で入力してください"
+
+    return None
+
+
+def _validate_simulation_years(simulation_years) -> Optional[str]:
+    """
+    simulation_yearsを検証（1からSIMULATION_MAX_YEARSの整数）
+
+    月次の残高は 件数 × 年数 × 12 の配列になるため、年数に上限を設ける。
+
+    Returns:
+        エラーメッセージ（問題がなければNone）
+    """
+    max_years = current_app.config["SIMULATION_MAX_YEARS"]
+    if isinstance(simulation_years, bool) or not isinstance(simulation_years, int) or not (
+        1 <= simulation_years <= max_years
+    ):
+        return f"simulation_yearsは1から{max_years}の間で入力してください"
+    return None
+
+
+def _monte_carlo_settings(options: Dict, simulation_years) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    モンテカルロ設定を検証
+
+    パス数 × 年数が MONTE_CARLO_MAX_PATH_YEARS を超えるリクエストは拒否する。
+
+    Returns:
+        (run_monte_carlo に渡す設定, エラーメッセージ)
+    """
+    settings = options.get("monte_carlo") or {}
+    if not isinstance(settings, dict):
+        return None, "monte_carloが不正です"
+
+    config = current_app.config
+    paths = settings.get("paths", config["MONTE_CARLO_DEFAULT_PATHS"])
+    seed = settings.get("seed")
+
+    validation_error = _validate_simulation_years(simulation_years)
+    if validation_error:
+        return None, validation_error
+
+    if isinstance(paths, bool) or not isinstance(paths, int) or not (
+        1 <= paths <= config["MONTE_CARLO_MAX_PATHS"]
+    ):
+        return None, f"pathsは1から{config['MONTE_CARLO_MAX_PATHS']}の間で入力してください"
+
+    if paths * simulation_years > config["MONTE_CARLO_MAX_PATH_YEARS"]:
+        return None, "パス数とシミュレーション年数の組み合わせが上限を超えています"
+
+    if seed is None:
+        seed = secrets.randbits(32)
+    elif isinstance(seed, bool) or not isinstance(seed, int) or seed < 0:
+        return None, "seedは0以上の整数で入力してください"
+
+    parameters = {}
+    for name in DEFAULT_PARAMETERS:
+        if name in settings:
+            value = settings[name]
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return None, f"{name}は数値で入力してください"
+            parameters[name] = float(value)
+
+    for name in ("inflation_std", "return_std", "shock_scale"):
+        if parameters.get(name, 0) < 0:
+            return None, f"{name}は0以上で入力してください"
+    if not (0 <= parameters.get("shock_probability", 0) <= 1):
+        return None, "shock_probabilityは0から1の間で入力してください"
+
+    return {"paths": paths, "seed": seed, "parameters": parameters}, None
+
+
+def _sweep_axes(axes) -> Tuple[Optional[List[Dict]], Optional[str]]:
+    """
+    感度分析の軸を検証し、start/stop/steps 指定を値のリストに展開
+
+    Returns:
+        (軸のリスト, エラーメッセージ)
+    """
+    if not isinstance(axes, list) or not (1 <= len(axes) <= 2):
+        return None, "axesは1つまたは2つ指定してください"
+
+    max_points = current_app.config["SWEEP_MAX_POINTS"]
+    parsed = []
+    total_points = 1
+    for axis in axes:
+        if not isinstance(axis, dict) or axis.get("parameter") not in SWEEP_PARAMETERS:
+            return None, f"parameterは{', '.join(SWEEP_PARAMETERS)}のいずれかを指定してください"
+
+        parameter = axis["parameter"]
+        if "values" in axis:
+            values = axis["values"]
+        else:
+            start, stop, steps = axis.get("start"), axis.get("stop"), axis.get("steps")
+            if not all(
+                isinstance(v, (int, float)) and not isinstance(v, bool)
+                for v in (start, stop, steps)
+            ) or int(steps) != steps or not (1 <= steps <= max_points):
+                return None, "valuesまたはstart/stop/stepsを指定してください"
+            values = np.linspace(start, stop, int(steps)).round(6).tolist()
+
+        if not isinstance(values, list) or not values or not all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in values
+        ):
+            return None, "valuesは数値のリストで指定してください"
+
+        if parameter == "expense_reduction" and not all(0 <= v <= 1 for v in values):
+            return None, "expense_reductionは0から1の間で指定してください"
+        if any(v < 0 for v in values):
+            return None, f"{parameter}は0以上で指定してください"
+        if any(v > MAX_AMOUNT for v in values):
+            return None, f"{parameter}は{MAX_AMOUNT:,}以下で指定してください"
+
+        total_points *= len(values)
+        parsed.append({"parameter": parameter, "values": values})
+
+    if len({axis["parameter"] for axis in parsed}) != len(parsed):
+        return None, "同じparameterを2回指定することはできません"
+
+    if total_points > max_points:
+        return None, f"グリッドの点数は{max_points}以下にしてください"
+
+    return parsed, None
+
+
+def _solve_target(target, age, simulation_years) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    ゴールシークの目標を検証
+
+    Returns:
+        (目標, エラーメッセージ)
+    """
+    if not isinstance(target, dict) or target.get("lever") not in SOLVE_LEVERS:
+        return None, f"leverは{', '.join(SOLVE_LEVERS)}のいずれかを指定してください"
+
+    validation_error = _validate_simulation_years(simulation_years)
+    if validation_error:
+        return None, validation_error
+
+    target_age = target.get("age")
+    if target_age is None:
+        required_years = simulation_years
+    elif isinstance(target_age, bool) or not isinstance(target_age, int) or not (
+        age <= target_age <= 120
+    ):
+        return None, "目標年齢は現在の年齢から120の間で入力してください"
+    else:
+        required_years = target_age - age + 1
+
+    max_probability = target.get("max_depletion_probability", 0.05)
+    if isinstance(max_probability, bool) or not isinstance(max_probability, (int, float)) or not (
+        0 <= max_probability < 1
+    ):
+        return None, "max_depletion_probabilityは0以上1未満で入力してください"
+
+    return {
+        "lever": target["lever"],
+        "age": target_age,
+        "required_years": required_years,
+        "max_depletion_probability": float(max_probability),
+    }, None
+
+
+def _simple_analysis(calculator: LifePlanCalculator, result: Dict) -> Dict:
+    """ルールベースの分析結果を作成"""
+    return {
+        "risk_factors": calculator.get_risk_factors(result),
+        "suggestions": calculator.get_suggestions(result),
+        "advice_message": calculator.generate_advice_message(result),
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "model_version": "simple_calculator_v1",
+    }
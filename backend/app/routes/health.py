@@ -1,8 +1,9 @@
 """
 Health Check Route
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, abort, current_app, jsonify, request
 from datetime import datetime
+import hmac
 
 health_bp = Blueprint("health", __name__)
 
@@ -23,3 +24,61 @@ def health_check():
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
     }), 200
+
+
+@health_bp.route("/health/metrics", methods=["GET"])
+def metrics():
+    """
+    Runtime metrics endpoint (cache hit rates etc.)
+
+    内部向け。METRICS_ENABLED が false の場合は 404 を返す。
+    METRICS_TOKEN を設定した場合は Authorization: Bearer <token> が必要
+
+    Returns:
+        JSON response with per-component counters
+    """
+    if not current_app.config["METRICS_ENABLED"]:
+        abort(404)
+
+    token = current_app.config["METRICS_TOKEN"]
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(), f"Bearer {token}".encode()
+    ):
+        return jsonify({
+            "success": False,
+            "error": {
+                "code": "UNAUTHORIZED",
+                "message": "認証が必要です"
+            }
+        }), 401
+
+    from app.compression import response_compressor
+    from app.preload import worker_preloader
+    from app.services import ai_analysis_worker
+    from app.services import get_gemini_service
+    from app.services.calculator import result_cache_stats
+    from app.services.payload_cache import payload_cache_stats
+    from app.services.rate_limit_storage import rate_limit_stats
+    from app.services.session_reaper import session_reaper
+    from app.services.sql_profiler import sql_profiler
+
+    return jsonify({
+        "success": True,
+        "data": {
+            "calculation_cache": result_cache_stats(),
+            "calculation_payload_cache": payload_cache_stats(),
+            "gemini": get_gemini_service().stats(),
+            "gemini_cache": get_gemini_service().cache_stats(),
+            "ai_analysis_worker": ai_analysis_worker.stats(),
+            "session_reaper": session_reaper.stats(),
+            "sql": sql_profiler.stats(),
+            "session_store": (
+                current_app.session_interface.stats()
+                if hasattr(current_app.session_interface, "stats") else None
+            ),
+            "rate_limit": rate_limit_stats(current_app),
+            "compression": response_compressor.stats(),
+            "startup": worker_preloader.stats(),
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    }), 200
@@ -5,13 +5,16 @@ from flask import Blueprint, jsonify, request
 import uuid
 from datetime import datetime, timedelta
 
+from app.database import first_with_primary_fallback, read_replica
 from app.extensions import db
 from app.models import Session
+from app.services.sql_profiler import query_budget
 
 session_bp = Blueprint("session", __name__)
 
 
 @session_bp.route("/session", methods=["POST"])
+@query_budget(2)
 def create_session():
     """
     Create a new session
@@ -62,6 +65,8 @@ def create_session():
 
 
 @session_bp.route("/session/<session_id>", methods=["GET"])
+@query_budget(5)
+@read_replica
 def get_session(session_id):
     """
     Get session information
@@ -73,7 +78,9 @@ def get_session(session_id):
         JSON response with session data
     """
     try:
-        session = Session.query.filter_by(session_id=session_id).first()
+        session = first_with_primary_fallback(
+            lambda: Session.query.filter_by(session_id=session_id).first()
+        )
 
         if not session:
             return jsonify({
@@ -114,6 +121,7 @@ def get_session(session_id):
 
 
 @session_bp.route("/session/<session_id>", methods=["DELETE"])
+@query_budget(1)
 def delete_session(session_id):
     """
     Delete a session and all associated data
@@ -125,9 +133,11 @@ def delete_session(session_id):
         JSON response
     """
     try:
-        session = Session.query.filter_by(session_id=session_id).first()
+        # Delete session without loading it or its related data
+        deleted = Session.delete_sessions([session_id])
 
-        if not session:
+        if not deleted:
+            db.session.rollback()
             return jsonify({
                 "success": False,
                 "error": {
@@ -136,8 +146,6 @@ def delete_session(session_id):
                 }
             }), 404
 
-        # Delete session (cascade will delete related data)
-        db.session.delete(session)
         db.session.commit()
 
         return jsonify({
@@ -3,5 +3,17 @@ Services
 """
 from app.services.calculator import LifePlanCalculator
 from app.services.gemini_service import GeminiService, get_gemini_service
+from app.services.ai_worker import (
+    AIAnalysisWorker,
+    ai_analysis_worker,
+    run_gemini_analysis,
+)
 
-__all__ = ["LifePlanCalculator", "GeminiService", "get_gemini_service"]
+__all__ = [
+    "LifePlanCalculator",
+    "GeminiService",
+    "get_gemini_service",
+    "AIAnalysisWorker",
+    "ai_analysis_worker",
+    "run_gemini_analysis",
+]
@@ -0,0 +1,198 @@
+"""
+Background AI Analysis Worker
+
+/calculate の非同期AI分析モード用。計算結果とルールベースの分析を先に返し、
+Gemini による分析はバックグラウンドスレッドで実行して
+Calculation.ai_analysis に書き戻す。
+
+- スレッドプールはプロセスで1つ（init_app を繰り返しても作り直さない）。終了時に停止する
+- 待ち行列は AI_ANALYSIS_MAX_QUEUE 件まで。満杯の場合は登録せず、
+  呼び出し側がルールベースの分析のまま確定する
+"""
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask import Flask, current_app
+
+# Calculation.ai_status の値
+AI_STATUS_PENDING = "pending"
+AI_STATUS_COMPLETED = "completed"
+AI_STATUS_FAILED = "failed"
+
+
+def run_gemini_analysis(
+    user_info: Dict, calculation_result: Dict, deadline: Optional[float] = None
+) -> Dict:
+    """
+    Gemini でAI分析を実行し、保存用の ai_analysis を作成
+
+    Args:
+        user_info: ユーザー入力
+        calculation_result: 計算結果
+        deadline: 分析を終える期限（time.monotonic()。None の場合は GEMINI_TIMEOUT）
+
+    Returns:
+        ai_analysis の辞書
+    """
+    from app.services.gemini_service import get_gemini_service
+
+    analysis = get_gemini_service().analyze_life_plan(user_info, calculation_result, deadline=deadline)
+    return {
+        "risk_factors": analysis.get("risk_factors", []),
+        "suggestions": analysis.get("suggestions", []),
+        "advice_message": analysis.get("advice_message", ""),
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        # 未設定だけでなく、タイムアウト・ブレーカー・同時実行数の制限による
+        # ルールベースの分析も fallback として記録する
+        "model_version": "fallback" if analysis.get("fallback") else "gemini",
+    }
+
+
+class AIAnalysisWorker:
+    """Gemini分析をバックグラウンドで実行するワーカー"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = 0
+        self._max_jobs = 0
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._shutdown_registered = False
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Args:
+            app: Flaskアプリ（AI_ANALYSIS_WORKERS = 0 の場合は同期実行）
+        """
+        max_workers = app.config.get("AI_ANALYSIS_WORKERS", 4)
+        with self._lock:
+            if max_workers != self._max_workers:
+                # 同じスレッド数なら既存のプールを使い続ける（アプリを作り直すテストなど）
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False)
+                self._executor = None
+                if max_workers > 0:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max_workers,
+                        thread_name_prefix="ai-analysis",
+                    )
+                self._max_workers = max_workers
+            # 実行中 + 待ち行列のジョブ数の上限
+            self._max_jobs = max_workers + app.config.get("AI_ANALYSIS_MAX_QUEUE", 32)
+            if not self._shutdown_registered:
+                atexit.register(self.shutdown)
+                self._shutdown_registered = True
+        app.extensions["ai_analysis_worker"] = self
+
+    def shutdown(self) -> None:
+        """スレッドプールを停止（登録済みのジョブは最後まで実行する）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._max_workers = 0
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def submit(self, calculation_id: str, user_info: Dict, calculation_result: Dict) -> bool:
+        """
+        AI分析ジョブを登録
+
+        呼び出し前に Calculation（ai_status = pending）がコミット済みであること。
+
+        Returns:
+            登録できたら True。待ち行列が満杯の場合は False（ジョブは実行しない）
+        """
+        event = threading.Event()
+        with self._lock:
+            executor = self._executor
+            if executor is not None and len(self._pending) >= self._max_jobs:
+                self.rejected += 1
+                return False
+            self._pending[calculation_id] = event
+
+        app = current_app._get_current_object()
+        if executor is None:
+            self._run(app, calculation_id, user_info, calculation_result, event)
+        else:
+            executor.submit(
+                self._run, app, calculation_id, user_info, calculation_result, event
+            )
+        return True
+
+    def stats(self) -> Dict:
+        """スレッド数・実行中と待ち行列のジョブ数・待ち行列が満杯で登録しなかった数"""
+        with self._lock:
+            return {
+                "workers": self._max_workers,
+                "max_jobs": self._max_jobs,
+                "jobs": len(self._pending),
+                "rejected": self.rejected,
+            }
+
+    def wait(self, calculation_id: str, timeout: float) -> bool:
+        """
+        AI分析の完了を待つ
+
+        このプロセスで実行中のジョブは完了イベントで即座に起こされる。
+        他のプロセスのジョブの場合は timeout だけ待つ（呼び出し側でDBを再確認する）。
+
+        Returns:
+            このプロセスのジョブが完了していれば True
+        """
+        with self._lock:
+            event = self._pending.get(calculation_id)
+
+        if event is None:
+            time.sleep(timeout)
+            return False
+
+        return event.wait(timeout)
+
+    def _run(
+        self,
+        app: Flask,
+        calculation_id: str,
+        user_info: Dict,
+        calculation_result: Dict,
+        event: threading.Event,
+    ) -> None:
+        """ジョブ本体（ワーカースレッドで実行）"""
+        from app.extensions import db
+        from app.models import Calculation
+
+        try:
+            with app.app_context():
+                try:
+                    ai_analysis = run_gemini_analysis(user_info, calculation_result)
+                    status = AI_STATUS_COMPLETED
+                except Exception as e:
+                    app.logger.error(f"AI analysis job error ({calculation_id}): {str(e)}")
+                    ai_analysis = None
+                    status = AI_STATUS_FAILED
+
+                try:
+                    calculation = Calculation.query.filter_by(
+                        calculation_id=calculation_id
+                    ).first()
+                    if calculation is not None:
+                        if ai_analysis is not None:
+                            calculation.ai_analysis = ai_analysis
+                        calculation.ai_status = status
+                        db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    app.logger.error(f"AI analysis save error ({calculation_id}): {str(e)}")
+        finally:
+            event.set()
+            with self._lock:
+                self._pending.pop(calculation_id, None)
+
+
+# Singleton instance (initialized in create_app)
+ai_analysis_worker = AIAnalysisWorker()
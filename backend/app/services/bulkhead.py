@@ -0,0 +1,107 @@
+"""
+Bulkhead (concurrency limiter)
+
+外部API呼び出しなどの同時実行数を制限する。
+
+- 同時実行数が max_concurrent に達している場合は、最大 max_queue 件まで
+  空きを待つ（最大 queue_timeout 秒）
+- 待ち行列も満杯の場合は待たずに拒否する（呼び出し側ですぐにフォールバックする）
+- 待ち時間（キュー滞留時間）・拒否数を記録する
+"""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class Bulkhead:
+    """スレッドセーフな同時実行数の制限"""
+
+    def __init__(self, max_concurrent: int, max_queue: int = 0, queue_timeout: float = 0.0):
+        """
+        Args:
+            max_concurrent: 同時実行数の上限（0 以下で無制限）
+            max_queue: 空きを待てる呼び出しの数（0 で待たずに拒否）
+            queue_timeout: 空きを待つ最大時間（秒）
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._condition = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.peak_active = 0
+        self.acquired = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        実行枠を取得
+
+        Args:
+            timeout: 空きを待つ最大時間（秒）。queue_timeout より短い場合に指定する
+
+        Returns:
+            取得できた場合は True（呼び出し側で必ず release() する）。
+            待ち行列が満杯、または queue_timeout 秒以内に空かなかった場合は False
+        """
+        with self._condition:
+            if self.max_concurrent <= 0 or self.active < self.max_concurrent:
+                self._enter()
+                return True
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+
+            self.waiting += 1
+            self.queued += 1
+            started = time.monotonic()
+            wait = self.queue_timeout if timeout is None else min(self.queue_timeout, timeout)
+            deadline = started + wait
+            try:
+                while self.active >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timed_out += 1
+                        return False
+                    self._condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+                waited = time.monotonic() - started
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            self._enter()
+            return True
+
+    def release(self) -> None:
+        """実行枠を返却"""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+
+    def _enter(self) -> None:
+        self.active += 1
+        self.acquired += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def stats(self) -> Dict:
+        """実行中・待機中の数、拒否数、キュー滞留時間"""
+        with self._condition:
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "waiting": self.waiting,
+                "peak_active": self.peak_active,
+                "acquired": self.acquired,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_queue_wait_ms": (
+                    round(self.wait_seconds * 1000 / self.queued, 3) if self.queued else None
+                ),
+                "max_queue_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
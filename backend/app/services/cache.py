@@ -0,0 +1,269 @@
+"""
+Cache Utilities
+
+- LRUCache: スレッドセーフなプロセス内LRU（TTL・推定メモリ使用量の上限付き）
+- InMemorySharedBackend / RedisSharedBackend: 共有キャッシュのバックエンド
+- TwoTierCache: プロセス内LRU → 共有バックエンドの2段キャッシュ
+"""
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+def deep_sizeof(value: Any) -> int:
+    """dict / list / スカラーからなる値のおおよそのメモリ使用量（バイト）"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k) + deep_sizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_sizeof(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """TTL付きのスレッドセーフなLRUキャッシュ"""
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Optional[Callable[[Any], int]] = None,
+    ):
+        """
+        Args:
+            max_entries: 最大エントリ数（超えたら最も古いものから削除）
+            ttl: 有効期間（秒）。None の場合は期限なし
+            max_bytes: 推定メモリ使用量の上限（バイト）。None の場合は上限なし
+            size_of: 値のサイズ（バイト）を推定する関数（default: deep_sizeof）
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size_of = size_of or deep_sizeof
+        self._entries: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Any) -> Optional[Any]:
+        """値を取得（期限切れ・未登録の場合は None）"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                self.current_bytes -= size
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        """値を登録"""
+        if self.max_entries <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        size = self.size_of(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self.current_bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.current_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted[2]
+                self.evictions += 1
+
+    def delete(self, key: Any) -> None:
+        """エントリを削除（未登録なら何もしない）"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.current_bytes -= entry[2]
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict:
+        """ヒット率などの統計"""
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.max_bytes is not None:
+            stats["bytes"] = self.current_bytes
+            stats["max_bytes"] = self.max_bytes
+        return stats
+
+
+class InMemorySharedBackend:
+    """
+    共有キャッシュのローカル実装（テスト・開発用）
+
+    RedisSharedBackend と同じインターフェースで、プロセス内の辞書に保存する。
+    """
+
+    name = "memory"
+
+    def __init__(self):
+        self._values: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._values[key] = (value, expires_at)
+
+
+class RedisSharedBackend:
+    """Redisを使った共有キャッシュ（redisパッケージが必要）"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=0.2, socket_connect_timeout=0.2
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._client.set(key, value, ex=int(ttl) if ttl else None)
+
+
+def create_shared_backend(kind: Optional[str], redis_url: Optional[str] = None):
+    """
+    設定値から共有キャッシュのバックエンドを作成
+
+    Args:
+        kind: "redis" / "memory" / None（共有キャッシュなし）
+        redis_url: Redis の接続URL（kind が "redis" の場合）
+    """
+    if kind == "redis":
+        return RedisSharedBackend(redis_url)
+    if kind == "memory":
+        return InMemorySharedBackend()
+    return None
+
+
+class TwoTierCache:
+    """
+    プロセス内LRU（1段目）と共有バックエンド（2段目）の2段キャッシュ
+
+    値はJSONにシリアライズして共有バックエンドに保存する。
+    共有バックエンドのエラーはキャッシュミスとして扱い、呼び出し元には伝えない。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600,
+        shared_backend=None,
+        key_prefix: str = "",
+    ):
+        self.local = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.shared = shared_backend
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.shared_errors = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self.shared is None:
+            return value
+
+        try:
+            raw = self.shared.get(self.key_prefix + key)
+        except Exception:
+            with self._lock:
+                self.shared_errors += 1
+            return None
+
+        with self._lock:
+            if raw is None:
+                self.shared_misses += 1
+                return None
+            self.shared_hits += 1
+
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self.shared is None:
+            return
+
+        try:
+            self.shared.set(
+                self.key_prefix + key,
+                json.dumps(value, ensure_ascii=False),
+                ttl=self.ttl,
+            )
+        except Exception:
+            with self._lock:
+                self.shared_errors += 1
+
+    def stats(self) -> Dict:
+        """1段目・2段目のヒット/ミス数"""
+        local = self.local.stats()
+        return {
+            "local": local,
+            "shared": {
+                "backend": self.shared.name if self.shared is not None else None,
+                "hits": self.shared_hits,
+                "misses": self.shared_misses,
+                "errors": self.shared_errors,
+            },
+            "hits": local["hits"] + self.shared_hits,
+            "misses": self.shared_misses if self.shared is not None else local["misses"],
+        }
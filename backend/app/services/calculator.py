@@ -1,8 +1,89 @@
 """
 Life Plan Calculation Service
 """
+import math
+import sys
 from datetime import datetime
-from typing import Dict, List, Optional
+from fractions import Fraction
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.cache import LRUCache, deep_sizeof
+from app.services.monte_carlo import run_monte_carlo
+from app.services.simulation import NOT_DEPLETED, simulate_constant_flows
+
+# sweep() で変化させられる入力パラメータ
+SWEEP_PARAMETERS = (
+    "expense_reduction",  # 生活費の削減率 (0.0-1.0)
+    "additional_income",  # 月間の追加収入（円）
+    "monthly_expenses",
+    "monthly_support",
+    "total_assets",
+)
+
+# solve() で求める改善策
+SOLVE_LEVERS = (
+    "expense_reduction",  # 月間生活費の削減額（円）
+    "additional_income",  # 月間の追加収入（円）
+)
+
+
+def _bisect_minimum(
+    is_enough: Callable[[int], bool],
+    low: int,
+    high: int,
+    tolerance: int,
+    max_iterations: int,
+) -> int:
+    """
+    is_enough(low) が False、is_enough(high) が True の区間を二分法で狭め、
+    条件を満たす最小の金額を上側から tolerance 以内で求める
+
+    Returns:
+        条件を満たすことを確認済みの金額
+    """
+    iterations = 0
+    while high - low > tolerance and iterations < max_iterations:
+        middle = (low + high) // 2
+        if is_enough(middle):
+            high = middle
+        else:
+            low = middle
+        iterations += 1
+    return high
+
+
+def _estimate_result_size(result: Dict) -> int:
+    """計算結果のメモリ使用量を推定（年次データは1件分 × 件数で近似）"""
+    yearly_data = result["yearly_data"]
+    size = deep_sizeof({k: v for k, v in result.items() if k != "yearly_data"})
+    if yearly_data:
+        size += sys.getsizeof(yearly_data) + deep_sizeof(yearly_data[0]) * len(yearly_data)
+    return size
+
+
+# 計算結果のメモ化（configure_result_cache で設定を変更）
+_result_cache = LRUCache(max_entries=1024, max_bytes=32 * 1024 * 1024, size_of=_estimate_result_size)
+
+
+def configure_result_cache(max_entries: int, max_bytes: int) -> None:
+    """
+    計算結果キャッシュの上限を設定（既存のエントリは破棄）
+
+    Args:
+        max_entries: 最大エントリ数（0 でキャッシュ無効）
+        max_bytes: 推定メモリ使用量の上限（バイト）
+    """
+    global _result_cache
+    _result_cache = LRUCache(
+        max_entries=max_entries, max_bytes=max_bytes, size_of=_estimate_result_size
+    )
+
+
+def result_cache_stats() -> Dict:
+    """計算結果キャッシュのヒット率・メモリ使用量"""
+    return _result_cache.stats()
 
 
 class LifePlanCalculator:
@@ -28,82 +109,382 @@ class LifePlanCalculator:
         self.monthly_support = monthly_support
         self.current_year = datetime.now().year
 
-    def calculate(self, simulation_years: int = 50) -> Dict:
+    def calculate(self, simulation_years: int = 50, include_monthly_data: bool = False) -> Dict:
         """
         ライフプランを計算
 
+        残高は月単位で計算し、年次データには各年の12月末の残高を記録する。
+
         Args:
             simulation_years: シミュレーション年数
+            include_monthly_data: 月次の残高推移（monthly_data）を含めるか
 
         Returns:
             計算結果の辞書
         """
-        yearly_data = []
-        balance = self.total_assets
-        depletion_year = None
-        depletion_age = None
-
-        # 年次ごとに計算
-        for year_offset in range(simulation_years):
-            year = self.current_year + year_offset
-            age = self.current_age + year_offset
+        return self.calculate_many([self], simulation_years, include_monthly_data)[0]
+
+    @classmethod
+    def calculate_many(
+        cls,
+        calculators: List["LifePlanCalculator"],
+        simulation_years: int = 50,
+        include_monthly_data: bool = False,
+    ) -> List[Dict]:
+        """
+        複数の計算を1回のベクトル演算でまとめて実行
 
-            # 年間収支の計算
-            annual_income = self.monthly_support * 12
-            annual_expenses = self.monthly_expenses * 12
-            net_change = annual_income - annual_expenses
+        Args:
+            calculators: 計算対象のLifePlanCalculatorのリスト
+            simulation_years: シミュレーション年数（全件共通）
+            include_monthly_data: 月次の残高推移（monthly_data）を含めるか
 
-            # 残高の更新
-            balance += net_change
+        Returns:
+            calculate() と同じ形式の計算結果のリスト（入力と同じ順序）。
+            結果はキャッシュと共有されるため、トップレベル以外は変更しないこと
+        """
+        results: List[Optional[Dict]] = []
+        misses = []
+        for calculator in calculators:
+            cached = _result_cache.get(
+                calculator._cache_key(simulation_years, include_monthly_data)
+            )
+            results.append(dict(cached) if cached is not None else None)
+            if cached is None:
+                misses.append(calculator)
+
+        if misses:
+            arrays = simulate_constant_flows(
+                total_assets=[c.total_assets for c in misses],
+                monthly_expenses=[c.monthly_expenses for c in misses],
+                monthly_support=[c.monthly_support for c in misses],
+                simulation_years=simulation_years,
+            )
+            computed = iter(
+                calculator._build_result(
+                    arrays, index, simulation_years, include_monthly_data
+                )
+                for index, calculator in enumerate(misses)
+            )
+            for position, result in enumerate(results):
+                if result is None:
+                    result = next(computed)
+                    _result_cache.set(
+                        calculators[position]._cache_key(
+                            simulation_years, include_monthly_data
+                        ),
+                        result,
+                    )
+                    results[position] = dict(result)
+
+        return results
+
+    def _cache_key(self, simulation_years: int, include_monthly_data: bool) -> tuple:
+        """計算結果キャッシュのキー（年をまたぐと別のキーになる）"""
+        return (
+            self.current_age,
+            self.monthly_expenses,
+            self.total_assets,
+            self.monthly_support,
+            simulation_years,
+            self.current_year,
+            include_monthly_data,
+        )
 
-            # 年次データを記録
-            yearly_data.append({
-                "year": year,
-                "age": age,
-                "balance": max(0, balance),  # マイナスは0とする
+    def _build_result(
+        self,
+        arrays: Dict,
+        index: int,
+        simulation_years: int,
+        include_monthly_data: bool = False,
+    ) -> Dict:
+        """シミュレーション配列の index 行目から計算結果の辞書を組み立てる"""
+        balances = arrays["balances"][index].tolist()
+        annual_income = arrays["annual_income"][index].item()
+        annual_expenses = arrays["annual_expenses"][index].item()
+        net_change = arrays["net_change"][index].item()
+
+        # 年次データ
+        yearly_data = [
+            {
+                "year": self.current_year + year_offset,
+                "age": self.current_age + year_offset,
+                "balance": balance,
                 "annual_income": annual_income,
                 "annual_expenses": annual_expenses,
                 "net_change": net_change,
-            })
-
-            # 資金枯渇の検出
-            if balance <= 0 and depletion_year is None:
-                depletion_year = year
-                depletion_age = age
+            }
+            for year_offset, balance in enumerate(balances)
+        ]
 
-            # 残高がマイナスの場合、それ以降はゼロのまま
-            if balance <= 0:
-                balance = 0
-
-        # サマリーの計算
-        total_income = sum(d["annual_income"] for d in yearly_data)
-        total_expenses = sum(d["annual_expenses"] for d in yearly_data)
-        net_balance = total_income - total_expenses
+        # 資金枯渇の検出
+        depletion_year = None
+        depletion_age = None
+        depletion_index = int(arrays["depletion_index"][index])
+        if depletion_index != NOT_DEPLETED:
+            depletion_year = self.current_year + depletion_index
+            depletion_age = self.current_age + depletion_index
 
         # 平均月間残高の計算
         avg_monthly_balance = int(
-            sum(d["balance"] for d in yearly_data) / len(yearly_data) / 12
+            arrays["balance_sum"][index].item() / len(yearly_data) / 12
         )
 
-        # 資金枯渇までの年数
+        # 資金枯渇までの年数・月数
         years_until_depletion = None
         if depletion_year:
             years_until_depletion = depletion_year - self.current_year
 
-        return {
+        months_until_depletion = None
+        depletion_month_index = int(arrays["depletion_month_index"][index])
+        if depletion_month_index != NOT_DEPLETED:
+            months_until_depletion = depletion_month_index
+
+        result = {
             "depletion_age": depletion_age,
             "depletion_year": depletion_year,
             "years_until_depletion": years_until_depletion,
+            "months_until_depletion": months_until_depletion,
             "total_years_simulated": simulation_years,
             "yearly_data": yearly_data,
             "summary": {
-                "total_income": total_income,
-                "total_expenses": total_expenses,
-                "net_balance": net_balance,
+                "total_income": arrays["total_income"][index].item(),
+                "total_expenses": arrays["total_expenses"][index].item(),
+                "net_balance": arrays["net_balance"][index].item(),
                 "average_monthly_balance": avg_monthly_balance,
             },
         }
 
+        # 月次データ（列形式: 月末残高の配列と一定の月間収支）
+        if include_monthly_data:
+            result["monthly_data"] = {
+                "months": simulation_years * 12,
+                "monthly_income": self.monthly_support,
+                "monthly_expenses": self.monthly_expenses,
+                "net_change": arrays["monthly_net_change"][index].item(),
+                "balance": arrays["monthly_balances"][index].tolist(),
+            }
+
+        return result
+
+    def sweep(
+        self,
+        axes: Sequence[Dict],
+        simulation_years: int = 50,
+    ) -> Dict:
+        """
+        1〜2個の入力パラメータを変化させたグリッドを一括計算（what-if分析）
+
+        Args:
+            axes: [{"parameter": SWEEP_PARAMETERS のいずれか, "values": [...]}, ...]
+            simulation_years: シミュレーション年数
+
+        Returns:
+            各グリッド点の資金枯渇年齢・枯渇までの年数の行列
+            （1軸の場合はリスト、2軸の場合は axes[0] × axes[1] の2次元リスト）
+        """
+        grids = np.meshgrid(
+            *[np.asarray(axis["values"], dtype=np.float64) for axis in axes],
+            indexing="ij",
+        )
+        shape = grids[0].shape
+
+        expenses = np.full(shape, float(self.monthly_expenses))
+        support = np.full(shape, float(self.monthly_support))
+        assets = np.full(shape, float(self.total_assets))
+        reduction = np.zeros(shape)
+        additional_income = np.zeros(shape)
+
+        for axis, grid in zip(axes, grids):
+            parameter = axis["parameter"]
+            if parameter == "expense_reduction":
+                reduction = grid
+            elif parameter == "additional_income":
+                additional_income = grid
+            elif parameter == "monthly_expenses":
+                expenses = grid
+            elif parameter == "monthly_support":
+                support = grid
+            elif parameter == "total_assets":
+                assets = grid
+            else:
+                raise ValueError(f"Unknown sweep parameter: {parameter}")
+
+        arrays = simulate_constant_flows(
+            total_assets=assets.ravel(),
+            monthly_expenses=(expenses * (1.0 - reduction)).ravel(),
+            monthly_support=(support + additional_income).ravel(),
+            simulation_years=simulation_years,
+            monthly=False,
+        )
+
+        depletion_index = arrays["depletion_index"].reshape(shape)
+        depleted = depletion_index != NOT_DEPLETED
+        depletion_age = np.where(depleted, self.current_age + depletion_index, -1)
+
+        def to_matrix(values: np.ndarray) -> List:
+            # 枯渇しない点は None
+            return np.where(depleted, values, None).tolist()
+
+        return {
+            "axes": [
+                {"parameter": axis["parameter"], "values": list(axis["values"])}
+                for axis in axes
+            ],
+            "depletion_age": to_matrix(depletion_age),
+            "years_until_depletion": to_matrix(depletion_index),
+            "total_years_simulated": simulation_years,
+        }
+
+    def solve(
+        self,
+        lever: str,
+        target_age: Optional[int] = None,
+        simulation_years: int = 50,
+        monte_carlo: Optional[Dict] = None,
+        max_depletion_probability: float = 0.05,
+        tolerance: int = 100,
+        max_iterations: int = 40,
+    ) -> Dict:
+        """
+        目標年齢まで資金が尽きないために必要な最小の改善額を求める（ゴールシーク）
+
+        月間収支が一定の場合は閉じた式で1円単位の最小額を求める。
+        monte_carlo を指定した場合は、目標年齢までの資金枯渇確率が
+        max_depletion_probability 以下になる最小額を区間の拡大と二分法で求める
+        （同じシードを使うため、金額に対して単調に判定できる）。
+
+        Args:
+            lever: SOLVE_LEVERS のいずれか
+            target_age: この年齢の年末まで残高がプラスであること（None の場合はシミュレーション期間の最後まで）
+            simulation_years: シミュレーション年数（target_age が期間外の場合は延長する）
+            monte_carlo: run_monte_carlo の設定（paths, seed, parameters）
+            max_depletion_probability: 許容する資金枯渇確率（monte_carlo 指定時）
+            tolerance: 二分法で求める金額の精度（円）
+            max_iterations: 二分法の最大評価回数
+
+        Returns:
+            必要な月額と、適用後の資金枯渇年齢など
+        """
+        if lever not in SOLVE_LEVERS:
+            raise ValueError(f"Unknown solve lever: {lever}")
+
+        if target_age is None:
+            required_years = simulation_years
+        else:
+            required_years = target_age - self.current_age + 1
+        horizon = max(simulation_years, required_years)
+        # 支出の削減は生活費全額まで
+        upper_limit = self.monthly_expenses if lever == "expense_reduction" else None
+
+        if monte_carlo is None:
+            method = "closed_form"
+            iterations = 0
+            amount = self._closed_form_amount(required_years)
+            if upper_limit is not None and amount > upper_limit:
+                amount = None
+        else:
+            method = "bisection"
+            iterations = 0
+
+            def is_enough(candidate: int) -> bool:
+                nonlocal iterations
+                iterations += 1
+                probability = self.apply_lever(lever, candidate)._depletion_probability(
+                    required_years, monte_carlo
+                )
+                return probability <= max_depletion_probability
+
+            if is_enough(0):
+                amount = 0
+            else:
+                # 条件を満たす上限を探す（追加収入は倍々で区間を広げる）
+                low = 0
+                high = upper_limit
+                if high is None:
+                    high = max(self._closed_form_amount(required_years), 1000)
+                feasible = is_enough(high)
+                while not feasible and upper_limit is None and iterations < max_iterations:
+                    low, high = high, high * 2
+                    feasible = is_enough(high)
+
+                amount = None
+                if feasible:
+                    amount = _bisect_minimum(
+                        is_enough, low, high, tolerance, max_iterations - iterations
+                    )
+
+        solved = {
+            "lever": lever,
+            "target_age": target_age,
+            "required_years": required_years,
+            "method": method,
+            "iterations": iterations,
+            "feasible": amount is not None,
+            "already_met": amount == 0,
+            "monthly_amount": amount,
+            "total_years_simulated": horizon,
+        }
+        if lever == "expense_reduction" and amount is not None and self.monthly_expenses:
+            solved["expense_reduction_rate"] = round(amount / self.monthly_expenses, 4)
+
+        if amount is not None:
+            applied = self.apply_lever(lever, amount)
+            result = applied.calculate(simulation_years=horizon)
+            solved["depletion_age"] = result["depletion_age"]
+            solved["years_until_depletion"] = result["years_until_depletion"]
+            if monte_carlo is not None:
+                solved["depletion_probability"] = applied._depletion_probability(
+                    required_years, monte_carlo
+                )
+
+        return solved
+
+    def apply_lever(self, lever: str, amount) -> "LifePlanCalculator":
+        """改善策を適用した計算機を作成"""
+        calculator = LifePlanCalculator(
+            age=self.current_age,
+            monthly_expenses=self.monthly_expenses,
+            total_assets=self.total_assets,
+            monthly_support=self.monthly_support,
+        )
+        calculator.current_year = self.current_year
+        if lever == "expense_reduction":
+            calculator.monthly_expenses = self.monthly_expenses - amount
+        else:
+            calculator.monthly_support = self.monthly_support + amount
+        return calculator
+
+    def _closed_form_amount(self, required_years: int) -> int:
+        """
+        月間収支が一定の場合に必要な最小の改善額（円）
+
+        required_years 年（N = 12 × required_years か月）の間、月末残高が
+        プラスであるための条件は 資産 + N × 月間収支 > 0。
+        生活費の削減も追加収入も月間収支を同じだけ改善するので、
+        必要額はどちらも floor(生活費 - 受給額 - 資産 / N) + 1（0未満なら0）。
+        """
+        months = 12 * required_years
+        shortfall = (
+            Fraction(self.monthly_expenses)
+            - Fraction(self.monthly_support)
+            - Fraction(self.total_assets) / months
+        )
+        return max(math.floor(shortfall) + 1, 0)
+
+    def _depletion_probability(self, required_years: int, monte_carlo: Dict) -> float:
+        """モンテカルロで required_years 年以内に資金が枯渇する確率"""
+        summary = run_monte_carlo(
+            age=self.current_age,
+            current_year=self.current_year,
+            monthly_expenses=self.monthly_expenses,
+            total_assets=self.total_assets,
+            monthly_support=self.monthly_support,
+            simulation_years=required_years,
+            **monte_carlo,
+        )
+        return summary["depletion_probability"]
+
     def get_risk_factors(self, result: Dict) -> List[str]:
         """
         リスク要因を分析
@@ -0,0 +1,151 @@
+"""
+Circuit Breaker
+
+外部API（Gemini）の障害・遅延が続いたときに、呼び出しを止めてすぐにフォールバックする。
+
+- closed: 通常どおり呼び出す。失敗（例外・タイムアウト）または遅い呼び出し
+  （slow_call_seconds 以上）が failure_threshold 回続いたら open にする
+- open: 呼び出さない（allow() が False）。reset_timeout 秒後に half_open にする
+- half_open: half_open_max_calls 件だけ試しに呼び出す（プローブ）。
+  すべて成功したら closed、1件でも失敗したら再び open に戻す
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """スレッドセーフなサーキットブレーカー"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        slow_call_seconds: Optional[float] = None,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: open にする連続失敗数（0 以下でブレーカー無効）
+            slow_call_seconds: この秒数以上かかった呼び出しを失敗とみなす（None で判定しない）
+            reset_timeout: open から half_open に移るまでの秒数
+            half_open_max_calls: half_open で許可するプローブ数（すべて成功したら closed）
+            clock: 現在時刻（秒）を返す関数（テスト用）
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+        self.last_opened_at: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        """
+        呼び出してよいか
+
+        True を返した場合、呼び出し側は record_success() / record_failure() /
+        cancel() のいずれかを必ず1回呼ぶ。
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, duration: float) -> None:
+        """呼び出しの成功を記録（slow_call_seconds 以上かかった場合は失敗として扱う）"""
+        if self.slow_call_seconds is not None and duration >= self.slow_call_seconds:
+            with self._lock:
+                self.slow_calls += 1
+            self.record_failure()
+            return
+        with self._lock:
+            self.successes += 1
+            self.consecutive_failures = 0
+            state = self._current_state()
+            if state == HALF_OPEN:
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_max_calls:
+                    self._state = CLOSED
+                    self._probes = 0
+
+    def record_failure(self) -> None:
+        """呼び出しの失敗（例外・タイムアウト）を記録"""
+        with self._lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self._state == HALF_OPEN or (
+                self.failure_threshold > 0
+                and self._state == CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+    def cancel(self) -> None:
+        """allow() で許可された呼び出しを行わなかった場合に呼ぶ（プローブ枠を返す）"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+        return self._state
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probes = 0
+        self._probe_successes = 0
+        self.times_opened += 1
+        self.last_opened_at = datetime.utcnow().isoformat() + "Z"
+
+    def stats(self) -> Dict:
+        """状態・連続失敗数・open になった回数・open 中に拒否した呼び出し数"""
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "slow_call_seconds": self.slow_call_seconds,
+                "reset_timeout": self.reset_timeout,
+                "retry_in": (
+                    round(max(self.reset_timeout - (self._clock() - self._opened_at), 0), 3)
+                    if state == OPEN else None
+                ),
+                "successes": self.successes,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "last_opened_at": self.last_opened_at,
+            }
@@ -1,76 +1,482 @@
 """
 Gemini AI Service
 """
+import hashlib
+import json
 import os
-from typing import Dict, List, Optional
-import google.generativeai as genai
-from flask import current_app
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from flask import Flask, current_app
+
+from app.services.bulkhead import Bulkhead
+from app.services.cache import TwoTierCache, create_shared_backend
+from app.services.circuit_breaker import CircuitBreaker
+
+# Bump when the prompt changes so cached analyses are not reused
+PROMPT_VERSION = 1
+
+ADVISOR_GUIDELINES = """
+## 重要な注意事項
+1. ひきこもりの方の心理的負担に配慮してください
+2. 「すぐに働く」「外に出る」などの急激な変化を強要しないでください
+3. 小さな成功体験を積み重ねることの重要性を伝えてください
+4. 利用可能な社会資源（障害年金、生活保護、支援団体など）の情報も含めてください
+5. 前向きで希望を持てるメッセージにしてください
+"""
+
+# Marks the end of a streamed response on the chunk queue
+_STREAM_END = object()
+
+# Why analyze_life_plan returned the rule-based analysis instead of calling the API
+FALLBACK_REASONS = ("error", "timeout", "circuit_open", "concurrency", "deadline")
+
+# API key passed to genai.configure() in this process. The SDK
+# (google-generativeai, pinned in requirements.txt) keeps a single
+# process-wide default client that every GenerativeModel uses.
+_configured_api_key: Optional[str] = None
+_configure_lock = threading.Lock()
+
+
+def _configure_sdk(genai, api_key: str, app: Flask) -> None:
+    """Configure the SDK's default client, once per API key"""
+    global _configured_api_key
+    with _configure_lock:
+        if _configured_api_key == api_key:
+            return
+        if _configured_api_key is not None:
+            app.logger.error(
+                "GEMINI_API_KEY differs from the key already configured in this process; "
+                "the Gemini SDK has one client per process, so all apps now use the new key"
+            )
+        genai.configure(api_key=api_key)
+        _configured_api_key = api_key
 
 
 class GeminiService:
     """Google Gemini API service for AI-powered analysis"""
 
-    def __init__(self):
-        """Initialize Gemini API"""
-        api_key = current_app.config.get("GEMINI_API_KEY")
+    def __init__(self, app: Optional[Flask] = None):
+        """
+        Initialize Gemini API
+
+        Args:
+            app: Flask app whose config is used (default: current_app)
+        """
+        app = app or current_app._get_current_object()
+        config = app.config
+        api_key = config.get("GEMINI_API_KEY")
         if not api_key or api_key == "your_gemini_api_key_here":
             self.enabled = False
-            current_app.logger.warning("Gemini API key not configured. AI analysis will use fallback mode.")
+            app.logger.warning("Gemini API key not configured. AI analysis will use fallback mode.")
         else:
             self.enabled = True
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel(
-                current_app.config.get("GEMINI_MODEL", "gemini-pro")
+            # Imported here: the SDK takes ~0.5s to load and is only needed with a key
+            import google.generativeai as genai
+
+            _configure_sdk(genai, api_key, app)
+            self.model_name = config.get("GEMINI_MODEL", "gemini-pro")
+            self.model = genai.GenerativeModel(self.model_name)
+            self.temperature = config.get("GEMINI_TEMPERATURE", 0.7)
+            self.max_tokens = config.get("GEMINI_MAX_TOKENS", 2048)
+
+        # Analysis cache (in-process LRU + optional shared backend)
+        self.cache = None
+        self.cache_amount_digits = config.get("GEMINI_CACHE_AMOUNT_DIGITS", 2)
+        if self.enabled and config.get("GEMINI_CACHE_ENABLED", True):
+            self.cache = TwoTierCache(
+                max_entries=config.get("GEMINI_CACHE_MAX_ENTRIES", 1024),
+                ttl=config.get("GEMINI_CACHE_TTL", 3600),
+                shared_backend=create_shared_backend(
+                    config.get("GEMINI_CACHE_SHARED_BACKEND"),
+                    config.get("REDIS_URL"),
+                ),
+                key_prefix="arukuwa:gemini:",
             )
-            self.temperature = current_app.config.get("GEMINI_TEMPERATURE", 0.7)
-            self.max_tokens = current_app.config.get("GEMINI_MAX_TOKENS", 2048)
+
+        # Concurrent API calls per process (request threads + background workers).
+        # Callers that cannot get a slot in time get the rule-based analysis.
+        self.bulkhead = Bulkhead(
+            max_concurrent=config.get("GEMINI_MAX_CONCURRENCY", 4),
+            max_queue=config.get("GEMINI_MAX_QUEUE", 8),
+            queue_timeout=config.get("GEMINI_QUEUE_TIMEOUT", 2.0),
+        )
+
+        # Time limits: the SDK call has no timeout, so it runs on its own thread
+        # and the caller stops waiting when the budget runs out. An abandoned
+        # call keeps its bulkhead slot until the upstream actually returns.
+        self.timeout = config.get("GEMINI_TIMEOUT", 20.0)
+        self.min_budget = config.get("GEMINI_MIN_BUDGET", 0.5)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.bulkhead.max_concurrent if self.bulkhead.max_concurrent > 0 else 32,
+            thread_name_prefix="gemini-call",
+        )
+
+        # Stop calling the API after repeated failures or slow calls
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.get("GEMINI_BREAKER_FAILURES", 5),
+            slow_call_seconds=config.get("GEMINI_BREAKER_SLOW_CALL", 8.0),
+            reset_timeout=config.get("GEMINI_BREAKER_RESET_TIMEOUT", 30.0),
+            half_open_max_calls=config.get("GEMINI_BREAKER_HALF_OPEN_CALLS", 1),
+        )
+
+        # API call accounting (for estimating what the cache saves)
+        self._stats_lock = threading.Lock()
+        self.api_calls = 0
+        self.api_seconds = 0.0
+        self.fallbacks = {reason: 0 for reason in FALLBACK_REASONS}
 
     def analyze_life_plan(
         self,
         user_info: Dict,
-        calculation_result: Dict
+        calculation_result: Dict,
+        deadline: Optional[float] = None,
     ) -> Dict:
         """
         Analyze life plan using Gemini API
 
+        Falls back to the rule-based analysis when the API fails, is slower
+        than the remaining budget, is rejected by the circuit breaker, or no
+        concurrency slot is free in time.
+
         Args:
             user_info: User input data (age, expenses, assets, etc.)
             calculation_result: Calculation results
+            deadline: time.monotonic() by which the analysis must be ready
+                (default: GEMINI_TIMEOUT from now)
 
         Returns:
             Dictionary containing:
             - risk_factors: List of identified risks
             - suggestions: List of improvement suggestions
             - advice_message: Personalized advice message
+            - fallback: True if the rule-based analysis was used instead of
+              the API (only present in that case)
         """
         if not self.enabled:
             return self._fallback_analysis(user_info, calculation_result)
 
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_info, calculation_result)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
             prompt = self._build_prompt(user_info, calculation_result)
+        except Exception as e:
+            current_app.logger.error(f"Gemini prompt error: {str(e)}")
+            return self._fallback(user_info, calculation_result, "error")
+
+        budget = self.timeout
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+        if budget < self.min_budget:
+            return self._fallback(user_info, calculation_result, "deadline")
+
+        if not self.breaker.allow():
+            return self._fallback(user_info, calculation_result, "circuit_open")
+
+        queued = time.monotonic()
+        if not self.bulkhead.acquire(timeout=budget - self.min_budget):
+            self.breaker.cancel()
+            current_app.logger.warning("Gemini API concurrency limit reached, using fallback analysis")
+            return self._fallback(user_info, calculation_result, "concurrency")
+        budget -= time.monotonic() - queued
+
+        started = time.monotonic()
+        try:
+            future = self._executor.submit(self._generate, prompt)
+        except Exception:
+            self.bulkhead.release()
+            self.breaker.cancel()
+            raise
+        future.add_done_callback(lambda _: self.bulkhead.release())
+
+        try:
+            response_text = future.result(timeout=budget)
+        except FutureTimeoutError:
+            self.breaker.record_failure()
+            current_app.logger.warning(f"Gemini API did not respond within {budget:.2f}s, using fallback analysis")
+            return self._fallback(user_info, calculation_result, "timeout")
+        except Exception as e:
+            self.breaker.record_failure()
+            current_app.logger.error(f"Gemini API error: {str(e)}")
+            import traceback
+            current_app.logger.error(f"Traceback: {traceback.format_exc()}")
+            return self._fallback(user_info, calculation_result, "error")
+
+        elapsed = time.monotonic() - started
+        self.breaker.record_success(elapsed)
+        with self._stats_lock:
+            self.api_calls += 1
+            self.api_seconds += elapsed
+
+        # Log the raw response for debugging
+        current_app.logger.info(f"Gemini API raw response: {response_text}")
+
+        # Parse response
+        analysis = self._parse_response(response_text)
+        # Don't cache responses that could not be parsed
+        if cache_key is not None and (analysis["risk_factors"] or analysis["suggestions"]):
+            self.cache.set(cache_key, analysis)
+        return analysis
+
+    def _generate(self, prompt: str) -> str:
+        """Call the model (runs on the gemini-call executor)"""
+        response = self.model.generate_content(
+            prompt,
+            generation_config={
+                "temperature": self.temperature,
+                "max_output_tokens": self.max_tokens,
+            }
+        )
+        return response.text
+
+    def stream_life_plan(
+        self,
+        user_info: Dict,
+        calculation_result: Dict,
+        question: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Analyze life plan, yielding the advice text while it is generated
+
+        Same limits and fallbacks as analyze_life_plan (cache, deadline,
+        circuit breaker, bulkhead). The deadline covers the whole stream.
+
+        Args:
+            question: the user's own question (answers are not cached)
+            deadline: time.monotonic() by which the stream must finish
+                (default: GEMINI_TIMEOUT from now)
+
+        Yields:
+            ("token", str) for each piece of the advice message, then once
+            ("result", {"analysis": {...}, "model_version": "gemini" | "fallback"}).
+            If the stream fails after tokens were yielded, ("reset", None) comes
+            before the fallback result: the tokens so far are not part of it.
+        """
+        if not self.enabled:
+            yield "result", {
+                "analysis": self._fallback_analysis(user_info, calculation_result),
+                "model_version": "fallback",
+            }
+            return
+
+        cache_key = None
+        if self.cache is not None and not question:
+            cache_key = self._cache_key(user_info, calculation_result)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield "result", {"analysis": cached, "model_version": "gemini"}
+                return
+
+        reason = None
+        try:
+            prompt = self._build_prompt(user_info, calculation_result, question=question, stream=True)
+        except Exception as e:
+            current_app.logger.error(f"Gemini prompt error: {str(e)}")
+            reason = "error"
+
+        budget = self.timeout
+        if deadline is not None:
+            budget = min(budget, deadline - time.monotonic())
+        if reason is None and budget < self.min_budget:
+            reason = "deadline"
+        if reason is None and not self.breaker.allow():
+            reason = "circuit_open"
+        queued = time.monotonic()
+        if reason is None and not self.bulkhead.acquire(timeout=budget - self.min_budget):
+            self.breaker.cancel()
+            current_app.logger.warning("Gemini API concurrency limit reached, using fallback analysis")
+            reason = "concurrency"
+        if reason is not None:
+            yield "result", {
+                "analysis": self._fallback(user_info, calculation_result, reason),
+                "model_version": "fallback",
+            }
+            return
+        stream_deadline = queued + budget
+
+        chunks: "queue.Queue" = queue.Queue()
+        stop = threading.Event()
+        started = time.monotonic()
+        try:
+            future = self._executor.submit(self._generate_stream, prompt, chunks, stop)
+        except Exception:
+            self.bulkhead.release()
+            self.breaker.cancel()
+            raise
+        future.add_done_callback(lambda _: self.bulkhead.release())
+
+        text = ""
+        forwarded = 0
+        first_chunk = None
+        settled = False
+        try:
+            while True:
+                try:
+                    chunk = chunks.get(timeout=max(stream_deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    self.breaker.record_failure()
+                    settled = True
+                    current_app.logger.warning(
+                        f"Gemini API stream did not finish within {budget:.2f}s, using fallback analysis"
+                    )
+                    reason = "timeout"
+                    break
+                if isinstance(chunk, Exception):
+                    self.breaker.record_failure()
+                    settled = True
+                    current_app.logger.error(f"Gemini API error: {str(chunk)}")
+                    reason = "error"
+                    break
+                if chunk is _STREAM_END:
+                    settled = True
+                    break
+                if first_chunk is None:
+                    first_chunk = time.monotonic() - started
+                text += chunk
+                # Forward the advice text only, up to the trailing JSON block
+                end = _advice_text_end(text)
+                if end > forwarded:
+                    yield "token", text[forwarded:end]
+                    forwarded = end
+        finally:
+            # Stop reading the upstream stream; if the client went away mid-stream
+            # (GeneratorExit), give back the circuit breaker permit unrecorded
+            stop.set()
+            if not settled:
+                self.breaker.cancel()
+
+        if reason is not None:
+            if forwarded:
+                yield "reset", None
+            yield "result", {
+                "analysis": self._fallback(user_info, calculation_result, reason),
+                "model_version": "fallback",
+            }
+            return
+
+        elapsed = time.monotonic() - started
+        # Slow-call detection uses the time to the first chunk (a long answer is not slow)
+        self.breaker.record_success(first_chunk if first_chunk is not None else elapsed)
+        with self._stats_lock:
+            self.api_calls += 1
+            self.api_seconds += elapsed
+
+        analysis = self._parse_stream_response(text)
+        if cache_key is not None and (analysis["risk_factors"] or analysis["suggestions"]):
+            self.cache.set(cache_key, analysis)
+        yield "result", {"analysis": analysis, "model_version": "gemini"}
+
+    def _generate_stream(self, prompt: str, chunks: "queue.Queue", stop: threading.Event) -> None:
+        """Call the model with stream=True and put each chunk's text on the queue (runs on the executor)"""
+        try:
             response = self.model.generate_content(
                 prompt,
                 generation_config={
                     "temperature": self.temperature,
                     "max_output_tokens": self.max_tokens,
-                }
+                },
+                stream=True,
             )
+            for chunk in response:
+                if stop.is_set():
+                    return
+                chunks.put(chunk.text)
+            chunks.put(_STREAM_END)
+        except Exception as e:
+            chunks.put(e)
+
+    def _parse_stream_response(self, response_text: str) -> Dict:
+        """Parse a streamed response (advice text followed by a JSON block)"""
+        end = _advice_text_end(response_text, final=True)
+        advice = response_text[:end].strip()
+        analysis = self._parse_response(response_text[end:])
+        if advice:
+            analysis["advice_message"] = advice
+        return analysis
+
+    def _fallback(self, user_info: Dict, calculation_result: Dict, reason: str) -> Dict:
+        """Rule-based analysis used instead of the API, counted by reason"""
+        with self._stats_lock:
+            self.fallbacks[reason] += 1
+        return self._fallback_analysis(user_info, calculation_result)
+
+    def stats(self) -> Dict:
+        """API calls, fallbacks by reason, circuit breaker state and bulkhead queue metrics"""
+        with self._stats_lock:
+            stats = {
+                "enabled": self.enabled,
+                "api_calls": self.api_calls,
+                "api_seconds": round(self.api_seconds, 3),
+                "fallbacks": dict(self.fallbacks),
+            }
+        if self.enabled:
+            stats["circuit_breaker"] = self.breaker.stats()
+            stats["bulkhead"] = self.bulkhead.stats()
+        return stats
+
+    def cache_stats(self) -> Dict:
+        """Cache hit/miss counters and the estimated API time saved"""
+        with self._stats_lock:
+            api_calls = self.api_calls
+            api_seconds = self.api_seconds
+
+        stats = {
+            "enabled": self.cache is not None,
+            "api_calls": api_calls,
+            "api_seconds": round(api_seconds, 3),
+        }
+        if self.cache is not None:
+            stats.update(self.cache.stats())
+            average = api_seconds / api_calls if api_calls else 0.0
+            stats["estimated_seconds_saved"] = round(stats["hits"] * average, 3)
+        return stats
 
-            # Log the raw response for debugging
-            current_app.logger.info(f"Gemini API raw response: {response.text}")
+    def _cache_key(self, user_info: Dict, calculation_result: Dict) -> str:
+        """
+        Fingerprint of the prompt inputs
 
-            # Parse response
-            analysis = self._parse_response(response.text)
-            return analysis
+        Amounts are rounded to a few significant digits so near-identical
+        inputs (e.g. 150,000 and 151,000 yen) share one cached analysis.
+        """
+        digits = self.cache_amount_digits
+        fingerprint = {
+            "prompt_version": PROMPT_VERSION,
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "age": user_info.get("age"),
+            "monthly_expenses": _bucket_amount(user_info.get("monthly_expenses"), digits),
+            "total_assets": _bucket_amount(user_info.get("total_assets"), digits),
+            "monthly_support": _bucket_amount(user_info.get("monthly_support", 0), digits),
+            "support_type": self._support_type_label(user_info.get("support_type", "none")),
+            "depletion_age": calculation_result.get("depletion_age"),
+        }
+        encoded = json.dumps(fingerprint, sort_keys=True).encode("utf-8")
+        return "analysis:" + hashlib.sha256(encoded).hexdigest()
 
-        except Exception as e:
-            current_app.logger.error(f"Gemini API error: {str(e)}")
-            import traceback
-            current_app.logger.error(f"Traceback: {traceback.format_exc()}")
-            return self._fallback_analysis(user_info, calculation_result)
+    def _build_prompt(
+        self,
+        user_info: Dict,
+        calculation_result: Dict,
+        question: Optional[str] = None,
+        stream: bool = False,
+    ) -> str:
+        """
+        Build prompt for Gemini API
 
-    def _build_prompt(self, user_info: Dict, calculation_result: Dict) -> str:
-        """Build prompt for Gemini API"""
+        Args:
+            question: the user's own question (POST /ai/advice)
+            stream: ask for the advice text first and the lists as a trailing
+                JSON block, so the text can be forwarded while it is generated
+        """
         age = user_info.get("age")
         monthly_expenses = user_info.get("monthly_expenses")
         total_assets = user_info.get("total_assets")
@@ -99,6 +505,36 @@ class GeminiService:
         else:
             prompt += "- 資産は長期的に維持できる見込みです\n"
 
+        if question:
+            prompt += f"""
+## ご相談内容
+{question}
+"""
+
+        if stream:
+            prompt += """
+## 重要：出力形式
+
+まず、温かく励ますトーンのアドバイスメッセージ（200-300文字）を普通の文章で書いてください。
+その後に、以下のJSON形式のブロックを1つだけ書いてください。
+
+```json
+{
+  "risk_factors": [
+    "リスク要因1",
+    "リスク要因2",
+    "リスク要因3"
+  ],
+  "suggestions": [
+    "提案1",
+    "提案2",
+    "提案3"
+  ]
+}
+```
+"""
+            return prompt + ADVISOR_GUIDELINES + "6. **アドバイスメッセージの後に、必ず上記のJSONブロックを書いてください。**\n"
+
         prompt += """
 ## 重要：出力形式
 
@@ -119,15 +555,9 @@ class GeminiService:
   "advice_message": "温かく励ますトーンのアドバイスメッセージ（200-300文字）"
 }
 ```
-
-## 重要な注意事項
-1. ひきこもりの方の心理的負担に配慮してください
-2. 「すぐに働く」「外に出る」などの急激な変化を強要しないでください
-3. 小さな成功体験を積み重ねることの重要性を伝えてください
-4. 利用可能な社会資源（障害年金、生活保護、支援団体など）の情報も含めてください
-5. 前向きで希望を持てるメッセージにしてください
-6. **必ずJSON形式で回答してください。マークダウンや他の形式は使用しないでください。**
 """
+        prompt += ADVISOR_GUIDELINES
+        prompt += "6. **必ずJSON形式で回答してください。マークダウンや他の形式は使用しないでください。**\n"
 
         return prompt
 
@@ -210,7 +640,8 @@ class GeminiService:
         return {
             "risk_factors": risk_factors,
             "suggestions": suggestions,
-            "advice_message": advice_message
+            "advice_message": advice_message,
+            "fallback": True,
         }
 
     def _generate_fallback_advice(self, risk_factors: List[str], suggestions: List[str]) -> str:
@@ -224,13 +655,42 @@ class GeminiService:
 一人で抱え込まず、必要に応じて専門家や支援団体に相談することも大切です。あなたのペースで、無理のない範囲で進めていきましょう。"""
 
 
-# Singleton instance
-_gemini_service = None
+def _advice_text_end(text: str, final: bool = False) -> int:
+    """
+    Length of the advice text at the start of a streamed response
+
+    The text ends where the JSON block starts (a ``` fence or a bare "{").
+    While streaming (final=False), trailing backticks are held back because
+    they may be the start of a fence split across chunks.
+    """
+    ends = [index for index in (text.find("```"), text.find("{")) if index >= 0]
+    if ends:
+        return min(ends)
+    if final:
+        return len(text)
+    return len(text.rstrip("`"))
+
+
+def _bucket_amount(value, digits: int) -> int:
+    """Round an amount to the given number of significant digits"""
+    if not value:
+        return 0
+    magnitude = 10 ** max(len(str(int(abs(value)))) - digits, 0)
+    return int(round(value / magnitude) * magnitude)
+
+
+# One service per app (created on first use)
+_services_lock = threading.Lock()
 
 
 def get_gemini_service() -> GeminiService:
-    """Get or create Gemini service instance"""
-    global _gemini_service
-    if _gemini_service is None:
-        _gemini_service = GeminiService()
-    return _gemini_service
+    """Get or create the Gemini service of the current app"""
+    app = current_app._get_current_object()
+    service = app.extensions.get("gemini_service")
+    if service is None:
+        with _services_lock:
+            service = app.extensions.get("gemini_service")
+            if service is None:
+                service = GeminiService(app)
+                app.extensions["gemini_service"] = service
+    return service
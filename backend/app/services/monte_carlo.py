@@ -0,0 +1,255 @@
+"""
+Monte Carlo Simulation Service
+
+インフレ率・運用利回り・突発的な出費を確率的に変化させた多数のパスを計算し、
+年ごとの残高のパーセンタイル帯と、年齢ごとの資金枯渇確率を求める。
+
+- パスは固定サイズのチャンクに分け、チャンクごとに SeedSequence から派生した
+  乱数列を使う（シリアル実行でもプロセスプール実行でも同じ結果になる）
+- 各チャンクはベクトル演算で計算する。運用利回りの累積成長率で割り引くと
+  残高の漸化式が「累積和 + 0で打ち切り」になるため、project_balances を再利用できる
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.simulation import NOT_DEPLETED, project_balances
+
+# 1チャンクあたりのパス数（乱数列の割り当て単位なので変更すると結果が変わる）
+CHUNK_PATHS = 2000
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+DEFAULT_PARAMETERS = {
+    "inflation_mean": 0.01,
+    "inflation_std": 0.01,
+    "return_mean": 0.0,
+    "return_std": 0.0,
+    "shock_probability": 0.05,
+    "shock_scale": 0.25,
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_warmup = None
+_pool_lock = threading.Lock()
+
+
+def simulate_chunk(
+    seed_sequence: np.random.SeedSequence,
+    n_paths: int,
+    total_assets: float,
+    annual_expenses: float,
+    annual_income: float,
+    years: int,
+    parameters: Dict,
+) -> np.ndarray:
+    """
+    1チャンク分のパスを計算
+
+    Returns:
+        各年末の残高 shape (n_paths, years)
+    """
+    rng = np.random.default_rng(seed_sequence)
+    shape = (n_paths, years)
+
+    inflation = rng.normal(parameters["inflation_mean"], parameters["inflation_std"], shape)
+    returns = rng.normal(parameters["return_mean"], parameters["return_std"], shape)
+    shocks = rng.random(shape) < parameters["shock_probability"]
+    shock_sizes = rng.exponential(parameters["shock_scale"], shape)
+
+    # 物価指数（初年度 = 1）
+    price_index = np.cumprod(1.0 + inflation, axis=1) / (1.0 + inflation[:, :1])
+    expenses = annual_expenses * price_index * (1.0 + shocks * shock_sizes)
+    net_changes = annual_income - expenses
+
+    # 累積成長率で割り引いた空間では B_t = max(0, B_{t-1} + n_t / G_t)
+    growth = np.cumprod(1.0 + np.maximum(returns, -0.99), axis=1)
+    discounted, _ = project_balances(
+        np.full(n_paths, float(total_assets)), net_changes / growth
+    )
+    return discounted * growth
+
+
+def _warmup() -> None:
+    """ワーカープロセスの起動確認用（モジュールのimportを済ませる）"""
+
+
+def _get_pool(processes: int) -> Optional[ProcessPoolExecutor]:
+    """
+    プロセスプールを取得
+
+    初回呼び出しでプールを作成し、ワーカーの起動（spawn と import）を
+    バックグラウンドで開始する。起動が終わるまでは None を返す。
+    """
+    global _pool, _pool_warmup
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _pool_warmup = [_pool.submit(_warmup) for _ in range(processes)]
+        if not all(future.done() for future in _pool_warmup):
+            return None
+        return _pool
+
+
+def _reset_pool() -> None:
+    """壊れたプロセスプールを破棄（次回呼び出し時に作り直す）"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _forget_pool_after_fork() -> None:
+    """
+    fork した子プロセスでは親のプロセスプールを使わない
+
+    プールの管理スレッドは子プロセスにコピーされないため、参照だけを捨てる
+    （shutdown すると親のワーカープロセスに影響する）。
+    """
+    global _pool, _pool_warmup, _pool_lock
+    _pool = None
+    _pool_warmup = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):  # Windows にはない
+    os.register_at_fork(after_in_child=_forget_pool_after_fork)
+
+
+def run_monte_carlo(
+    age: int,
+    current_year: int,
+    monthly_expenses: float,
+    total_assets: float,
+    monthly_support: float,
+    simulation_years: int,
+    paths: int,
+    seed: int,
+    parameters: Optional[Dict] = None,
+    processes: int = 0,
+    pool_threshold: int = 10000,
+    time_budget: Optional[float] = None,
+) -> Dict:
+    """
+    モンテカルロシミュレーションを実行
+
+    Args:
+        age: 現在の年齢
+        current_year: 開始年
+        monthly_expenses: 月間生活費
+        total_assets: 総資産
+        monthly_support: 月間受給額
+        simulation_years: シミュレーション年数
+        paths: パス数
+        seed: 乱数シード（同じシード・同じ入力なら同じ結果）
+        parameters: 確率モデルのパラメータ（DEFAULT_PARAMETERS を上書き）
+        processes: プロセスプールのワーカー数（0 の場合は常にシリアル実行）
+        pool_threshold: この数を超えるパス数でプロセスプールを使う
+        time_budget: 計算時間の上限（秒）。超えた場合は完了したチャンクだけで集計する
+
+    Returns:
+        パーセンタイル帯と年齢別の資金枯渇確率
+    """
+    params = {**DEFAULT_PARAMETERS, **(parameters or {})}
+    years = int(simulation_years)
+    chunk_sizes = [CHUNK_PATHS] * (paths // CHUNK_PATHS)
+    if paths % CHUNK_PATHS:
+        chunk_sizes.append(paths % CHUNK_PATHS)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    chunk_args = [
+        (
+            seed_sequence,
+            n_paths,
+            total_assets,
+            monthly_expenses * 12,
+            monthly_support * 12,
+            years,
+            params,
+        )
+        for seed_sequence, n_paths in zip(seeds, chunk_sizes)
+    ]
+
+    started = time.monotonic()
+    deadline = started + time_budget if time_budget else None
+    chunks: List[np.ndarray] = []
+
+    if processes > 0 and paths > pool_threshold and len(chunk_args) > 1:
+        try:
+            pool = _get_pool(processes)
+            futures = []
+            if pool is not None:
+                futures = [pool.submit(simulate_chunk, *args) for args in chunk_args]
+            for future in futures:
+                # 最初のチャンクは必ず待つ（結果が空にならないように）
+                timeout = None
+                if deadline is not None and chunks:
+                    timeout = max(deadline - time.monotonic(), 0)
+                try:
+                    chunks.append(future.result(timeout=timeout))
+                except FutureTimeoutError:
+                    break
+            for future in futures:
+                future.cancel()
+        except BrokenProcessPool:
+            # 残りのチャンクは同一プロセスで計算する
+            _reset_pool()
+
+    # プールを使わない場合（起動中・使えなくなった場合を含む）の残りのチャンク
+    for args in chunk_args[len(chunks):]:
+        if chunks and deadline is not None and time.monotonic() >= deadline:
+            break
+        chunks.append(simulate_chunk(*args))
+
+    balances = np.concatenate(chunks, axis=0)
+    return summarize_paths(balances, age, current_year, paths, seed, params)
+
+
+def summarize_paths(
+    balances: np.ndarray,
+    age: int,
+    current_year: int,
+    requested_paths: int,
+    seed: int,
+    parameters: Dict,
+) -> Dict:
+    """パスごとの残高からパーセンタイル帯と枯渇確率を集計"""
+    n_paths, years = balances.shape
+
+    depleted = balances <= 0
+    depletion_index = np.where(
+        depleted.any(axis=1), depleted.argmax(axis=1), NOT_DEPLETED
+    )
+    depletion_counts = np.bincount(
+        depletion_index[depletion_index != NOT_DEPLETED], minlength=years
+    )[:years]
+    depletion_probability = np.cumsum(depletion_counts) / n_paths
+
+    bands = np.percentile(balances, PERCENTILES, axis=0)
+
+    return {
+        "paths": n_paths,
+        "requested_paths": requested_paths,
+        "truncated": n_paths < requested_paths,
+        "seed": seed,
+        "parameters": parameters,
+        "years": list(range(current_year, current_year + years)),
+        "ages": list(range(age, age + years)),
+        "balance_percentiles": {
+            f"p{percentile}": np.rint(band).astype(np.int64).tolist()
+            for percentile, band in zip(PERCENTILES, bands)
+        },
+        "depletion_probability_by_age": np.round(depletion_probability, 4).tolist(),
+        "depletion_probability": round(float(depletion_probability[-1]), 4) if years else 0.0,
+    }
@@ -0,0 +1,66 @@
+"""
+Calculation Payload Cache
+
+保存済み計算結果（GET /calculate/<id>）のレスポンス本文（シリアライズ済み・圧縮済みのバイト列）と
+ETag をプロセス内にキャッシュする。ヒットした場合は ORM の読み込みも JSON のエンコードも圧縮も行わない。
+
+- 計算結果は保存後に変わらない。ai_status が pending の間だけは AI 分析の完了で
+  変わるため、呼び出し側でキャッシュしない
+- POST /ai/advice のアドバイスは ai_advice テーブルに保存し、計算結果は変更しない
+- 計算結果はセッションの削除・期限切れで（どのワーカーからでも）削除されるため、呼び出し側は
+  ヒットのたびに計算結果の存在だけを確認し、削除済みなら invalidate_payload() で破棄する
+"""
+from typing import Dict, Optional, Tuple
+
+from app.services.cache import LRUCache
+
+
+def _entry_size(entry: Tuple[str, Dict[str, bytes]]) -> int:
+    return sum(len(body) for body in entry[1].values())
+
+
+# configure_payload_cache で設定を変更
+_payload_cache = LRUCache(max_entries=1024, ttl=300, max_bytes=16 * 1024 * 1024, size_of=_entry_size)
+
+
+def configure_payload_cache(max_entries: int, max_bytes: int, ttl: float) -> None:
+    """
+    レスポンス本文キャッシュの上限を設定（既存のエントリは破棄）
+
+    Args:
+        max_entries: 最大エントリ数（0 でキャッシュ無効）
+        max_bytes: 本文（圧縮済みの表現を含む）の合計サイズの上限（バイト）
+        ttl: 有効期間（秒）
+    """
+    global _payload_cache
+    _payload_cache = LRUCache(
+        max_entries=max_entries,
+        ttl=ttl,
+        max_bytes=max_bytes,
+        size_of=_entry_size,
+    )
+
+
+def get_payload(calculation_id: str) -> Optional[Tuple[str, Dict[str, bytes]]]:
+    """キャッシュ済みの (ETag, 圧縮形式ごとのレスポンス本文)（なければ None）"""
+    return _payload_cache.get(calculation_id)
+
+
+def store_payload(calculation_id: str, etag: str, variants: Dict[str, bytes]) -> None:
+    """
+    ETag とレスポンス本文をキャッシュ
+
+    Args:
+        variants: app.compression.precompress() の戻り値（{"identity": ..., "gzip": ...}）
+    """
+    _payload_cache.set(calculation_id, (etag, variants))
+
+
+def invalidate_payload(calculation_id: str) -> None:
+    """計算結果のキャッシュを破棄（削除済みの計算結果）"""
+    _payload_cache.delete(calculation_id)
+
+
+def payload_cache_stats() -> Dict:
+    """レスポンス本文キャッシュのヒット率・メモリ使用量"""
+    return _payload_cache.stats()
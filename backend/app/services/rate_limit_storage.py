@@ -0,0 +1,244 @@
+"""
+Local + Shared Rate Limit Storage
+
+Flask-Limiter（limits）のストレージ。ワーカーごとのプロセス内カウンタで判定し、
+一定間隔で共有ストア（Redis など、limits が対応するストレージ）と突き合わせる。
+
+- RATELIMIT_STORAGE_URL を "local+redis://host:6379/0" のように "local+" 付きで指定すると有効
+  （"local+" を除いた URL が共有ストア）
+- 各リクエストの判定はプロセス内のみ。共有ストアへのアクセスは
+  RATELIMIT_SYNC_INTERVAL 秒ごと、またはキーの未反映ヒット数が RATELIMIT_SYNC_BATCH に
+  達したときだけ（未反映分を INCRBY で加算し、全ワーカー合計の値を受け取る）
+- 全体の上限を超えて許可される回数は、ワーカー数 × 同期間隔内のヒット数が上限
+- 共有ストアに接続できない間はプロセス内だけで判定し（ワーカーごとの上限）、
+  RATELIMIT_SYNC_RETRY 秒ごとに再接続を試みる
+- fixed-window 戦略（Flask-Limiter のデフォルト）専用
+"""
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask
+from limits.storage import Storage, storage_from_string
+
+LOCAL_SCHEME_PREFIX = "local+"
+
+
+class _Counter:
+    """1キー・1ウィンドウ分のカウンタ"""
+
+    __slots__ = ("shared_count", "pending", "expiry", "expires_at", "synced")
+
+    def __init__(self, expiry: int, expires_at: float):
+        self.shared_count = 0  # 最後に同期したときの全ワーカー合計
+        self.pending = 0  # 共有ストアに未反映のヒット数
+        self.expiry = expiry
+        self.expires_at = expires_at
+        self.synced = False  # 共有ストアのウィンドウの期限を取り込んだか
+
+
+class LocalSharedStorage(Storage):
+    """プロセス内カウンタ + 共有ストアへの定期同期"""
+
+    STORAGE_SCHEME = [
+        "local+redis",
+        "local+rediss",
+        "local+redis+unix",
+        "local+memcached",
+        "local+memory",
+    ]
+
+    def __init__(
+        self,
+        uri: str,
+        wrap_exceptions: bool = False,
+        sync_interval: float = 1.0,
+        sync_batch: int = 5,
+        retry_interval: float = 30.0,
+        shared_storage: Optional[Storage] = None,
+        **options,
+    ):
+        """
+        Args:
+            uri: "local+" + 共有ストアの URL
+            sync_interval: 共有ストアと同期する間隔（秒）
+            sync_batch: 未反映のヒット数がこの値に達したキーがあれば間隔を待たずに同期
+            retry_interval: 共有ストアのエラー後、再接続を試みるまでの時間（秒）
+            shared_storage: 共有ストア（指定時は uri から作成しない。ベンチマーク用）
+            options: 共有ストアのストレージに渡すオプション
+        """
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        self.shared_uri = uri[len(LOCAL_SCHEME_PREFIX):]
+        self.shared = shared_storage or storage_from_string(self.shared_uri, **options)
+        self.sync_interval = float(sync_interval)
+        self.sync_batch = int(sync_batch)
+        self.retry_interval = float(retry_interval)
+
+        self._counters: Dict[str, _Counter] = {}
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._next_sync = 0.0
+        self._retry_at = 0.0
+        self.shared_available = True
+        self.hits = 0
+        self.syncs = 0
+        self.shared_calls = 0
+        self.sync_errors = 0
+
+    @property
+    def base_exceptions(self):
+        return self.shared.base_exceptions
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            counter = self._counter(key, expiry, now)
+            counter.pending += amount
+            self.hits += 1
+            due = now >= self._next_sync or (
+                self.shared_available and counter.pending >= self.sync_batch
+            )
+
+        if due:
+            self.sync()
+        with self._lock:
+            return counter.shared_count + counter.pending
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None or counter.expires_at <= time.time():
+                return 0
+            return counter.shared_count + counter.pending
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            counter = self._counters.get(key)
+            now = time.time()
+            if counter is None or counter.expires_at <= now:
+                return now
+            return counter.expires_at
+
+    def check(self) -> bool:
+        # 共有ストアに接続できなくてもプロセス内で判定できる
+        return True
+
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            cleared = len(self._counters)
+            self._counters.clear()
+        try:
+            self.shared.reset()
+        except Exception:
+            self._shared_error()
+        return cleared
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+        try:
+            self.shared.clear(key)
+        except Exception:
+            self._shared_error()
+
+    def sync(self) -> None:
+        """未反映のヒットを共有ストアに加算し、全ワーカー合計の値を取り込む"""
+        if not self._sync_lock.acquire(blocking=False):
+            return  # 他のスレッドが同期中（このリクエストはプロセス内の値で判定）
+        try:
+            now = time.time()
+            batch = self._take_pending(now)
+            with self._lock:
+                self._next_sync = now + (
+                    self.sync_interval if self.shared_available else self.retry_interval
+                )
+            if not self.shared_available and self._retry_at > now:
+                self._restore_pending(batch)
+                return
+
+            for index, (key, counter, amount) in enumerate(batch):
+                try:
+                    shared_count = self.shared.incr(key, counter.expiry, amount=amount)
+                    # ウィンドウの開始は他のワーカーが先の場合があるので、最初の同期で期限を合わせる
+                    expires_at = (
+                        counter.expires_at if counter.synced else self.shared.get_expiry(key)
+                    )
+                except Exception:
+                    self._restore_pending(batch[index:])
+                    self._shared_error()
+                    return
+                with self._lock:
+                    self.shared_calls += 1 if counter.synced else 2
+                    counter.shared_count = shared_count
+                    counter.expires_at = expires_at
+                    counter.synced = True
+
+            with self._lock:
+                self.shared_available = True
+                self.syncs += 1
+        finally:
+            self._sync_lock.release()
+
+    def stats(self) -> Dict:
+        """判定回数・共有ストアへのアクセス回数・同期エラー数"""
+        with self._lock:
+            return {
+                "shared_store": self.shared_uri.split("://", 1)[0],
+                "shared_available": self.shared_available,
+                "local_keys": len(self._counters),
+                "hits": self.hits,
+                "syncs": self.syncs,
+                "shared_calls": self.shared_calls,
+                "sync_errors": self.sync_errors,
+            }
+
+    def _counter(self, key: str, expiry: int, now: float) -> _Counter:
+        counter = self._counters.get(key)
+        if counter is None or counter.expires_at <= now:
+            counter = _Counter(expiry, now + expiry)
+            self._counters[key] = counter
+        return counter
+
+    def _take_pending(self, now: float) -> List[Tuple[str, _Counter, int]]:
+        """未反映のヒットを取り出し、期限切れのカウンタを削除"""
+        batch = []
+        with self._lock:
+            for key, counter in list(self._counters.items()):
+                if counter.expires_at <= now:
+                    del self._counters[key]
+                elif counter.pending:
+                    batch.append((key, counter, counter.pending))
+                    counter.pending = 0
+        return batch
+
+    def _restore_pending(self, batch: List[Tuple[str, _Counter, int]]) -> None:
+        with self._lock:
+            for _, counter, amount in batch:
+                counter.pending += amount
+
+    def _shared_error(self) -> None:
+        with self._lock:
+            self.shared_available = False
+            self.sync_errors += 1
+            self._retry_at = time.time() + self.retry_interval
+            self._next_sync = self._retry_at
+
+
+def rate_limit_storage_options(config: Dict) -> Dict:
+    """RATELIMIT_STORAGE_URL が "local+" の場合の LocalSharedStorage のオプション"""
+    if not config["RATELIMIT_STORAGE_URL"].startswith(LOCAL_SCHEME_PREFIX):
+        return {}
+    return {
+        "sync_interval": config["RATELIMIT_SYNC_INTERVAL"],
+        "sync_batch": config["RATELIMIT_SYNC_BATCH"],
+        "retry_interval": config["RATELIMIT_SYNC_RETRY"],
+    }
+
+
+def rate_limit_stats(app: Flask) -> Optional[Dict]:
+    """LocalSharedStorage を使っている場合はその統計（それ以外は None）"""
+    for limiter in app.extensions.get("limiter", ()):
+        storage = getattr(limiter, "_storage", None)
+        if isinstance(storage, LocalSharedStorage):
+            return storage.stats()
+    return None
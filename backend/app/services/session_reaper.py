@@ -0,0 +1,162 @@
+"""
+Expired Session Reaper
+
+期限切れのセッションをバックグラウンドスレッドで定期的に削除する。
+
+- 1回の DELETE は SESSION_REAPER_BATCH_SIZE 件までに区切り、チャンクごとにコミットする
+  （長時間のロックや巨大なトランザクションを避ける）
+- 計算結果・目標などの子レコードはDBの ON DELETE CASCADE で削除される
+  （ORMに読み込まないので、件数が多くてもメモリを使わない。Session.delete_sessions を参照）
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask import Flask
+
+
+class SessionReaper:
+    """期限切れセッションを定期的に削除するワーカー"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.errors = 0
+        self.sessions_purged = 0
+        self.last_run: Optional[Dict] = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Args:
+            app: Flaskアプリ（SESSION_REAPER_INTERVAL = 0 の場合はスレッドを起動しない）
+        """
+        app.extensions["session_reaper"] = self
+
+        @app.cli.command("purge-sessions")
+        def purge_sessions_command():
+            """期限切れセッションを削除"""
+            print(self.purge_expired(app))
+
+        if app.config.get("SESSION_REAPER_INTERVAL", 0) > 0:
+            # fork 後のワーカープロセスでスレッドを起動するため、最初のリクエストで開始する
+            app.before_request(lambda: self.start(app))
+
+    def start(self, app: Flask) -> None:
+        """バックグラウンドスレッドを起動（起動済みの場合は何もしない）"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._loop,
+                args=(app,),
+                name="session-reaper",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """バックグラウンドスレッドを停止"""
+        self._stop.set()
+
+    def purge_expired(self, app: Flask, now: Optional[datetime] = None) -> Dict:
+        """
+        期限切れセッションをチャンク単位で削除
+
+        Args:
+            app: Flaskアプリ
+            now: 基準時刻（default: 現在時刻, UTC）
+
+        Returns:
+            この実行で削除した件数などの統計
+        """
+        from app.extensions import db
+        from app.models import Session
+
+        batch_size = app.config.get("SESSION_REAPER_BATCH_SIZE", 500)
+        max_batches = app.config.get("SESSION_REAPER_MAX_BATCHES", 100)
+        now = now or datetime.utcnow()
+        started = time.monotonic()
+        purged = 0
+        batches = 0
+
+        with app.app_context():
+            try:
+                while batches < max_batches:
+                    # expires_at のインデックスで対象のIDだけを取得
+                    session_ids = [
+                        row[0]
+                        for row in db.session.query(Session.session_id)
+                        .filter(Session.expires_at < now)
+                        .order_by(Session.expires_at)
+                        .limit(batch_size)
+                    ]
+                    if not session_ids:
+                        break
+
+                    deleted = Session.delete_sessions(session_ids)
+                    db.session.commit()
+                    purged += deleted
+                    batches += 1
+                    if len(session_ids) < batch_size:
+                        break
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Session reaper error: {str(e)}")
+                with self._lock:
+                    self.errors += 1
+            finally:
+                db.session.remove()
+
+        # サーバー側 session ストアの期限切れデータ（SQL / プロセス内バックエンド）
+        server_sessions_purged = 0
+        sweep = getattr(app.session_interface, "sweep_expired", None)
+        if sweep is not None:
+            with app.app_context():
+                try:
+                    server_sessions_purged = sweep(batch_size, max_batches)
+                except Exception as e:
+                    app.logger.error(f"Session store sweep error: {str(e)}")
+                    with self._lock:
+                        self.errors += 1
+
+        run = {
+            "sessions_purged": purged,
+            "server_sessions_purged": server_sessions_purged,
+            "batches": batches,
+            "duration_seconds": round(time.monotonic() - started, 4),
+            "finished_at": datetime.utcnow().isoformat() + "Z",
+        }
+        with self._lock:
+            self.runs += 1
+            self.sessions_purged += purged
+            self.last_run = run
+        return run
+
+    def stats(self) -> Dict:
+        """実行回数・削除件数の統計"""
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "runs": self.runs,
+                "errors": self.errors,
+                "sessions_purged": self.sessions_purged,
+                "last_run": self.last_run,
+            }
+
+    def _loop(self, app: Flask) -> None:
+        """スレッド本体"""
+        interval = app.config.get("SESSION_REAPER_INTERVAL", 0)
+        while not self._stop.wait(interval):
+            self.purge_expired(app)
+
+
+# Singleton instance (initialized in create_app)
+session_reaper = SessionReaper()
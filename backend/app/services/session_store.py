@@ -0,0 +1,360 @@
+"""
+Server-side Session Store
+
+Flask の session をサーバー側に保存する SessionInterface。
+
+- バックエンド: SQL テーブル（server_sessions） / Redis / プロセス内（テスト用）
+- 読み取りはプロセス内LRU（SESSION_CACHE_TTL 秒）を経由する read-through キャッシュ。
+  他のワーカーでの更新が見えるまでの遅れは最大 SESSION_CACHE_TTL 秒
+- 保存は session が変更された場合と、有効期限の残りが半分を切った場合（期限の延長）のみ。
+  読み取りだけのリクエストではバックエンドへの書き込みは発生しない
+- SQL / プロセス内バックエンドの期限切れデータは SessionReaper の実行時に削除する
+  （Redis はキーのTTLで削除される）
+"""
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, Request, Response
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer, want_bytes
+from werkzeug.datastructures import CallbackDict
+
+from app.services.cache import LRUCache
+
+# SESSION_TYPE の値（これ以外は Flask-Session に任せる）
+SESSION_STORE_TYPES = ("sql", "redis", "memory")
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """サーバー側に保存される session"""
+
+    def __init__(self, initial=None, sid: Optional[str] = None, expires_at: float = 0.0, new: bool = False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.new = new
+        self.modified = False
+
+
+class InMemorySessionBackend:
+    """プロセス内の辞書に保存するバックエンド（テスト・開発用）"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._values[key] = (value, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def sweep_expired(self, batch_size: int, max_batches: int) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._values.items() if expires_at <= now]
+            for key in expired:
+                del self._values[key]
+        return len(expired)
+
+
+class RedisSessionBackend:
+    """Redis（互換サーバーを含む）に保存するバックエンド（redisパッケージが必要）"""
+
+    name = "redis"
+
+    def __init__(self, url: str, key_prefix: str):
+        import redis
+
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(self.key_prefix + key)
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        ttl = max(int(expires_at - time.time()), 1)
+        self._client.set(self.key_prefix + key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._client.delete(self.key_prefix + key)
+
+    def sweep_expired(self, batch_size: int, max_batches: int) -> int:
+        # キーのTTLで期限切れになる
+        return 0
+
+
+class SQLSessionBackend:
+    """server_sessions テーブルに保存するバックエンド"""
+
+    name = "sql"
+
+    def get(self, key: str) -> Optional[bytes]:
+        from app.extensions import db
+        from app.models import ServerSession
+
+        table = ServerSession.__table__
+        with db.engine.connect() as connection:
+            row = connection.execute(
+                table.select()
+                .with_only_columns(table.c.data)
+                .where(table.c.session_key == key)
+                .where(table.c.expires_at > datetime.utcnow())
+            ).first()
+        return row[0] if row is not None else None
+
+    def set(self, key: str, value: bytes, expires_at: float) -> None:
+        from sqlalchemy.exc import IntegrityError
+
+        from app.extensions import db
+        from app.models import ServerSession
+
+        table = ServerSession.__table__
+        values = {"data": value, "expires_at": datetime.utcfromtimestamp(expires_at)}
+        with db.engine.begin() as connection:
+            updated = connection.execute(
+                table.update().where(table.c.session_key == key).values(**values)
+            ).rowcount
+            if updated:
+                return
+            try:
+                with connection.begin_nested():
+                    connection.execute(table.insert().values(session_key=key, **values))
+            except IntegrityError:
+                # 同時に作成された場合は上書き
+                connection.execute(
+                    table.update().where(table.c.session_key == key).values(**values)
+                )
+
+    def delete(self, key: str) -> None:
+        from app.extensions import db
+        from app.models import ServerSession
+
+        table = ServerSession.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.session_key == key))
+
+    def sweep_expired(self, batch_size: int, max_batches: int) -> int:
+        """期限切れの行をチャンク単位で削除"""
+        from app.extensions import db
+        from app.models import ServerSession
+
+        table = ServerSession.__table__
+        now = datetime.utcnow()
+        purged = 0
+        for _ in range(max_batches):
+            with db.engine.begin() as connection:
+                keys = connection.execute(
+                    table.select()
+                    .with_only_columns(table.c.session_key)
+                    .where(table.c.expires_at < now)
+                    .order_by(table.c.expires_at)
+                    .limit(batch_size)
+                ).scalars().all()
+                if not keys:
+                    break
+                purged += connection.execute(
+                    table.delete().where(table.c.session_key.in_(keys))
+                ).rowcount
+            if len(keys) < batch_size:
+                break
+        return purged
+
+
+def create_session_backend(kind: str, redis_url: Optional[str] = None, key_prefix: str = ""):
+    """
+    設定値から session のバックエンドを作成
+
+    Args:
+        kind: "sql" / "redis" / "memory"
+        redis_url: Redis の接続URL（kind が "redis" の場合）
+        key_prefix: Redis のキーのプレフィックス
+    """
+    if kind == "sql":
+        return SQLSessionBackend()
+    if kind == "redis":
+        return RedisSessionBackend(redis_url, key_prefix)
+    if kind == "memory":
+        return InMemorySessionBackend()
+    raise ValueError(f"Unknown session store: {kind}")
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """バックエンドとプロセス内キャッシュを使う SessionInterface"""
+
+    serializer = TaggedJSONSerializer()
+    session_class = ServerSideSession
+
+    def __init__(self, backend, cache_ttl: float = 5, cache_max_entries: int = 10000):
+        """
+        Args:
+            backend: create_session_backend で作成したバックエンド
+            cache_ttl: プロセス内キャッシュの有効期間（秒）。0 の場合はキャッシュしない
+            cache_max_entries: プロセス内キャッシュの最大エントリ数
+        """
+        self.backend = backend
+        self.cache = LRUCache(
+            max_entries=cache_max_entries if cache_ttl > 0 else 0,
+            ttl=cache_ttl,
+        )
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.errors = 0
+
+    def open_session(self, app: Flask, request: Request) -> ServerSideSession:
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        sid = self._unsign(app, cookie) if cookie else None
+        if sid is None:
+            return self._new_session()
+
+        entry = self.cache.get(sid)
+        if entry is None:
+            try:
+                raw = self.backend.get(sid)
+                with self._lock:
+                    self.reads += 1
+            except Exception as e:
+                app.logger.error(f"Session store read error: {str(e)}")
+                with self._lock:
+                    self.errors += 1
+                raw = None
+            if raw is None:
+                return self._new_session()
+            entry = self.serializer.loads(raw.decode("utf-8"))
+            self.cache.set(sid, entry)
+
+        if entry["expires_at"] <= time.time():
+            return self._new_session()
+        return self.session_class(entry["data"], sid=sid, expires_at=entry["expires_at"])
+
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified and not session.new:
+                self._delete(app, session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        # 変更がなければ、有効期限の残りが半分を切ったときだけ延長する
+        if not session.modified and session.expires_at - now > lifetime / 2:
+            return
+
+        entry = {"data": dict(session), "expires_at": now + lifetime}
+        try:
+            self.backend.set(
+                session.sid,
+                self.serializer.dumps(entry).encode("utf-8"),
+                entry["expires_at"],
+            )
+            with self._lock:
+                self.writes += 1
+        except Exception as e:
+            app.logger.error(f"Session store write error: {str(e)}")
+            with self._lock:
+                self.errors += 1
+            return
+        self.cache.set(session.sid, entry)
+
+        response.set_cookie(
+            name,
+            self._sign(app, session.sid),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+    def sweep_expired(self, batch_size: int = 500, max_batches: int = 100) -> int:
+        """期限切れの session を削除（SessionReaper から呼ばれる）"""
+        return self.backend.sweep_expired(batch_size, max_batches)
+
+    def stats(self) -> Dict:
+        """バックエンドの読み書き回数とキャッシュのヒット率"""
+        with self._lock:
+            return {
+                "backend": self.backend.name,
+                "reads": self.reads,
+                "writes": self.writes,
+                "errors": self.errors,
+                "cache": self.cache.stats(),
+            }
+
+    def _new_session(self) -> ServerSideSession:
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def _delete(self, app: Flask, sid: str) -> None:
+        self.cache.set(sid, {"data": {}, "expires_at": 0})
+        try:
+            self.backend.delete(sid)
+        except Exception as e:
+            app.logger.error(f"Session store delete error: {str(e)}")
+            with self._lock:
+                self.errors += 1
+
+    def _signer(self, app: Flask) -> Signer:
+        return Signer(app.secret_key, salt="flask-session", key_derivation="hmac")
+
+    def _sign(self, app: Flask, sid: str) -> str:
+        if not app.config.get("SESSION_USE_SIGNER"):
+            return sid
+        return self._signer(app).sign(want_bytes(sid)).decode("utf-8")
+
+    def _unsign(self, app: Flask, cookie: str) -> Optional[str]:
+        if not app.config.get("SESSION_USE_SIGNER"):
+            return cookie
+        try:
+            return self._signer(app).unsign(cookie).decode("utf-8")
+        except BadSignature:
+            return None
+
+
+def init_session_store(app: Flask) -> Optional[ServerSideSessionInterface]:
+    """
+    SESSION_TYPE が SESSION_STORE_TYPES のいずれかなら ServerSideSessionInterface を設定
+
+    Returns:
+        設定した SessionInterface（Flask-Session を使う場合は None）
+    """
+    kind = app.config.get("SESSION_TYPE")
+    if kind not in SESSION_STORE_TYPES:
+        return None
+
+    interface = ServerSideSessionInterface(
+        create_session_backend(
+            kind,
+            redis_url=app.config.get("SESSION_REDIS_URL") or app.config.get("REDIS_URL"),
+            key_prefix=app.config.get("SESSION_KEY_PREFIX", "session:"),
+        ),
+        cache_ttl=app.config.get("SESSION_CACHE_TTL", 5),
+        cache_max_entries=app.config.get("SESSION_CACHE_MAX_ENTRIES", 10000),
+    )
+    app.session_interface = interface
+    return interface
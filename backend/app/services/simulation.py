@@ -0,0 +1,188 @@
+"""
+Vectorized Simulation Engine
+
+ライフプラン計算の配列ベースのコア。
+1行 = 1シナリオ、1列 = 1シミュレーション年として、残高推移・資金枯渇年・
+サマリーを一括で計算する。
+"""
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+# 資金枯渇しなかったシナリオの depletion_index
+NOT_DEPLETED = -1
+
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+ArrayLike = Union[Sequence, np.ndarray]
+
+
+def _as_array(values: ArrayLike) -> np.ndarray:
+    """
+    入力を1次元配列に変換（整数入力は int64 のまま保持）
+
+    Raises:
+        OverflowError: 整数が int64 に収まらない場合（黙って桁あふれさせない）
+    """
+    array = np.atleast_1d(np.asarray(values))
+    if array.dtype.kind == "O" and all(
+        isinstance(value, int) and not isinstance(value, bool) for value in array.flat
+    ):
+        # int64 に収まらない Python の int は object 配列になる
+        raise OverflowError("integer input does not fit in int64")
+    if array.dtype.kind in "biu":
+        if array.dtype.kind == "u" and array.size and int(array.max()) > INT64_MAX:
+            raise OverflowError("integer input does not fit in int64")
+        return array.astype(np.int64)
+    return array.astype(np.float64)
+
+
+def _check_int64_range(
+    assets: np.ndarray, expenses: np.ndarray, support: np.ndarray, years: int
+) -> None:
+    """
+    整数のシミュレーション結果が int64 に収まるか確認
+
+    月末残高は |総資産| + 月数 × (|受給額| + |生活費|) を超えず、
+    残高の合計（balance_sum）はその年数倍を超えない。
+
+    Raises:
+        OverflowError: int64 を超える可能性がある場合
+    """
+    if assets.dtype.kind != "i" or assets.size == 0:
+        return
+    peak = (
+        int(np.abs(assets).max())
+        + years * 12 * (int(np.abs(support).max()) + int(np.abs(expenses).max()))
+    )
+    if max(years, 1) * peak > INT64_MAX:
+        raise OverflowError(
+            "simulation_years x 12 x amount exceeds the int64 range"
+        )
+
+
+def project_balances(initial_balance: ArrayLike, net_changes: ArrayLike):
+    """
+    年間収支の累積和から残高推移を計算
+
+    残高は毎年 max(0, 前年残高 + 収支) で更新される（マイナスは0に戻す）。
+    この漸化式は累積和 S と、その累積最小値を使って
+    B_t = S_t - min(0, min_{s<=t} S_s) と閉じた形で書けるため、ループなしで求まる。
+
+    Args:
+        initial_balance: 初期残高 shape (n,)
+        net_changes: 年間収支 shape (n, years)
+
+    Returns:
+        (balances, depletion_index)
+        - balances: 各年末の残高 shape (n, years)
+        - depletion_index: 初めて残高が0以下になった年のインデックス
+          （枯渇しない場合は NOT_DEPLETED） shape (n,)
+    """
+    initial = _as_array(initial_balance)
+    flows = np.asarray(net_changes)
+    if flows.ndim == 1:
+        flows = flows[np.newaxis, :]
+
+    # 初期残高を先頭に置いて累積和を取る（逐次加算と同じ順序で足し込む）
+    running = np.cumsum(
+        np.concatenate([initial[:, np.newaxis], flows], axis=1), axis=1
+    )[:, 1:]
+    floor = np.minimum.accumulate(np.minimum(running, 0), axis=1)
+    balances = running - floor
+
+    if balances.shape[1] == 0:
+        return balances, np.full(balances.shape[0], NOT_DEPLETED)
+
+    depleted = balances <= 0
+    depletion_index = np.where(
+        depleted.any(axis=1), depleted.argmax(axis=1), NOT_DEPLETED
+    )
+
+    return balances, depletion_index
+
+
+def simulate_constant_flows(
+    total_assets: ArrayLike,
+    monthly_expenses: ArrayLike,
+    monthly_support: ArrayLike,
+    simulation_years: int,
+    monthly: bool = True,
+) -> Dict[str, np.ndarray]:
+    """
+    月間収支が一定のシナリオをまとめてシミュレーション
+
+    monthly=True の場合は月単位で残高を計算し、各年の12月末の残高を年次残高とする
+    （資金枯渇は月単位で検出される）。収支が一定なら年次の結果は年単位の計算と一致する。
+
+    Args:
+        total_assets: 総資産 shape (n,)
+        monthly_expenses: 月間生活費 shape (n,)
+        monthly_support: 月間受給額 shape (n,)
+        simulation_years: シミュレーション年数
+        monthly: 月単位で計算するか（False の場合は年単位のみ）
+
+    Returns:
+        配列の辞書:
+        - annual_income / annual_expenses / net_change: shape (n,)
+        - balances: 年末残高 shape (n, simulation_years)
+        - depletion_index: 資金枯渇年のインデックス shape (n,)
+        - total_income / total_expenses / net_balance / balance_sum: shape (n,)
+        monthly=True の場合はさらに:
+        - monthly_net_change: shape (n,)
+        - monthly_balances: 月末残高 shape (n, simulation_years * 12)
+        - depletion_month_index: 資金枯渇月のインデックス shape (n,)
+
+    Raises:
+        OverflowError: 整数の入力・計算結果が int64 に収まらない場合
+    """
+    assets, expenses, support = np.broadcast_arrays(
+        _as_array(total_assets),
+        _as_array(monthly_expenses),
+        _as_array(monthly_support),
+    )
+    years = max(int(simulation_years), 0)
+    n = assets.shape[0]
+    _check_int64_range(assets, expenses, support, years)
+
+    annual_income = support * 12
+    annual_expenses = expenses * 12
+    net_change = annual_income - annual_expenses
+
+    arrays = {}
+    if monthly:
+        monthly_net_change = support - expenses
+        monthly_balances, depletion_month_index = project_balances(
+            assets, np.broadcast_to(monthly_net_change[:, np.newaxis], (n, years * 12))
+        )
+        balances = monthly_balances[:, 11::12]
+        depletion_index = np.where(
+            depletion_month_index != NOT_DEPLETED,
+            depletion_month_index // 12,
+            NOT_DEPLETED,
+        )
+        arrays.update({
+            "monthly_net_change": monthly_net_change,
+            "monthly_balances": monthly_balances,
+            "depletion_month_index": depletion_month_index,
+        })
+    else:
+        balances, depletion_index = project_balances(
+            assets, np.broadcast_to(net_change[:, np.newaxis], (n, years))
+        )
+
+    total_income = annual_income * years
+    total_expenses = annual_expenses * years
+
+    arrays.update({
+        "annual_income": annual_income,
+        "annual_expenses": annual_expenses,
+        "net_change": net_change,
+        "balances": balances,
+        "depletion_index": depletion_index,
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "net_balance": total_income - total_expenses,
+        "balance_sum": balances.sum(axis=1),
+    })
+    return arrays
@@ -0,0 +1,224 @@
+"""
+Per-request SQL Profiler
+
+SQLAlchemy のエンジンイベントで、リクエストごとのクエリ数・DB時間・
+同じ文の繰り返し（N+1 の兆候）を記録し、エンドポイント単位で集計する。
+
+- SQL_PROFILER_SAMPLE_RATE の割合のリクエストだけを計測する
+  （計測しないリクエストでは ContextVar を1回参照するだけ）
+- 同じ文が SQL_PROFILER_N_PLUS_ONE_THRESHOLD 回以上実行されたら警告ログを出す
+- @query_budget(n) を付けたエンドポイントがクエリ数の上限を超えたら警告ログを出す。
+  SQL_PROFILER_ENFORCE_BUDGETS が true（テスト）の場合は QueryBudgetExceeded を送出する
+- Server-Timing ヘッダーは SQL_PROFILER_SERVER_TIMING が true（開発・テスト）の場合のみ付ける
+  （クエリ数・DB時間をクライアントに見せない）
+"""
+import random
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from flask import Flask, Response, current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 計測中のリクエストのプロファイル（計測しない場合は None）
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "sql_profile", default=None
+)
+
+# ログに出す文の最大長
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class QueryBudgetExceeded(Exception):
+    """エンドポイントのクエリ数が上限を超えた（SQL_PROFILER_ENFORCE_BUDGETS 有効時）"""
+
+
+def query_budget(max_queries: int) -> Callable:
+    """
+    エンドポイントの1リクエストあたりのクエリ数の上限を宣言するデコレータ
+
+    Args:
+        max_queries: 許容するクエリ数
+    """
+    def decorator(view: Callable) -> Callable:
+        view.query_budget = max_queries
+        return view
+    return decorator
+
+
+class RequestProfile:
+    """1リクエスト分の計測結果"""
+
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        self.statements[statement] += 1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        conn.info.setdefault("sql_profiler_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is None:
+        return
+    started = conn.info.get("sql_profiler_started")
+    if started:
+        profile.record(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(exception_context):
+    # 失敗した文では after_cursor_execute が呼ばれないため、ここで開始時刻を取り出す
+    # （残すとプールされた接続でスタックが伸び、以後の計測が別の文の開始時刻と組になる）
+    conn = exception_context.connection
+    if conn is None:
+        return
+    started = conn.info.get("sql_profiler_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    profile = _current_profile.get()
+    if profile is not None and exception_context.statement is not None:
+        profile.record(exception_context.statement, elapsed)
+
+
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def _install_listeners() -> None:
+    """全エンジン（レプリカを含む）にイベントリスナーを1回だけ登録"""
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listeners_installed = True
+
+
+class SQLProfiler:
+    """リクエスト単位のSQL計測とエンドポイント別の集計"""
+
+    def __init__(self, app: Optional[Flask] = None):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict] = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask) -> None:
+        """
+        Args:
+            app: Flaskアプリ（SQL_PROFILER_SAMPLE_RATE = 0 の場合は計測しない）
+        """
+        app.extensions["sql_profiler"] = self
+        if app.config.get("SQL_PROFILER_SAMPLE_RATE", 0) <= 0:
+            return
+
+        _install_listeners()
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._reset)
+
+    def stats(self) -> Dict:
+        """エンドポイント別のクエリ数・DB時間・N+1 の検出数"""
+        with self._lock:
+            return {
+                endpoint: {
+                    **entry,
+                    "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                    "avg_db_ms": round(entry["db_ms"] / entry["requests"], 3),
+                    "db_ms": round(entry["db_ms"], 3),
+                }
+                for endpoint, entry in self._endpoints.items()
+            }
+
+    def reset_stats(self) -> None:
+        """集計をクリア"""
+        with self._lock:
+            self._endpoints.clear()
+
+    def _start(self) -> None:
+        if random.random() < current_app.config["SQL_PROFILER_SAMPLE_RATE"]:
+            _current_profile.set(RequestProfile())
+
+    def _reset(self, exc=None) -> None:
+        _current_profile.set(None)
+
+    def _finish(self, response: Response) -> Response:
+        profile = _current_profile.get()
+        if profile is None:
+            return response
+        _current_profile.set(None)
+
+        config = current_app.config
+        endpoint = request.endpoint or "<unmatched>"
+        threshold = config["SQL_PROFILER_N_PLUS_ONE_THRESHOLD"]
+        repeated = [
+            (statement, count)
+            for statement, count in profile.statements.most_common(3)
+            if count >= threshold
+        ]
+        view = current_app.view_functions.get(request.endpoint)
+        budget = getattr(view, "query_budget", None)
+        over_budget = budget is not None and profile.queries > budget
+
+        self._aggregate(endpoint, profile, repeated, over_budget)
+        if config["SQL_PROFILER_SERVER_TIMING"]:
+            response.headers["Server-Timing"] = (
+                f'db;dur={profile.db_seconds * 1000:.2f};desc="{profile.queries} queries"'
+            )
+
+        for statement, count in repeated:
+            current_app.logger.warning(
+                f"Possible N+1 in {endpoint}: {count} x "
+                f"{statement[:STATEMENT_PREVIEW_LENGTH]}"
+            )
+
+        if over_budget:
+            message = (
+                f"Query budget exceeded in {endpoint}: "
+                f"{profile.queries} queries (budget {budget})"
+            )
+            if config["SQL_PROFILER_ENFORCE_BUDGETS"]:
+                raise QueryBudgetExceeded(message)
+            current_app.logger.warning(message)
+
+        return response
+
+    def _aggregate(self, endpoint: str, profile: RequestProfile, repeated, over_budget: bool) -> None:
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_ms": 0.0,
+                "n_plus_one_requests": 0,
+                "budget_exceeded": 0,
+                "last_repeated_statement": None,
+            })
+            entry["requests"] += 1
+            entry["queries"] += profile.queries
+            entry["max_queries"] = max(entry["max_queries"], profile.queries)
+            entry["db_ms"] += profile.db_seconds * 1000
+            entry["budget_exceeded"] += over_budget
+            if repeated:
+                entry["n_plus_one_requests"] += 1
+                entry["last_repeated_statement"] = repeated[0][0][:STATEMENT_PREVIEW_LENGTH]
+
+
+# Singleton instance (initialized in create_app)
+sql_profiler = SQLProfiler()
@@ -0,0 +1,102 @@
+"""
+Benchmark: streamed AI advice (POST /ai/advice, Server-Sent Events)
+
+Stores a calculation without AI analysis, then asks for advice against the
+fake model in benchmarks/fake_gemini.py, which takes BENCH_DELAY seconds
+until its first chunk and BENCH_CHUNK_DELAY seconds between chunks.
+
+Compares, per request:
+
+    blocking  POST /calculate with synchronous AI analysis: nothing is
+              shown until the whole analysis has been generated
+    stream    POST /ai/advice: time to the first byte (meta event), to the
+              first advice token and to the final result event
+
+Usage:
+    python benchmarks/bench_ai_advice_stream.py
+    BENCH_DELAY=1.0 BENCH_CHUNK_DELAY=0.1 python benchmarks/bench_ai_advice_stream.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app  # noqa: E402
+from fake_gemini import FakeGenerativeModel, install_fake_model  # noqa: E402
+
+DELAY = float(os.getenv("BENCH_DELAY", "0.3"))
+CHUNK_DELAY = float(os.getenv("BENCH_CHUNK_DELAY", "0.03"))
+ROUNDS = int(os.getenv("BENCH_ROUNDS", "5"))
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+def calculate(client, use_ai_analysis):
+    return client.post(
+        "https://localhost/api/v1/calculate",
+        json={"user_info": USER_INFO, "options": {"use_ai_analysis": use_ai_analysis}},
+    )
+
+
+def stream_advice(client, calculation_id):
+    """Return (first byte, first token, result) in ms and the result payload"""
+    started = time.perf_counter()
+    response = client.post(
+        "https://localhost/api/v1/ai/advice",
+        json={"calculation_id": calculation_id, "question": "生活費を減らすには？"},
+        buffered=False,
+    )
+    first_byte = first_token = done = None
+    result = None
+    for chunk in response.response:
+        elapsed = (time.perf_counter() - started) * 1000
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        event, _, data = text.partition("\ndata: ")
+        if first_byte is None:
+            first_byte = elapsed
+        if event == "event: token" and first_token is None:
+            first_token = elapsed
+        if event in ("event: result", "event: error"):
+            done = elapsed
+            result = json.loads(data)
+    response.close()
+    return first_byte, first_token, done, result
+
+
+def main():
+    app = create_app("testing")
+    app.config["GEMINI_API_KEY"] = "fake"
+    install_fake_model(app, FakeGenerativeModel(delay=DELAY, chunk_delay=CHUNK_DELAY))
+    client = app.test_client()
+
+    print(f"fake model: {DELAY}s to first chunk, {CHUNK_DELAY}s between chunks, {ROUNDS} rounds")
+    blocking, first_bytes, first_tokens, totals = [], [], [], []
+    saved = 0
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        calculate(client, True)
+        blocking.append((time.perf_counter() - started) * 1000)
+
+        calculation_id = calculate(client, False).get_json()["data"]["calculation_id"]
+        first_byte, first_token, done, result = stream_advice(client, calculation_id)
+        first_bytes.append(first_byte)
+        first_tokens.append(first_token)
+        totals.append(done)
+        history = client.get(f"https://localhost/api/v1/ai/advice/{calculation_id}").get_json()
+        if result.get("saved") and [item["advice_id"] for item in history["data"]["advice"]] == [result["advice_id"]]:
+            saved += 1
+
+    print(f"  {'':<22} {'median ms':>10}")
+    print(f"  {'blocking /calculate':<22} {statistics.median(blocking):>10.1f}")
+    print(f"  {'stream first byte':<22} {statistics.median(first_bytes):>10.1f}")
+    print(f"  {'stream first token':<22} {statistics.median(first_tokens):>10.1f}")
+    print(f"  {'stream result':<22} {statistics.median(totals):>10.1f}")
+    print(f"results persisted: {saved}/{ROUNDS}")
+
+
+if __name__ == "__main__":
+    main()
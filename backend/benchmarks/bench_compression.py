@@ -0,0 +1,78 @@
+"""
+Benchmark: response compression (bytes on the wire and CPU per request)
+
+1. Size and compression CPU time of a /calculate response (identity,
+   gzip at several levels, brotli when the package is installed)
+2. End-to-end time per request through the test client:
+   - POST /calculate (compressed on the fly in after_request)
+   - GET /calculate/<id> served from the precompressed payload cache
+
+Usage:
+    python benchmarks/bench_compression.py
+    BENCH_SIMULATION_YEARS=50 python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.compression import ENCODINGS, compress  # noqa: E402
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "300"))
+SIMULATION_YEARS = int(os.getenv("BENCH_SIMULATION_YEARS", "120"))
+
+REQUEST_BODY = {
+    "user_info": {
+        "age": 30,
+        "monthly_expenses": 150000,
+        "total_assets": 5000000,
+        "monthly_support": 60000,
+    },
+    "options": {"use_ai_analysis": False, "simulation_years": SIMULATION_YEARS},
+}
+
+
+def cpu_us(func, repeat=REQUESTS):
+    func()
+    started = time.thread_time()
+    for _ in range(repeat):
+        func()
+    return (time.thread_time() - started) / repeat * 1_000_000
+
+
+def main():
+    app = create_app("testing")
+    client = app.test_client()
+    response = client.post("https://localhost/api/v1/calculate", json=REQUEST_BODY)
+    data = response.data
+    url = f"https://localhost/api/v1/calculate/{response.get_json()['data']['calculation_id']}"
+
+    print(f"/calculate response, {SIMULATION_YEARS} years: {len(data)} bytes uncompressed")
+    print(f"  {'encoding':<10} {'bytes':>7} {'ratio':>7} {'cpu us':>9}")
+    cases = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if "br" in ENCODINGS:
+        cases += [("br", 5), ("br", 11)]
+    for encoding, level in cases:
+        size = len(compress(data, encoding, level))
+        cost = cpu_us(lambda: compress(data, encoding, level))
+        print(f"  {encoding + '-' + str(level):<10} {size:>7} {size / len(data):>7.3f} {cost:>9.1f}")
+
+    print(f"Per request through the app, {REQUESTS} requests (CPU us/request, bytes)")
+    client.get(url)  # fill the payload cache
+    for name, method, target in (
+        ("POST /calculate", client.post, "https://localhost/api/v1/calculate"),
+        ("GET /calculate/<id>", client.get, url),
+    ):
+        for accept_encoding in ("identity", ENCODINGS[0]):
+            kwargs = {"headers": {"Accept-Encoding": accept_encoding}}
+            if name.startswith("POST"):
+                kwargs["json"] = REQUEST_BODY
+            size = len(method(target, **kwargs).data)
+            cost = cpu_us(lambda: method(target, **kwargs))
+            print(f"  {name:<20} {accept_encoding:<9} {cost:>9.1f} {size:>7}")
+
+
+if __name__ == "__main__":
+    main()
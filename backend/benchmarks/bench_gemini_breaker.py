@@ -0,0 +1,90 @@
+"""
+Benchmark: deadline budget and circuit breaker around Gemini calls
+
+Sends POST /calculate (synchronous AI analysis) against the fake model in
+benchmarks/fake_gemini.py while the "upstream" goes through phases:
+
+    healthy   fast answers
+    slow      every call takes longer than the /calculate SLO
+    failing   every call raises (the half-open probe fails, breaker reopens)
+    recovered fast answers again (the half-open probe closes the breaker)
+
+For each request prints the latency, the circuit breaker state afterwards
+and whether the analysis came from the model or the rule-based fallback.
+A slow upstream costs at most the remaining SLO per request until the
+breaker opens; while open, requests do not wait for the model at all.
+
+Usage:
+    python benchmarks/bench_gemini_breaker.py
+    BENCH_SLO=2.0 BENCH_SLOW_DELAY=5 python benchmarks/bench_gemini_breaker.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app  # noqa: E402
+from fake_gemini import RESPONSE, FakeGenerativeModel, install_fake_model  # noqa: E402
+
+SLO = float(os.getenv("BENCH_SLO", "1.0"))
+SLOW_DELAY = float(os.getenv("BENCH_SLOW_DELAY", "3.0"))
+FAILURES = int(os.getenv("BENCH_BREAKER_FAILURES", "3"))
+RESET_TIMEOUT = float(os.getenv("BENCH_RESET_TIMEOUT", "1.0"))
+
+REQUEST_BODY = {
+    "user_info": {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000},
+    "options": {"use_ai_analysis": True},
+}
+
+
+def main():
+    app = create_app("testing")
+    app.config.update(
+        GEMINI_API_KEY="fake",
+        CALCULATION_SLO=SLO,
+        GEMINI_BREAKER_FAILURES=FAILURES,
+        GEMINI_BREAKER_SLOW_CALL=SLO,
+        GEMINI_BREAKER_RESET_TIMEOUT=RESET_TIMEOUT,
+    )
+    model = install_fake_model(app, FakeGenerativeModel(delay=0.05))
+    service = app.extensions["gemini_service"]
+    client = app.test_client()
+
+    print(
+        f"SLO {SLO}s, breaker opens after {FAILURES} failures, "
+        f"half-open after {RESET_TIMEOUT}s, slow upstream {SLOW_DELAY}s"
+    )
+    print(f"  {'phase':<10} {'#':>2} {'ms':>8} {'breaker':<10} analysis")
+    phases = (
+        ("healthy", 0.05, 0.0, 2),
+        ("slow", SLOW_DELAY, 0.0, FAILURES + 3),
+        ("failing", 0.05, 1.0, 3),
+        ("recovered", 0.05, 0.0, 3),
+    )
+    for phase, delay, error_rate, requests in phases:
+        model.delay = delay
+        model.error_rate = error_rate
+        if phase in ("failing", "recovered"):
+            # wait for half-open: the first request is the probe
+            time.sleep(RESET_TIMEOUT)
+        for number in range(1, requests + 1):
+            started = time.perf_counter()
+            response = client.post("https://localhost/api/v1/calculate", json=REQUEST_BODY)
+            elapsed = (time.perf_counter() - started) * 1000
+            analysis = response.get_json()["data"]["result"]["ai_analysis"]
+            source = "model" if analysis["suggestions"] == RESPONSE["suggestions"] else "fallback"
+            print(f"  {phase:<10} {number:>2} {elapsed:>8.1f} {service.breaker.state:<10} {source}")
+
+    stats = service.stats()
+    print(f"fallbacks: {stats['fallbacks']}")
+    breaker = stats["circuit_breaker"]
+    print(
+        f"breaker: opened {breaker['times_opened']}x, rejected {breaker['rejected']}, "
+        f"slow calls {breaker['slow_calls']}, upstream calls made {model.calls}"
+    )
+
+
+if __name__ == "__main__":
+    main()
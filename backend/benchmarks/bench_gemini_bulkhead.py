@@ -0,0 +1,92 @@
+"""
+Benchmark: Gemini concurrency limit (bulkhead) under a burst of AI analyses
+
+A burst of BENCH_CLIENTS threads calls GeminiService.analyze_life_plan at
+once against a fake model that takes BENCH_DELAY seconds per call
+(benchmarks/fake_gemini.py). Compares no limit with the configured
+GEMINI_MAX_CONCURRENCY / GEMINI_MAX_QUEUE / GEMINI_QUEUE_TIMEOUT:
+
+- peak concurrent upstream calls
+- per-call latency (p50 / p95 / max)
+- how many callers got the rule-based fallback, and the queue wait
+
+Usage:
+    python benchmarks/bench_gemini_bulkhead.py
+    BENCH_CLIENTS=64 BENCH_DELAY=0.5 python benchmarks/bench_gemini_bulkhead.py
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app  # noqa: E402
+from app.services.calculator import LifePlanCalculator  # noqa: E402
+from fake_gemini import FakeGenerativeModel, install_fake_model  # noqa: E402
+
+CLIENTS = int(os.getenv("BENCH_CLIENTS", "32"))
+DELAY = float(os.getenv("BENCH_DELAY", "0.2"))
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+RESULT = LifePlanCalculator(**USER_INFO).calculate()
+
+
+def burst(app, service):
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(CLIENTS)
+
+    def call():
+        with app.app_context():
+            start.wait()
+            started = time.perf_counter()
+            service.analyze_life_plan(USER_INFO, RESULT)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=call) for _ in range(CLIENTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+
+def main():
+    print(f"{CLIENTS} concurrent analyses, {DELAY * 1000:.0f} ms per upstream call")
+    print(
+        f"  {'limit':<22} {'peak':>5} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+        f"{'fallback':>9} {'avg wait':>9}"
+    )
+    for name, concurrency, queue, timeout in (
+        ("none", 0, 0, 0.0),
+        ("4, queue 8, 2s", 4, 8, 2.0),
+        ("4, queue 8, 0.3s", 4, 8, 0.3),
+        ("4, no queue", 4, 0, 0.0),
+    ):
+        app = create_app("testing")
+        app.config.update(
+            GEMINI_API_KEY="fake",
+            GEMINI_MAX_CONCURRENCY=concurrency,
+            GEMINI_MAX_QUEUE=queue,
+            GEMINI_QUEUE_TIMEOUT=timeout,
+        )
+        model = install_fake_model(app, FakeGenerativeModel(delay=DELAY))
+        service = app.extensions["gemini_service"]
+        latencies = burst(app, service)
+        stats = service.stats()
+        wait = stats["bulkhead"]["avg_queue_wait_ms"]
+        print(
+            f"  {name:<22} {model.peak_active:>5} "
+            f"{statistics.median(latencies) * 1000:>8.1f} "
+            f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:>8.1f} "
+            f"{latencies[-1] * 1000:>8.1f} {sum(stats['fallbacks'].values()):>9} "
+            f"{wait if wait is not None else 0:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
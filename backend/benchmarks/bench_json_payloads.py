@@ -0,0 +1,80 @@
+"""
+Benchmark: JSON encoding and cached payloads for calculation responses
+
+1. Encoding a 120-year calculation response with Flask's DefaultJSONProvider
+   (stdlib json) and FastJSONProvider (orjson when installed)
+2. GET /calculate/<id> with the payload cache disabled and enabled
+   (the cached path skips both the ORM load and the encoding), with and
+   without a matching If-None-Match (304: no body, and without the cache
+   only the version columns are read)
+
+Usage:
+    python benchmarks/bench_json_payloads.py
+"""
+import os
+import sys
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from app.json_provider import FastJSONProvider, orjson  # noqa: E402
+from app.services.payload_cache import configure_payload_cache  # noqa: E402
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "500"))
+SIMULATION_YEARS = 120
+
+USER_INFO = {
+    "age": 30,
+    "monthly_expenses": 150000,
+    "total_assets": 5000000,
+    "monthly_support": 60000,
+}
+
+
+def per_call_us(func, repeat=REQUESTS):
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+def main():
+    app = create_app("testing")
+    client = app.test_client()
+    response = client.post(
+        "https://localhost/api/v1/calculate",
+        json={
+            "user_info": USER_INFO,
+            "options": {"use_ai_analysis": False, "simulation_years": SIMULATION_YEARS},
+        },
+    )
+    calculation_id = response.get_json()["data"]["calculation_id"]
+    url = f"https://localhost/api/v1/calculate/{calculation_id}"
+    body = client.get(url).get_json()
+
+    print(f"orjson: {'installed' if orjson is not None else 'not installed (stdlib fallback)'}")
+    print(f"Encoding a {SIMULATION_YEARS}-year response (us/call)")
+    with app.app_context():
+        for name, provider in (
+            ("stdlib", DefaultJSONProvider(app)),
+            ("fast", FastJSONProvider(app)),
+        ):
+            size = len(provider.response(body).get_data())
+            print(f"  {name:<8} {per_call_us(lambda: provider.response(body)):>9.1f}  ({size} bytes)")
+
+    etag = client.get(url).headers["ETag"]
+    print(f"GET /calculate/<id>, {REQUESTS} requests (us/request)")
+    print(f"  {'':<8} {'200':>9} {'304':>9}")
+    for name, max_entries in (("no cache", 0), ("cached", 1024)):
+        configure_payload_cache(max_entries=max_entries, max_bytes=16 * 1024 * 1024, ttl=300)
+        full = per_call_us(lambda: client.get(url))
+        not_modified = per_call_us(lambda: client.get(url, headers={"If-None-Match": etag}))
+        print(f"  {name:<8} {full:>9.1f} {not_modified:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: rate limiting across workers
+
+Simulates N gunicorn workers, each with its own limiter storage, sending
+interleaved requests from one client against "60 per minute" and reports
+how many requests were allowed in total and how many shared-store calls
+were made.
+
+Storages:
+    memory        each worker counts on its own (the previous default)
+    shared        every check goes to the shared store (redis://)
+    local+shared  LocalSharedStorage: in-process counters, synced with the
+                  shared store every RATELIMIT_SYNC_INTERVAL seconds or
+                  RATELIMIT_SYNC_BATCH pending hits
+    local+down    LocalSharedStorage with the shared store unavailable
+
+The shared store is an in-process MemoryStorage with a simulated network
+round trip (BENCH_SHARED_LATENCY_MS), so no Redis server is needed.
+
+Usage:
+    python benchmarks/bench_rate_limit_storage.py
+    BENCH_WORKERS=8 BENCH_REQUESTS=2000 python benchmarks/bench_rate_limit_storage.py
+"""
+import os
+import sys
+import time
+
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from app.services.rate_limit_storage import LocalSharedStorage  # noqa: E402
+
+WORKERS = int(os.getenv("BENCH_WORKERS", "4"))
+REQUESTS = int(os.getenv("BENCH_REQUESTS", "1000"))
+LATENCY = float(os.getenv("BENCH_SHARED_LATENCY_MS", "0.5")) / 1000
+# Requests per second the client sends (spread over the workers)
+RATE = float(os.getenv("BENCH_RATE", "200"))
+LIMIT = parse(Config.RATELIMIT_DEFAULT)
+
+
+class RemoteStorage(MemoryStorage):
+    """MemoryStorage that sleeps like a network round trip and counts calls"""
+
+    def __init__(self, available=True):
+        super().__init__()
+        self.available = available
+        self.calls = 0
+
+    def _round_trip(self):
+        self.calls += 1
+        time.sleep(LATENCY)
+        if not self.available:
+            raise ConnectionError("shared store unavailable")
+
+    # get is not wrapped: MemoryStorage.incr calls it internally, and the
+    # fixed-window strategy only uses incr when consuming a hit
+    def incr(self, key, expiry, amount=1):
+        self._round_trip()
+        return super().incr(key, expiry, amount=amount)
+
+    def get_expiry(self, key):
+        self._round_trip()
+        return super().get_expiry(key)
+
+
+def local_shared(shared):
+    return LocalSharedStorage(
+        "local+memory://",
+        sync_interval=Config.RATELIMIT_SYNC_INTERVAL,
+        sync_batch=Config.RATELIMIT_SYNC_BATCH,
+        retry_interval=Config.RATELIMIT_SYNC_RETRY,
+        shared_storage=shared,
+    )
+
+
+def run(name, make_worker_storage, shared=None):
+    limiters = [FixedWindowRateLimiter(make_worker_storage()) for _ in range(WORKERS)]
+    allowed = 0
+    checking = 0.0
+    started = time.perf_counter()
+    for i in range(REQUESTS):
+        # Pace the client so the run spans several sync intervals
+        delay = started + i / RATE - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        t = time.perf_counter()
+        allowed += limiters[i % WORKERS].hit(LIMIT, "127.0.0.1")
+        checking += time.perf_counter() - t
+
+    calls = shared.calls if shared is not None else 0
+    print(
+        f"  {name:<13} {allowed:>8} {calls:>13} "
+        f"{calls / REQUESTS:>13.3f} {checking / REQUESTS * 1000:>8.3f}"
+    )
+
+
+def main():
+    print(
+        f"{WORKERS} workers, {REQUESTS} requests at {RATE:g}/s, limit {LIMIT}, "
+        f"shared round trip {LATENCY * 1000:g} ms"
+    )
+    print(f"  {'storage':<13} {'allowed':>8} {'shared calls':>13} {'calls/request':>13} {'ms/check':>8}")
+
+    run("memory", MemoryStorage)
+
+    shared = RemoteStorage()
+    run("shared", lambda: shared, shared)
+
+    shared = RemoteStorage()
+    run("local+shared", lambda: local_shared(shared), shared)
+
+    shared = RemoteStorage(available=False)
+    run("local+down", lambda: local_shared(shared), shared)
+
+
+if __name__ == "__main__":
+    main()
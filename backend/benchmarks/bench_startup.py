@@ -0,0 +1,143 @@
+"""
+Benchmark: cold start (import time and time to first request)
+
+Each run is a fresh interpreter that measures:
+
+    import      `from app import create_app`
+    create      create_app() (config, extensions, blueprints, optional create_all)
+    warm        worker_preloader.warm_up() (--warm-up / --preload)
+    prepare     worker_preloader.prepare_worker() in the forked worker (--preload)
+    first_get   the first GET /health
+    first_post  the first POST /calculate
+    genai       whether google.generativeai ended up imported
+
+"worker ready" is the time a new worker needs before it can answer its
+first request: everything up to first_get for a fresh process, and only
+prepare + first_get for a worker forked from a preloaded master
+(gunicorn preload_app, see gunicorn.conf.py).
+
+The database is a migrated SQLite file, so create_all finds every table
+already there (the steady state of a restarted or autoscaled worker).
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --auto-create
+    python benchmarks/bench_startup.py --preload
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import json, os, sys, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+from app.preload import worker_preloader
+if WARM_UP or PRELOAD:
+    worker_preloader.warm_up(app)
+warmed = time.perf_counter()
+result = {"import": imported - started, "create": created - imported, "warm": warmed - created}
+
+if PRELOAD:
+    read_fd, write_fd = os.pipe()
+    if os.fork():
+        os.close(write_fd)
+        with os.fdopen(read_fd) as pipe:
+            print(pipe.read())
+        os.wait()
+        sys.exit(0)
+    os.close(read_fd)
+    forked = time.perf_counter()
+    worker_preloader.prepare_worker(app)
+    warmed = time.perf_counter()
+    result["prepare"] = warmed - forked
+
+client = app.test_client()
+client.get("https://localhost/api/v1/health")
+first_get = time.perf_counter()
+client.post("https://localhost/api/v1/calculate", json={
+    "user_info": {"age": 40, "monthly_expenses": 200000, "total_assets": 8000000},
+    "options": {"use_ai_analysis": False},
+})
+first_post = time.perf_counter()
+result.update({
+    "first_get": first_get - warmed,
+    "first_post": first_post - first_get,
+    "genai": "google.generativeai" in sys.modules,
+})
+if PRELOAD:
+    os.write(write_fd, json.dumps(result).encode())
+    os._exit(0)
+print(json.dumps(result))
+"""
+
+
+def migrate(database_url):
+    from alembic import command
+    from alembic.config import Config as AlembicConfig
+
+    config = AlembicConfig(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    command.upgrade(config, "head")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--auto-create", action="store_true", help="DATABASE_AUTO_CREATE=true")
+    parser.add_argument("--warm-up", action="store_true", help="call warm_up() before the first request")
+    parser.add_argument("--preload", action="store_true", help="fork a worker from a warmed-up app (POSIX only)")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp()
+    database_url = f"sqlite:///{os.path.join(tmpdir, 'startup.db')}"
+    sys.path.insert(0, BACKEND_DIR)
+    migrate(database_url)
+
+    env = {
+        **os.environ,
+        "FLASK_ENV": "production",
+        "DATABASE_URL": database_url,
+        "DATABASE_AUTO_CREATE": "true" if args.auto_create else "false",
+        "SESSION_TYPE": "memory",
+        "PYTHONPATH": BACKEND_DIR,
+    }
+    child = f"WARM_UP = {args.warm_up}\nPRELOAD = {args.preload}\n" + CHILD
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", child],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(
+        f"{args.runs} runs, auto_create={args.auto_create}, warm_up={args.warm_up}, "
+        f"preload={args.preload} (median ms)"
+    )
+    keys = ["import", "create", "warm"] + (["prepare"] if args.preload else []) + ["first_get", "first_post"]
+    for key in keys:
+        print(f"  {key:<13} {statistics.median(run[key] for run in runs) * 1000:>8.1f}")
+    ready_keys = ("prepare", "first_get") if args.preload else ("import", "create", "warm", "first_get")
+    ready = statistics.median(sum(run[key] for key in ready_keys) for run in runs)
+    print(f"  {'worker ready':<13} {ready * 1000:>8.1f}")
+    print(f"  genai imported: {runs[-1]['genai']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Local stand-in for google.generativeai.GenerativeModel
+
+Answers generate_content() with a fixed JSON analysis after a configurable
+delay, optionally failing, so the Gemini code paths can be exercised
+without an API key or network access. With stream=True it yields the
+advice text and then the JSON block in small chunks (chunk_delay apart),
+the way the streaming prompt asks the model to answer:
+
+    from fake_gemini import FakeGenerativeModel, install_fake_model
+
+    app = create_app("testing")
+    app.config["GEMINI_API_KEY"] = "fake"
+    model = install_fake_model(app, FakeGenerativeModel(delay=0.2))
+"""
+import json
+import threading
+import time
+
+RESPONSE = {
+    "risk_factors": ["生活費が収入を上回っています"],
+    "suggestions": ["固定費を見直してみましょう"],
+    "advice_message": "できることから少しずつ始めてみましょう。",
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """
+    Args:
+        delay: seconds until the first streamed chunk (a plain call also waits
+            out the chunk delays, as if the whole answer were generated)
+        error_rate: fraction of calls that raise (every round(1 / error_rate)-th call)
+        response: object returned as JSON text
+        chunk_delay: seconds between streamed chunks
+        chunk_size: characters per streamed chunk
+    """
+
+    def __init__(self, delay=0.0, error_rate=0.0, response=None, chunk_delay=0.0, chunk_size=8):
+        self.delay = delay
+        self.error_rate = error_rate
+        self.response = response or RESPONSE
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        if stream:
+            return self._stream()
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            # as long as the streamed answer takes to finish
+            time.sleep(self.delay + self.chunk_delay * (len(self._chunks()) - 1))
+            if self.error_rate and call % max(round(1 / self.error_rate), 1) == 0:
+                raise RuntimeError("fake Gemini error")
+            return FakeResponse(json.dumps(self.response, ensure_ascii=False))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _stream(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.error_rate and call % max(round(1 / self.error_rate), 1) == 0:
+                raise RuntimeError("fake Gemini error")
+            for number, chunk in enumerate(self._chunks()):
+                if number:
+                    time.sleep(self.chunk_delay)
+                yield FakeResponse(chunk)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _chunks(self):
+        lists = {key: value for key, value in self.response.items() if key != "advice_message"}
+        text = (
+            self.response["advice_message"]
+            + "\n\n```json\n" + json.dumps(lists, ensure_ascii=False) + "\n```"
+        )
+        return [text[start:start + self.chunk_size] for start in range(0, len(text), self.chunk_size)]
+
+
+def install_fake_model(app, model):
+    """Build the app's Gemini service (cache disabled) and swap in the fake model"""
+    from app.services.gemini_service import get_gemini_service
+
+    app.config["GEMINI_CACHE_ENABLED"] = False
+    app.extensions.pop("gemini_service", None)
+    with app.app_context():
+        service = get_gemini_service()
+    service.model = model
+    return model
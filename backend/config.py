@@ -21,12 +21,59 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///arukuwa.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
+    # Read replica（@read_replica を付けた GET エンドポイントの読み取り先。未設定ならプライマリのみ）
+    DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+    # Connection pool (PostgreSQL など。SQLite ファイルには適用しない)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # SQLite（WAL モードで読み取りが書き込みをブロックしない。busy_timeout はミリ秒）
+    SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() == "true"
+    SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))
+
+    # 起動時に db.create_all() でテーブルを作成するか（開発・テストのみ既定で有効）
+    # スキーマは `alembic upgrade head`（または `flask create-db`）で起動前に作成する
+    DATABASE_AUTO_CREATE = os.getenv("DATABASE_AUTO_CREATE", "false").lower() == "true"
+
+    # ワーカーがリクエストを受ける前に import・計算のコードパス・DB接続を準備する
+    # （gunicorn.conf.py から app.preload を呼ぶ）
+    WORKER_WARM_UP = os.getenv("WORKER_WARM_UP", "true").lower() == "true"
+
+    # GET /health/metrics（キャッシュ・ブレーカーなどの内部状態。無効の場合は 404）
+    # METRICS_TOKEN を設定した場合は Authorization: Bearer <token> が必要
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Per-request SQL profiler（計測するリクエストの割合。0 で無効）
+    SQL_PROFILER_SAMPLE_RATE = float(os.getenv("SQL_PROFILER_SAMPLE_RATE", "0.1"))
+    # 同じ文がこの回数以上実行されたリクエストを N+1 の疑いとして記録する
+    SQL_PROFILER_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_PROFILER_N_PLUS_ONE_THRESHOLD", "5"))
+    # @query_budget の上限を超えたら例外にする（false の場合は警告ログのみ）
+    SQL_PROFILER_ENFORCE_BUDGETS = False
+    # 計測したレスポンスに Server-Timing（クエリ数・DB時間）を付ける
+    SQL_PROFILER_SERVER_TIMING = os.getenv("SQL_PROFILER_SERVER_TIMING", "false").lower() == "true"
+
+    # Calculation storage
+    # 年次データは calculations.yearly_series に圧縮して保存する。
+    # calculation_yearly_data テーブルへの行保存はSQL集計用（不要なら false）
+    CALCULATION_YEARLY_ROWS = os.getenv("CALCULATION_YEARLY_ROWS", "true").lower() == "true"
 
     # Session
-    SESSION_TYPE = os.getenv("SESSION_TYPE", "filesystem")
+    # "sql"（server_sessions テーブル） / "redis"（SESSION_REDIS_URL または REDIS_URL） / "memory"（テスト用）
+    # それ以外（"filesystem" など）は Flask-Session を使う
+    SESSION_TYPE = os.getenv("SESSION_TYPE", "sql")
     SESSION_PERMANENT = False
     SESSION_USE_SIGNER = True
     SESSION_FILE_DIR = "flask_session"
+    SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL")
+    SESSION_KEY_PREFIX = "arukuwa:session:"
+    # プロセス内の read-through キャッシュ（秒。0 で無効）
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "5"))
+    SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
@@ -34,6 +81,12 @@ class Config:
         seconds=int(os.getenv("PERMANENT_SESSION_LIFETIME", "86400"))
     )
 
+    # Expired session reaper（間隔は秒。0 の場合はバックグラウンド削除なし）
+    SESSION_REAPER_INTERVAL = int(os.getenv("SESSION_REAPER_INTERVAL", "600"))
+    SESSION_REAPER_BATCH_SIZE = int(os.getenv("SESSION_REAPER_BATCH_SIZE", "500"))
+    # 1回の実行で削除するチャンク数の上限（残りは次回に持ち越す）
+    SESSION_REAPER_MAX_BATCHES = int(os.getenv("SESSION_REAPER_MAX_BATCHES", "100"))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")
 
@@ -43,9 +96,87 @@ class Config:
     GEMINI_TEMPERATURE = float(os.getenv("GEMINI_TEMPERATURE", "0.7"))
     GEMINI_MAX_TOKENS = int(os.getenv("GEMINI_MAX_TOKENS", "2048"))
 
+    # Calculation result memoization (0 で無効)
+    CALCULATION_CACHE_MAX_ENTRIES = int(os.getenv("CALCULATION_CACHE_MAX_ENTRIES", "1024"))
+    CALCULATION_CACHE_MAX_BYTES = int(os.getenv("CALCULATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # GET /calculate/<id> のレスポンス本文キャッシュ (0 で無効)
+    CALCULATION_PAYLOAD_CACHE_MAX_ENTRIES = int(os.getenv("CALCULATION_PAYLOAD_CACHE_MAX_ENTRIES", "1024"))
+    CALCULATION_PAYLOAD_CACHE_MAX_BYTES = int(os.getenv("CALCULATION_PAYLOAD_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    CALCULATION_PAYLOAD_CACHE_TTL = int(os.getenv("CALCULATION_PAYLOAD_CACHE_TTL", "300"))
+    # GET /calculate/<id> の Cache-Control: private, max-age（ブラウザのみ。0 で no-cache）
+    CALCULATION_HTTP_MAX_AGE = int(os.getenv("CALCULATION_HTTP_MAX_AGE", "60"))
+
+    # Response compression (gzip / brotli を Accept-Encoding で選択)
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+    # simulation_years の上限（月次の残高は 件数 × 年数 × 12 の配列になる）
+    SIMULATION_MAX_YEARS = int(os.getenv("SIMULATION_MAX_YEARS", "120"))
+
+    # Monte Carlo simulation (options.mode = "monte_carlo")
+    MONTE_CARLO_DEFAULT_PATHS = 1000
+    MONTE_CARLO_MAX_PATHS = int(os.getenv("MONTE_CARLO_MAX_PATHS", "20000"))
+    # 1リクエストあたりのCPU予算（パス数 × 年数の上限と計算時間の上限）
+    MONTE_CARLO_MAX_PATH_YEARS = int(os.getenv("MONTE_CARLO_MAX_PATH_YEARS", "1200000"))
+    MONTE_CARLO_TIME_BUDGET = float(os.getenv("MONTE_CARLO_TIME_BUDGET", "2.0"))
+    # パス数が閾値を超えたらプロセスプールで並列実行（0 の場合は常に同一プロセス）
+    MONTE_CARLO_PROCESSES = int(os.getenv("MONTE_CARLO_PROCESSES", "2"))
+    MONTE_CARLO_POOL_THRESHOLD = int(os.getenv("MONTE_CARLO_POOL_THRESHOLD", "10000"))
+
+    # Sensitivity sweep (/calculate/sweep) の最大グリッド点数
+    SWEEP_MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "2500"))
+
+    # Goal-seek solver (/calculate/solve)
+    SOLVE_MAX_ITERATIONS = int(os.getenv("SOLVE_MAX_ITERATIONS", "40"))
+    SOLVE_TOLERANCE = int(os.getenv("SOLVE_TOLERANCE", "100"))
+    # モンテカルロ併用時のCPU予算（パス数 × 年数 × 最大評価回数の上限）
+    SOLVE_MAX_PATH_YEARS = int(os.getenv("SOLVE_MAX_PATH_YEARS", "5000000"))
+
+    # Gemini API の同時呼び出し数（プロセスごと）。上限に達したら最大 GEMINI_MAX_QUEUE 件まで
+    # GEMINI_QUEUE_TIMEOUT 秒待ち、待ち行列も満杯ならすぐにルールベースの分析を返す
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+    GEMINI_MAX_QUEUE = int(os.getenv("GEMINI_MAX_QUEUE", "8"))
+    GEMINI_QUEUE_TIMEOUT = float(os.getenv("GEMINI_QUEUE_TIMEOUT", "2.0"))
+
+    # /calculate の応答時間の目標（秒）。同期のAI分析は計算後の残り時間内に終わらなければフォールバック
+    CALCULATION_SLO = float(os.getenv("CALCULATION_SLO", "10.0"))
+    # Gemini API 呼び出し1回の待ち時間の上限（秒。バックグラウンド分析にも適用）
+    GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20.0"))
+    # 残り時間がこれ未満なら呼び出さずにフォールバック（秒）
+    GEMINI_MIN_BUDGET = float(os.getenv("GEMINI_MIN_BUDGET", "0.5"))
+
+    # Circuit breaker: 失敗（例外・タイムアウト）または GEMINI_BREAKER_SLOW_CALL 秒以上の呼び出しが
+    # GEMINI_BREAKER_FAILURES 回続いたら GEMINI_BREAKER_RESET_TIMEOUT 秒間呼び出しを止め、
+    # その後 GEMINI_BREAKER_HALF_OPEN_CALLS 件の試行が成功したら再開する
+    GEMINI_BREAKER_FAILURES = int(os.getenv("GEMINI_BREAKER_FAILURES", "5"))
+    GEMINI_BREAKER_SLOW_CALL = float(os.getenv("GEMINI_BREAKER_SLOW_CALL", "8.0"))
+    GEMINI_BREAKER_RESET_TIMEOUT = float(os.getenv("GEMINI_BREAKER_RESET_TIMEOUT", "30.0"))
+    GEMINI_BREAKER_HALF_OPEN_CALLS = int(os.getenv("GEMINI_BREAKER_HALF_OPEN_CALLS", "1"))
+
+    # Gemini analysis cache
+    GEMINI_CACHE_ENABLED = os.getenv("GEMINI_CACHE_ENABLED", "true").lower() == "true"
+    GEMINI_CACHE_TTL = int(os.getenv("GEMINI_CACHE_TTL", "3600"))
+    GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "1024"))
+    GEMINI_CACHE_AMOUNT_DIGITS = int(os.getenv("GEMINI_CACHE_AMOUNT_DIGITS", "2"))
+    # 共有キャッシュ: "redis"（REDIS_URL を使用） / "memory"（プロセス内、テスト用） / 空（なし）
+    GEMINI_CACHE_SHARED_BACKEND = os.getenv("GEMINI_CACHE_SHARED_BACKEND") or None
+
+    # Background AI analysis (options.async_ai_analysis)
+    AI_ANALYSIS_WORKERS = int(os.getenv("AI_ANALYSIS_WORKERS", "4"))
+    # 実行待ちにできるジョブ数（超えた分はルールベースの分析のまま ai_status = completed）
+    AI_ANALYSIS_MAX_QUEUE = int(os.getenv("AI_ANALYSIS_MAX_QUEUE", "32"))
+    AI_ANALYSIS_MAX_WAIT = 30  # ロングポーリングの最大待ち時間（秒）
+
     # Rate Limiting
+    # "local+redis://..." でワーカー内カウンタ + 共有ストアへの定期同期（全ワーカー合計で制限）
     RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
     RATELIMIT_DEFAULT = "60 per minute"
+    RATELIMIT_SYNC_INTERVAL = float(os.getenv("RATELIMIT_SYNC_INTERVAL", "1.0"))
+    RATELIMIT_SYNC_BATCH = int(os.getenv("RATELIMIT_SYNC_BATCH", "5"))
+    RATELIMIT_SYNC_RETRY = float(os.getenv("RATELIMIT_SYNC_RETRY", "30"))
 
     # Redis
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
@@ -57,6 +188,10 @@ class DevelopmentConfig(Config):
     DEBUG = True
     SQLALCHEMY_ECHO = False  # Disable SQLAlchemy query logging
     SESSION_COOKIE_SECURE = False  # Allow HTTP in development
+    DATABASE_AUTO_CREATE = os.getenv("DATABASE_AUTO_CREATE", "true").lower() == "true"
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    SQL_PROFILER_SAMPLE_RATE = 1.0
+    SQL_PROFILER_SERVER_TIMING = os.getenv("SQL_PROFILER_SERVER_TIMING", "true").lower() == "true"
 
 
 class ProductionConfig(Config):
@@ -71,7 +206,17 @@ class TestingConfig(Config):
 
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    DATABASE_AUTO_CREATE = True
+    METRICS_ENABLED = True
     RATELIMIT_ENABLED = False
+    AI_ANALYSIS_WORKERS = 0  # テストでは同期実行
+    GEMINI_CACHE_SHARED_BACKEND = "memory"
+    MONTE_CARLO_PROCESSES = 0
+    SESSION_REAPER_INTERVAL = 0
+    SESSION_TYPE = "memory"
+    SQL_PROFILER_SAMPLE_RATE = 1.0
+    SQL_PROFILER_ENFORCE_BUDGETS = True  # クエリ数の上限を超えたらテストを失敗させる
+    SQL_PROFILER_SERVER_TIMING = True
 
 
 # Configuration dictionary
@@ -0,0 +1,28 @@
+"""
+gunicorn configuration
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+GUNICORN_PRELOAD=true（既定）の場合、マスターでアプリを作成・ウォームアップしてから
+ワーカーを fork する（import と初期化が1回で済み、メモリもコピーオンライトで共有される）。
+各ワーカーはリクエストを受ける前に app.preload.worker_preloader.prepare_worker() で
+親から引き継いだDB接続を破棄し、自分の接続を作成する。
+"""
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+
+def when_ready(server):
+    """マスターでワーカーを fork する前に呼ばれる"""
+    if preload_app:
+        from app.preload import worker_preloader
+        worker_preloader.warm_up(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    """fork 後のワーカーでアプリを読み込んだ後、リクエストを受ける前に呼ばれる"""
+    from app.preload import worker_preloader
+    worker_preloader.prepare_worker(worker.wsgi)
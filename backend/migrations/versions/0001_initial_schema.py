@@ -0,0 +1,107 @@
+"""Initial schema (tables as created by db.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 00:00:00
+
+This is the schema db.create_all() created before migrations existed.
+Databases created that way match this revision: run
+`alembic stamp 0001` once, then `alembic upgrade head`. Columns added
+since then each have their own revision.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sessions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_accessed", sa.DateTime(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("client_info", sa.JSON(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("session_id"),
+    )
+    op.create_table(
+        "calculations",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("calculation_id", sa.String(length=50), nullable=False),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("input_data", sa.JSON(), nullable=False),
+        sa.Column("result_data", sa.JSON(), nullable=False),
+        sa.Column("ai_analysis", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["sessions.session_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("calculation_id"),
+    )
+    op.create_table(
+        "calculation_yearly_data",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("calculation_id", sa.String(length=50), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("age", sa.Integer(), nullable=False),
+        sa.Column("balance", sa.BigInteger(), nullable=False),
+        sa.Column("annual_income", sa.BigInteger(), nullable=False),
+        sa.Column("annual_expenses", sa.BigInteger(), nullable=False),
+        sa.Column("net_change", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["calculation_id"], ["calculations.calculation_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("calculation_id", "year", name="unique_calculation_year"),
+    )
+    op.create_table(
+        "goals",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("goal_id", sa.String(length=50), nullable=False),
+        sa.Column("session_id", sa.String(length=36), nullable=False),
+        sa.Column("calculation_id", sa.String(length=50), nullable=True),
+        sa.Column("title", sa.String(length=200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("category", sa.String(length=50), nullable=True),
+        sa.Column("frequency", sa.String(length=50), nullable=True),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False),
+        sa.Column("start_date", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.CheckConstraint(
+            "progress >= 0 AND progress <= 100", name="check_progress_range"
+        ),
+        sa.CheckConstraint(
+            "status IN ('active', 'completed', 'archived', 'paused')",
+            name="check_status_values",
+        ),
+        sa.ForeignKeyConstraint(
+            ["calculation_id"], ["calculations.calculation_id"], ondelete="SET NULL"
+        ),
+        sa.ForeignKeyConstraint(
+            ["session_id"], ["sessions.session_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("goal_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("goals")
+    op.drop_table("calculation_yearly_data")
+    op.drop_table("calculations")
+    op.drop_table("sessions")
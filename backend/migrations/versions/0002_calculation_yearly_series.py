@@ -0,0 +1,31 @@
+"""Add calculations.yearly_series for the packed yearly data
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 00:00:00
+
+Calculations stored before this revision keep NULL here; their yearly
+data is still read from result_data.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "calculations", sa.Column("yearly_series", sa.LargeBinary(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("calculations") as batch_op:
+        batch_op.drop_column("yearly_series")
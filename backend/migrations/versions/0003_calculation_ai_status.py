@@ -0,0 +1,32 @@
+"""Add calculations.ai_status for background AI analysis
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00
+
+Calculations stored before this revision were analysed synchronously,
+so they are marked "completed".
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "calculations", sa.Column("ai_status", sa.String(length=20), nullable=True)
+    )
+    op.execute("UPDATE calculations SET ai_status = 'completed' WHERE ai_status IS NULL")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("calculations") as batch_op:
+        batch_op.drop_column("ai_status")
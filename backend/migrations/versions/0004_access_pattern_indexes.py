@@ -0,0 +1,43 @@
+"""Add indexes for the documented access patterns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00
+
+See docs/database/DATABASE_DESIGN.md, section 4.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_sessions_expires_at", "sessions", ["expires_at"])
+    op.create_index("idx_calculations_session_id", "calculations", ["session_id"])
+    op.create_index("idx_calculations_created_at", "calculations", ["created_at"])
+    op.create_index("idx_goals_session_status", "goals", ["session_id", "status"])
+    op.create_index(
+        "idx_active_goals",
+        "goals",
+        ["session_id"],
+        postgresql_where=sa.text("status = 'active'"),
+        sqlite_where=sa.text("status = 'active'"),
+    )
+    op.create_index("idx_goals_calculation_id", "goals", ["calculation_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_goals_calculation_id", table_name="goals")
+    op.drop_index("idx_active_goals", table_name="goals")
+    op.drop_index("idx_goals_session_status", table_name="goals")
+    op.drop_index("idx_calculations_created_at", table_name="calculations")
+    op.drop_index("idx_calculations_session_id", table_name="calculations")
+    op.drop_index("idx_sessions_expires_at", table_name="sessions")
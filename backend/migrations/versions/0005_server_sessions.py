@@ -0,0 +1,36 @@
+"""Add server_sessions table for the SQL session store
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "server_sessions",
+        sa.Column("session_key", sa.String(length=255), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("session_key"),
+    )
+    op.create_index(
+        "idx_server_sessions_expires_at", "server_sessions", ["expires_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_server_sessions_expires_at", table_name="server_sessions")
+    op.drop_table("server_sessions")
@@ -0,0 +1,46 @@
+"""Add ai_advice table for advice streamed by POST /ai/advice
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_advice",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("advice_id", sa.String(length=50), nullable=False),
+        sa.Column("calculation_id", sa.String(length=50), nullable=False),
+        sa.Column("question", sa.Text(), nullable=True),
+        sa.Column("analysis", sa.JSON(), nullable=False),
+        sa.Column("model_version", sa.String(length=50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["calculation_id"], ["calculations.calculation_id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("advice_id"),
+    )
+    op.create_index(
+        "idx_ai_advice_calculation_created",
+        "ai_advice",
+        ["calculation_id", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_ai_advice_calculation_created", table_name="ai_advice")
+    op.drop_table("ai_advice")
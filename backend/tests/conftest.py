@@ -0,0 +1,27 @@
+"""
+pytest fixtures (pytest-flask)
+
+app は testing 設定（インメモリ SQLite、@query_budget の超過で例外）で作成する。
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    app = create_app("testing")
+    yield app
+
+
+@pytest.fixture
+def client(app):
+    client = app.test_client()
+    # Talisman の HTTPS リダイレクトを通す
+    client.environ_base["HTTP_X_FORWARDED_PROTO"] = "https"
+    return client
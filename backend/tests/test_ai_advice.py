@@ -0,0 +1,154 @@
+"""
+POST /ai/advice（Server-Sent Events）と保存したアドバイスの取得
+"""
+import json
+
+import pytest
+
+from app.models import AIAdvice
+from app.services import get_gemini_service
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+ADVICE_TEXT = "できることから少しずつ始めてみましょう。"
+
+
+class StubChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubStreamingModel:
+    """アドバイス本文 → JSON ブロックの順に小さなチャンクで返す"""
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        lists = {"risk_factors": ["r"], "suggestions": ["s"]}
+        text = ADVICE_TEXT + "\n\n```json\n" + json.dumps(lists) + "\n```"
+        return iter([StubChunk(text[start:start + 8]) for start in range(0, len(text), 8)])
+
+
+class FailingStreamModel:
+    """アドバイス本文の途中でエラーになる"""
+
+    def generate_content(self, prompt, generation_config=None, stream=False, **kwargs):
+        yield StubChunk(ADVICE_TEXT[:8])
+        raise RuntimeError("upstream reset")
+
+
+def read_events(response):
+    """SSE の本文を (event, data) のリストに分解"""
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = block.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+@pytest.fixture
+def session_id(client):
+    return client.post("/api/v1/session", json={}).get_json()["data"]["session_id"]
+
+
+@pytest.fixture
+def calculation_id(client, session_id):
+    response = client.post("/api/v1/calculate", json={
+        "user_info": USER_INFO,
+        "options": {"use_ai_analysis": False},
+        "session_id": session_id,
+    })
+    return response.get_json()["data"]["calculation_id"]
+
+
+@pytest.fixture
+def streaming_model(app):
+    app.config.update(GEMINI_API_KEY="test-key", GEMINI_CACHE_ENABLED=False)
+    with app.app_context():
+        get_gemini_service().model = StubStreamingModel()
+
+
+def test_streams_tokens_and_saves_advice(client, calculation_id, streaming_model):
+    response = client.post(
+        "/api/v1/ai/advice", json={"calculation_id": calculation_id, "question": "生活費を減らすには？"}
+    )
+
+    assert response.mimetype == "text/event-stream"
+    events = read_events(response)
+    assert events[0] == ("meta", {"calculation_id": calculation_id})
+    tokens = "".join(data["text"] for event, data in events if event == "token")
+    assert tokens.strip() == ADVICE_TEXT
+    event, result = events[-1]
+    assert event == "result"
+    assert result["saved"] is True
+    assert result["ai_analysis"]["model_version"] == "gemini"
+    assert result["ai_analysis"]["suggestions"] == ["s"]
+    assert result["ai_analysis"]["question"] == "生活費を減らすには？"
+
+    history = client.get(f"/api/v1/ai/advice/{calculation_id}").get_json()["data"]["advice"]
+    assert [item["advice_id"] for item in history] == [result["advice_id"]]
+    assert history[0]["advice_message"] == ADVICE_TEXT
+
+
+def test_advice_does_not_change_the_stored_calculation(client, calculation_id, streaming_model):
+    before = client.get(f"/api/v1/calculate/{calculation_id}")
+
+    for body in ({"calculation_id": calculation_id}, {"calculation_id": calculation_id, "question": "質問"}):
+        assert read_events(client.post("/api/v1/ai/advice", json=body))[-1][1]["saved"] is True
+
+    after = client.get(f"/api/v1/calculate/{calculation_id}", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 304
+    assert client.get(f"/api/v1/calculate/{calculation_id}").get_data() == before.get_data()
+    assert len(client.get(f"/api/v1/ai/advice/{calculation_id}").get_json()["data"]["advice"]) == 2
+
+
+def test_fallback_advice_is_saved_as_fallback(client, calculation_id):
+    events = read_events(client.post("/api/v1/ai/advice", json={"calculation_id": calculation_id}))
+
+    assert [event for event, _ in events] == ["meta", "result"]
+    assert events[-1][1]["ai_analysis"]["model_version"] == "fallback"
+    assert events[-1][1]["saved"] is True
+
+
+@pytest.mark.parametrize("body, status", [
+    ({}, 400),
+    ({"calculation_id": "calc_missing"}, 404),
+    ({"calculation_id": "calc_missing", "question": 1}, 400),
+    ({"calculation_id": "calc_missing", "question": "x" * 501}, 400),
+])
+def test_invalid_requests_get_json_errors(client, body, status):
+    response = client.post("/api/v1/ai/advice", json=body)
+
+    assert response.status_code == status
+    assert response.get_json()["success"] is False
+
+
+def test_history_of_unknown_calculation_is_not_found(client):
+    assert client.get("/api/v1/ai/advice/calc_missing").status_code == 404
+
+
+def test_deleting_the_session_deletes_its_advice(app, client, session_id, calculation_id):
+    assert read_events(client.post("/api/v1/ai/advice", json={"calculation_id": calculation_id}))[-1][1]["saved"]
+
+    assert client.delete(f"/api/v1/session/{session_id}").status_code == 200
+    with app.app_context():
+        assert AIAdvice.query.filter_by(calculation_id=calculation_id).count() == 0
+
+
+def test_failure_after_tokens_resets_them_before_the_fallback(app, client, calculation_id):
+    app.config.update(GEMINI_API_KEY="test-key", GEMINI_CACHE_ENABLED=False)
+    with app.app_context():
+        get_gemini_service().model = FailingStreamModel()
+
+    events = read_events(client.post("/api/v1/ai/advice", json={"calculation_id": calculation_id}))
+
+    assert [event for event, _ in events] == ["meta", "token", "reset", "result"]
+    assert events[-1][1]["ai_analysis"]["model_version"] == "fallback"
+
+
+def test_stream_without_a_result_ends_with_an_error_event(app, client, calculation_id, monkeypatch):
+    with app.app_context():
+        service = get_gemini_service()
+    monkeypatch.setattr(service, "stream_life_plan", lambda *args, **kwargs: iter([("token", "途中")]))
+
+    events = read_events(client.post("/api/v1/ai/advice", json={"calculation_id": calculation_id}))
+
+    assert [event for event, _ in events] == ["meta", "token", "error"]
+    assert events[-1][1]["code"] == "AI_API_ERROR"
@@ -0,0 +1,68 @@
+"""
+バックグラウンドのAI分析（options.async_ai_analysis）
+"""
+import threading
+
+import pytest
+
+from app import create_app
+from app.services import get_gemini_service
+from app.services.ai_worker import ai_analysis_worker
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+class BlockingModel:
+    """release が set されるまで応答しない"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        self.release.wait(5)
+        raise RuntimeError("released")
+
+
+@pytest.fixture
+def worker_app(app):
+    app.config.update(
+        AI_ANALYSIS_WORKERS=1, AI_ANALYSIS_MAX_QUEUE=1, GEMINI_API_KEY="test-key", GEMINI_CACHE_ENABLED=False
+    )
+    ai_analysis_worker.init_app(app)
+    yield app
+    ai_analysis_worker.shutdown()
+
+
+def test_init_app_reuses_the_thread_pool(worker_app):
+    executor = ai_analysis_worker._executor
+
+    ai_analysis_worker.init_app(worker_app)
+
+    assert ai_analysis_worker._executor is executor
+
+
+def test_full_queue_keeps_the_rule_based_analysis(worker_app):
+    client = worker_app.test_client()
+    client.environ_base["HTTP_X_FORWARDED_PROTO"] = "https"
+    with worker_app.app_context():
+        model = BlockingModel()
+        get_gemini_service().model = model
+    body = {"user_info": USER_INFO, "options": {"use_ai_analysis": True, "async_ai_analysis": True}}
+
+    try:
+        # 1件は実行中、1件は待ち行列、3件目は満杯
+        statuses = [client.post("/api/v1/calculate", json=body).get_json()["data"]["ai_status"] for _ in range(3)]
+        calculation_id = client.post("/api/v1/calculate", json=body).get_json()["data"]["calculation_id"]
+        stored = client.get(f"/api/v1/calculate/{calculation_id}").get_json()["data"]
+    finally:
+        model.release.set()
+
+    assert statuses == ["pending", "pending", "completed"]
+    assert stored["ai_status"] == "completed"
+    assert ai_analysis_worker.stats()["rejected"] == 2
+
+
+def test_testing_apps_run_jobs_inline():
+    create_app("testing")
+
+    assert ai_analysis_worker.stats()["workers"] == 0
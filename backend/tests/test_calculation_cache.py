@@ -0,0 +1,71 @@
+"""
+GET /calculate/<id> のレスポンス本文キャッシュ・ETag・Cache-Control
+"""
+from sqlalchemy import text
+
+from app.extensions import db
+from app.services.payload_cache import get_payload, invalidate_payload
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+def calculate(client):
+    data = client.post("/api/v1/calculate", json={
+        "user_info": USER_INFO, "options": {"use_ai_analysis": False}
+    }).get_json()["data"]
+    return data["session_id"], data["calculation_id"]
+
+
+def test_cached_calculation_deleted_elsewhere_is_not_found(app, client):
+    session_id, calculation_id = calculate(client)
+    assert client.get(f"/api/v1/calculate/{calculation_id}").status_code == 200
+    assert get_payload(calculation_id) is not None
+
+    # 他のワーカー（または reaper）による削除: このワーカーのキャッシュには触れない
+    with app.app_context():
+        db.session.execute(text("DELETE FROM sessions WHERE session_id = :id"), {"id": session_id})
+        db.session.commit()
+
+    assert client.get(f"/api/v1/calculate/{calculation_id}").status_code == 404
+    assert get_payload(calculation_id) is None
+
+
+def test_deleting_a_session_keeps_other_cached_calculations(client):
+    session_id, calculation_id = calculate(client)
+    _, other_id = calculate(client)
+    for cached_id in (calculation_id, other_id):
+        client.get(f"/api/v1/calculate/{cached_id}")
+
+    client.delete(f"/api/v1/session/{session_id}")
+
+    assert client.get(f"/api/v1/calculate/{calculation_id}").status_code == 404
+    assert get_payload(other_id) is not None
+
+
+def test_200_and_304_carry_the_same_etag(client):
+    _, calculation_id = calculate(client)
+    url = f"/api/v1/calculate/{calculation_id}"
+
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    identity = client.get(url, headers={"Accept-Encoding": "identity"})
+    cached_304 = client.get(url, headers={"If-None-Match": gzipped.headers["ETag"]})
+    invalidate_payload(calculation_id)
+    database_304 = client.get(url, headers={"If-None-Match": identity.headers["ETag"]})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in identity.headers
+    assert (cached_304.status_code, database_304.status_code) == (304, 304)
+    etags = {r.headers["ETag"] for r in (gzipped, identity, cached_304, database_304)}
+    assert len(etags) == 1
+    assert etags.pop().startswith('W/"')
+
+
+def test_settled_calculations_are_not_stored_by_shared_caches(client):
+    _, calculation_id = calculate(client)
+    url = f"/api/v1/calculate/{calculation_id}"
+
+    response = client.get(url)
+    not_modified = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+
+    for cached in (response, not_modified):
+        assert cached.headers["Cache-Control"] == "private, max-age=60"
@@ -0,0 +1,82 @@
+"""
+金額の上限と int64 の桁あふれ
+"""
+import pytest
+
+from app.routes.calculation import MAX_AMOUNT
+from app.services.calculator import LifePlanCalculator
+from app.services.simulation import simulate_constant_flows
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+@pytest.mark.parametrize("total_assets", [10**19, 2**63, 10**20])
+def test_integer_inputs_outside_int64_raise(total_assets):
+    with pytest.raises(OverflowError):
+        LifePlanCalculator(age=40, monthly_expenses=200000, total_assets=total_assets).calculate()
+
+
+def test_balance_sum_outside_int64_raises():
+    # 2**62 は int64 に収まるが、50年分の残高の合計は収まらない
+    with pytest.raises(OverflowError):
+        LifePlanCalculator(age=40, monthly_expenses=200000, total_assets=2**62).calculate()
+
+
+def test_maximum_amounts_do_not_overflow():
+    arrays = simulate_constant_flows(
+        total_assets=[MAX_AMOUNT],
+        monthly_expenses=[0],
+        monthly_support=[MAX_AMOUNT],
+        simulation_years=120,
+    )
+    assert arrays["balances"][0, -1] == MAX_AMOUNT + 120 * 12 * MAX_AMOUNT
+    assert arrays["balance_sum"][0] == sum(
+        MAX_AMOUNT + (year + 1) * 12 * MAX_AMOUNT for year in range(120)
+    )
+
+
+@pytest.mark.parametrize("field", ["total_assets", "monthly_expenses", "monthly_support"])
+def test_calculate_rejects_amounts_over_maximum(client, field):
+    user_info = dict(USER_INFO, **{field: MAX_AMOUNT + 1})
+    response = client.post("/api/v1/calculate", json={"user_info": user_info})
+
+    assert response.status_code == 400
+    assert response.get_json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_calculate_accepts_maximum_amount(client):
+    user_info = dict(USER_INFO, total_assets=MAX_AMOUNT)
+    response = client.post(
+        "/api/v1/calculate",
+        json={"user_info": user_info, "options": {"use_ai_analysis": False, "simulation_years": 120}},
+    )
+
+    assert response.status_code == 200
+    result = response.get_json()["data"]["result"]
+    assert result["yearly_data"][0]["balance"] == MAX_AMOUNT - 12 * 200000
+
+
+@pytest.mark.parametrize("simulation_years", [0, -1, 121, 10**6, 50.5, "50", True])
+@pytest.mark.parametrize("path, body", [
+    ("/api/v1/calculate", {"user_info": USER_INFO}),
+    ("/api/v1/calculate/batch", {"items": [USER_INFO]}),
+    ("/api/v1/calculate/sweep", {
+        "user_info": USER_INFO,
+        "axes": [{"parameter": "total_assets", "values": [1000000, 2000000]}],
+    }),
+])
+def test_simulation_years_is_validated(client, path, body, simulation_years):
+    options = {"use_ai_analysis": False, "simulation_years": simulation_years}
+    response = client.post(path, json=dict(body, options=options))
+
+    assert response.status_code == 400
+    assert response.get_json()["error"]["code"] == "VALIDATION_ERROR"
+
+
+def test_simulation_years_maximum_is_configurable(app, client):
+    app.config["SIMULATION_MAX_YEARS"] = 30
+    body = {"user_info": USER_INFO, "options": {"use_ai_analysis": False, "simulation_years": 31}}
+
+    assert client.post("/api/v1/calculate", json=body).status_code == 400
+    body["options"]["simulation_years"] = 30
+    assert client.post("/api/v1/calculate", json=body).status_code == 200
@@ -0,0 +1,78 @@
+"""
+サーキットブレーカーの状態遷移
+"""
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(half_open_max_calls=1):
+    clock = FakeClock()
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10.0, half_open_max_calls=half_open_max_calls, clock=clock
+    )
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker, clock
+
+
+def test_opens_after_consecutive_failures_and_rejects():
+    breaker, _ = open_breaker()
+
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_closes_only_after_all_half_open_probes_succeed():
+    breaker, clock = open_breaker(half_open_max_calls=3)
+    clock.now = 10.0
+
+    assert [breaker.allow() for _ in range(4)] == [True, True, True, False]
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == HALF_OPEN
+    breaker.record_success(0.1)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker, clock = open_breaker(half_open_max_calls=2)
+    clock.now = 10.0
+
+    assert breaker.allow() and breaker.allow()
+    breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.stats()["times_opened"] == 2
+
+
+def test_cancelled_probe_returns_its_slot():
+    breaker, clock = open_breaker()
+    clock.now = 10.0
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.cancel()
+    assert breaker.allow()
+
+
+def test_late_success_does_not_close_an_open_breaker():
+    breaker, _ = open_breaker()
+
+    breaker.record_success(0.1)
+    assert breaker.state == OPEN
+
+
+def test_slow_call_counts_as_failure():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_seconds=1.0)
+
+    breaker.record_success(2.0)
+    assert breaker.state == OPEN
+    assert breaker.stats()["slow_calls"] == 1
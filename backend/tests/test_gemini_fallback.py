@@ -0,0 +1,100 @@
+"""
+Gemini の分析結果の model_version（ルールベースへのフォールバックを gemini と記録しない）
+"""
+import json
+import time
+
+import pytest
+
+from app.services import get_gemini_service, run_gemini_analysis
+from app.services.calculator import LifePlanCalculator
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+ANALYSIS = {"risk_factors": ["r"], "suggestions": ["s"], "advice_message": "a"}
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """generate_content() が delay 秒後に ANALYSIS を返す（error 指定時は例外）"""
+
+    def __init__(self, delay=0.0, error=False):
+        self.delay = delay
+        self.error = error
+
+    def generate_content(self, prompt, generation_config=None, **kwargs):
+        time.sleep(self.delay)
+        if self.error:
+            raise RuntimeError("upstream error")
+        return StubResponse(json.dumps(ANALYSIS))
+
+
+@pytest.fixture
+def result():
+    return LifePlanCalculator(**USER_INFO).calculate()
+
+
+@pytest.fixture
+def service(app):
+    app.config.update(GEMINI_API_KEY="test-key", GEMINI_CACHE_ENABLED=False, GEMINI_TIMEOUT=0.5)
+    with app.app_context():
+        service = get_gemini_service()
+        service.model = StubModel()
+        yield service
+
+
+def test_api_result_is_recorded_as_gemini(service, result):
+    ai_analysis = run_gemini_analysis(USER_INFO, result)
+
+    assert ai_analysis["model_version"] == "gemini"
+    assert ai_analysis["suggestions"] == ANALYSIS["suggestions"]
+
+
+def test_disabled_service_is_recorded_as_fallback(app, result):
+    with app.app_context():
+        assert not get_gemini_service().enabled
+        assert run_gemini_analysis(USER_INFO, result)["model_version"] == "fallback"
+
+
+def test_api_error_is_recorded_as_fallback(service, result):
+    service.model = StubModel(error=True)
+
+    assert run_gemini_analysis(USER_INFO, result)["model_version"] == "fallback"
+    assert service.stats()["fallbacks"]["error"] == 1
+
+
+def test_timeout_is_recorded_as_fallback(service, result):
+    service.model = StubModel(delay=1.0)
+
+    assert run_gemini_analysis(USER_INFO, result)["model_version"] == "fallback"
+    assert service.stats()["fallbacks"]["timeout"] == 1
+
+
+def test_exhausted_deadline_is_recorded_as_fallback(service, result):
+    ai_analysis = run_gemini_analysis(USER_INFO, result, deadline=time.monotonic())
+
+    assert ai_analysis["model_version"] == "fallback"
+    assert service.stats()["fallbacks"]["deadline"] == 1
+
+
+def test_open_circuit_is_recorded_as_fallback(service, result):
+    for _ in range(service.breaker.failure_threshold):
+        service.breaker.record_failure()
+
+    assert run_gemini_analysis(USER_INFO, result)["model_version"] == "fallback"
+    assert service.stats()["fallbacks"]["circuit_open"] == 1
+
+
+def test_concurrency_limit_is_recorded_as_fallback(service, result):
+    service.bulkhead.max_queue = 0
+    for _ in range(service.bulkhead.max_concurrent):
+        service.bulkhead.acquire()
+    try:
+        assert run_gemini_analysis(USER_INFO, result)["model_version"] == "fallback"
+    finally:
+        for _ in range(service.bulkhead.max_concurrent):
+            service.bulkhead.release()
+    assert service.stats()["fallbacks"]["concurrency"] == 1
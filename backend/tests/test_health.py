@@ -0,0 +1,29 @@
+"""
+ヘルスチェックとメトリクス
+"""
+
+
+def test_health_is_public(client):
+    assert client.get("/api/v1/health").status_code == 200
+
+
+def test_metrics_is_hidden_when_disabled(app, client):
+    app.config["METRICS_ENABLED"] = False
+
+    response = client.get("/api/v1/health/metrics")
+
+    assert response.status_code == 404
+    assert "gemini" not in response.get_data(as_text=True)
+
+
+def test_metrics_requires_token_when_configured(app, client):
+    app.config["METRICS_TOKEN"] = "secret"
+
+    assert client.get("/api/v1/health/metrics").status_code == 401
+    assert client.get(
+        "/api/v1/health/metrics", headers={"Authorization": "Bearer wrong"}
+    ).status_code == 401
+
+    response = client.get("/api/v1/health/metrics", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "calculation_cache" in response.get_json()["data"]
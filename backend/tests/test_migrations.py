@@ -0,0 +1,68 @@
+"""
+Alembic マイグレーション（backend/migrations）
+"""
+import os
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+import app.models  # noqa: F401  (register models on db.metadata)
+from app.extensions import db
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+
+@pytest.fixture
+def alembic_config(database_url):
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    config.set_main_option("sqlalchemy.url", database_url)
+    return config
+
+
+def test_head_matches_the_models(alembic_config, database_url):
+    command.upgrade(alembic_config, "head")
+
+    engine = create_engine(database_url)
+    with engine.connect() as connection:
+        assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+
+def test_baseline_database_stamped_at_0001_upgrades(alembic_config, database_url):
+    # 0001 は db.create_all() で作成された既存データベースと同じスキーマ
+    command.upgrade(alembic_config, "0001")
+    engine = create_engine(database_url)
+    columns = {column["name"] for column in inspect(engine).get_columns("calculations")}
+    assert not {"yearly_series", "ai_status"} & columns
+
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO sessions (session_id, created_at, last_accessed, expires_at)"
+            " VALUES ('s1', '2025-01-01', '2025-01-01', '2025-01-02')"
+        ))
+        connection.execute(text(
+            "INSERT INTO calculations (calculation_id, session_id, input_data, result_data, created_at, updated_at)"
+            " VALUES ('calc_1', 's1', '{}', '{}', '2025-01-01', '2025-01-01')"
+        ))
+
+    command.upgrade(alembic_config, "head")
+
+    with engine.connect() as connection:
+        row = connection.execute(text("SELECT yearly_series, ai_status FROM calculations")).one()
+    assert row == (None, "completed")
+
+
+def test_downgrade_to_base(alembic_config, database_url):
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "base")
+
+    assert inspect(create_engine(database_url)).get_table_names() == ["alembic_version"]
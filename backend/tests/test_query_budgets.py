@@ -0,0 +1,92 @@
+"""
+エンドポイントごとのクエリ数の上限（@query_budget）
+
+testing 設定では SQL_PROFILER_ENFORCE_BUDGETS が有効で、全リクエストを計測する。
+上限を超えたリクエストは QueryBudgetExceeded で失敗する。
+"""
+import re
+
+import pytest
+
+from app.services.sql_profiler import QueryBudgetExceeded
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+def query_count(response) -> int:
+    """Server-Timing ヘッダーに記録されたクエリ数"""
+    return int(re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+
+
+def budget_of(app, endpoint: str) -> int:
+    return app.view_functions[endpoint].query_budget
+
+
+def create_session(client) -> str:
+    response = client.post("/api/v1/session", json={})
+    assert response.status_code == 201
+    return response.get_json()["data"]["session_id"]
+
+
+def create_calculation(client, session_id=None) -> str:
+    body = {"user_info": USER_INFO, "options": {"use_ai_analysis": False}}
+    if session_id:
+        body["session_id"] = session_id
+    response = client.post("/api/v1/calculate", json=body)
+    assert response.status_code == 200
+    return response.get_json()["data"]["calculation_id"]
+
+
+@pytest.fixture
+def requests(client):
+    """予算付きエンドポイントへのリクエスト（エンドポイント名 → リクエストを送る関数）"""
+    session_id = create_session(client)
+    # GET /session で計算結果の有無も読み込まれるようにする
+    create_calculation(client, session_id)
+    return {
+        "session.create_session": lambda: client.post("/api/v1/session", json={}),
+        "session.get_session": lambda: client.get(f"/api/v1/session/{session_id}"),
+        "calculation.calculate": lambda: client.post(
+            "/api/v1/calculate",
+            json={"user_info": USER_INFO, "options": {"use_ai_analysis": False}, "session_id": session_id},
+        ),
+        # 新しい計算結果（レスポンス本文のキャッシュに載っていない）を毎回取得する
+        "calculation.get_calculation": lambda: client.get(
+            f"/api/v1/calculate/{create_calculation(client, session_id)}"
+        ),
+    }
+
+
+ENDPOINTS = [
+    "session.create_session",
+    "session.get_session",
+    "calculation.calculate",
+    "calculation.get_calculation",
+]
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_endpoint_stays_within_budget(app, requests, endpoint):
+    response = requests[endpoint]()
+
+    assert response.status_code < 400
+    assert 0 < query_count(response) <= budget_of(app, endpoint)
+
+
+@pytest.mark.parametrize("endpoint", ENDPOINTS)
+def test_exceeding_budget_fails(app, requests, monkeypatch, endpoint):
+    monkeypatch.setattr(app.view_functions[endpoint], "query_budget", 0)
+
+    with pytest.raises(QueryBudgetExceeded):
+        requests[endpoint]()
+
+
+def test_budget_is_only_logged_when_not_enforced(app, requests, monkeypatch):
+    app.config["SQL_PROFILER_ENFORCE_BUDGETS"] = False
+    monkeypatch.setattr(app.view_functions["session.get_session"], "query_budget", 0)
+    app.extensions["sql_profiler"].reset_stats()
+
+    response = requests["session.get_session"]()
+
+    assert response.status_code == 200
+    assert app.extensions["sql_profiler"].stats()["session.get_session"]["budget_exceeded"] == 1
@@ -0,0 +1,53 @@
+"""
+セッションの削除と、計算結果の保存先セッション
+
+子テーブルは ON DELETE CASCADE で削除する（SQLite は接続時に PRAGMA foreign_keys=ON）。
+"""
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models import Calculation, CalculationYearlyData, Session
+
+USER_INFO = {"age": 40, "monthly_expenses": 200000, "total_assets": 5000000}
+
+
+def calculate(client, **body):
+    return client.post("/api/v1/calculate", json={
+        "user_info": USER_INFO, "options": {"use_ai_analysis": False}, **body
+    })
+
+
+def test_sqlite_enforces_foreign_keys(app):
+    with app.app_context():
+        assert db.session.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+
+def test_calculation_without_session_gets_its_own_session(app, client):
+    data = calculate(client).get_json()["data"]
+
+    with app.app_context():
+        assert db.session.get(Session, 1).session_id == data["session_id"]
+        assert Calculation.query.filter_by(session_id=data["session_id"]).count() == 1
+
+
+def test_calculation_for_unknown_session_is_not_found(client):
+    response = calculate(client, session_id="00000000-0000-0000-0000-000000000000")
+
+    assert response.status_code == 404
+    assert response.get_json()["error"]["code"] == "SESSION_NOT_FOUND"
+
+
+def test_batch_for_unknown_session_is_not_found(client):
+    response = client.post("/api/v1/calculate/batch", json={"items": [USER_INFO], "session_id": "missing"})
+
+    assert response.status_code == 404
+
+
+def test_deleting_a_session_cascades_to_its_calculations(app, client):
+    session_id = calculate(client).get_json()["data"]["session_id"]
+    calculate(client, session_id=session_id)
+
+    assert client.delete(f"/api/v1/session/{session_id}").status_code == 200
+    with app.app_context():
+        assert Calculation.query.count() == 0
+        assert CalculationYearlyData.query.count() == 0
@@ -0,0 +1,33 @@
+"""
+リクエスト単位のSQL計測（app/services/sql_profiler.py）
+"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db
+from app.services.sql_profiler import RequestProfile, _current_profile
+
+
+def test_failed_statement_does_not_leave_a_start_time(app):
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        with app.app_context(), db.engine.connect() as connection:
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM no_such_table"))
+            connection.execute(text("SELECT 1"))
+
+            assert connection.info.get("sql_profiler_started") == []
+    finally:
+        _current_profile.reset(token)
+
+    assert profile.queries == 2
+    assert profile.statements["SELECT 1"] == 1
+
+
+def test_server_timing_only_when_enabled(app, client):
+    assert "Server-Timing" in client.post("/api/v1/session", json={}).headers
+
+    app.config["SQL_PROFILER_SERVER_TIMING"] = False
+    assert "Server-Timing" not in client.post("/api/v1/session", json={}).headers
@@ -0,0 +1,43 @@
+"""
+年次データの保存形式（Calculation.yearly_series）
+"""
+import pytest
+
+from app.models.calculation import decode_yearly_series, encode_yearly_series
+from app.services.calculator import LifePlanCalculator
+
+
+@pytest.mark.parametrize("monthly_expenses, monthly_support", [
+    (150000, 65000),
+    (150000.5, 65000),
+    (150000, 65000.25),
+])
+def test_round_trip_keeps_values_and_types(monthly_expenses, monthly_support):
+    yearly_data = LifePlanCalculator(
+        age=40,
+        monthly_expenses=monthly_expenses,
+        total_assets=10000000,
+        monthly_support=monthly_support,
+    ).calculate(simulation_years=30)["yearly_data"]
+
+    decoded = decode_yearly_series(encode_yearly_series(yearly_data))
+
+    assert decoded == yearly_data
+    assert [{k: type(v) for k, v in row.items()} for row in decoded] == [
+        {k: type(v) for k, v in row.items()} for row in yearly_data
+    ]
+    assert all(isinstance(row["year"], int) and isinstance(row["age"], int) for row in decoded)
+
+
+def test_get_returns_what_post_returned(client):
+    response = client.post("/api/v1/calculate", json={
+        "user_info": {"age": 40, "monthly_expenses": 150000.5, "total_assets": 10000000},
+        "options": {"use_ai_analysis": False},
+    })
+    created = response.get_json()["data"]
+
+    stored = client.get(f"/api/v1/calculate/{created['calculation_id']}").get_json()["data"]
+
+    assert stored["result"]["yearly_data"] == created["result"]["yearly_data"]
+    assert stored["result"]["yearly_data"][0]["year"] == created["result"]["yearly_data"][0]["year"]
+    assert isinstance(stored["result"]["yearly_data"][0]["year"], int)
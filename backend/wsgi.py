@@ -0,0 +1,10 @@
+"""
+WSGI Entry Point (gunicorn)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+（backend/app.py は app パッケージと名前が重なるため、WSGI サーバーからはこのモジュールを使う）
+"""
+from app import create_app
+
+app = create_app()